@@ -0,0 +1,139 @@
+"""
+Limitador de ancho de banda (token bucket) compartido por todos los downloaders.
+
+Los workers GPU atienden trabajos de red y actualizan tools por el mismo enlace.
+Para que una actualización no sature el uplink, todos los downloaders del
+proceso (incluidas las descargas paralelas y por segmentos) consumen tokens de
+un único limitador global:
+
+- foreground: consume solo del límite total del proceso (si lo hay)
+- background: consume además de su propio presupuesto (background_rate), p. ej.
+  una actualización lanzada por PCWorker mientras hay trabajos en curso
+
+Las reservas son por orden de llegada: quien pide bytes sin tokens disponibles
+deja el bucket en deuda y espera lo que tarde en reponerse, así que N hilos
+concurrentes se reparten la tasa configurada.
+
+Uso:
+    configure_bandwidth(rate=50 * 1024 * 1024, background_rate=5 * 1024 * 1024)
+    downloader = HTTPDownloader(priority=BACKGROUND)  # usa get_limiter()
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+FOREGROUND = "foreground"
+BACKGROUND = "background"
+PRIORITIES = (FOREGROUND, BACKGROUND)
+
+# Ráfaga mínima del bucket (bytes)
+MIN_BURST = 64 * 1024
+
+
+class TokenBucket:
+    """Token bucket thread-safe con reservas (permite deuda)."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Bytes por segundo
+            capacity: Ráfaga máxima en bytes (default: 1/4 de segundo de tasa)
+        """
+        if rate <= 0:
+            raise ValueError("rate debe ser > 0")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(self.rate / 4, MIN_BURST)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, nbytes: int) -> float:
+        """
+        Reserva nbytes y retorna cuántos segundos hay que esperar antes de usarlos.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= nbytes
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class BandwidthLimiter:
+    """Límite total del proceso + presupuesto para descargas en background."""
+
+    def __init__(self, rate: Optional[float] = None, background_rate: Optional[float] = None):
+        """
+        Args:
+            rate: Bytes/s para todas las descargas (None = sin límite)
+            background_rate: Bytes/s para descargas en background (None = sin límite propio)
+        """
+        self._lock = threading.Lock()
+        self.bytes_by_priority: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self.configure(rate, background_rate)
+
+    def configure(self, rate: Optional[float] = None, background_rate: Optional[float] = None) -> None:
+        """Cambia los límites (afecta también a las descargas en curso)."""
+        with self._lock:
+            self.rate = rate
+            self.background_rate = background_rate
+            self._total = TokenBucket(rate) if rate else None
+            self._background = TokenBucket(background_rate) if background_rate else None
+
+    def _buckets(self, priority: str):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Prioridad desconocida: {priority}")
+        with self._lock:
+            buckets = [self._total]
+            if priority == BACKGROUND:
+                buckets.append(self._background)
+        return [b for b in buckets if b is not None]
+
+    def reserve(self, nbytes: int, priority: str = FOREGROUND) -> float:
+        """Reserva nbytes en los buckets de la prioridad. Retorna la espera en segundos."""
+        buckets = self._buckets(priority)
+        with self._lock:
+            self.bytes_by_priority[priority] += nbytes
+        return max((b.reserve(nbytes) for b in buckets), default=0.0)
+
+    def throttle(self, nbytes: int, priority: str = FOREGROUND) -> None:
+        """Bloquea el hilo hasta que nbytes caben en el límite."""
+        delay = self.reserve(nbytes, priority)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def throttle_async(self, nbytes: int, priority: str = FOREGROUND) -> None:
+        """Versión asyncio de throttle() (no bloquea el event loop)."""
+        delay = self.reserve(nbytes, priority)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def read_size(self, chunk_size: int, priority: str = FOREGROUND) -> int:
+        """
+        Tamaño de lectura a usar: con límite se lee como mucho una ráfaga por
+        vez, para que el tráfico salga repartido y no a golpes de chunk_size.
+        """
+        caps = [b.capacity for b in self._buckets(priority)]
+        return int(min([chunk_size] + caps))
+
+
+_GLOBAL_LIMITER = BandwidthLimiter()
+
+
+def get_limiter() -> BandwidthLimiter:
+    """Limitador global del proceso (sin límite hasta configure_bandwidth())."""
+    return _GLOBAL_LIMITER
+
+
+def configure_bandwidth(rate: Optional[float] = None, background_rate: Optional[float] = None) -> BandwidthLimiter:
+    """
+    Configura el limitador global del proceso.
+
+    Args:
+        rate: Bytes/s para todas las descargas (None = sin límite)
+        background_rate: Bytes/s para descargas en background (None = sin límite propio)
+    """
+    _GLOBAL_LIMITER.configure(rate, background_rate)
+    return _GLOBAL_LIMITER
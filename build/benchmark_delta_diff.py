@@ -0,0 +1,82 @@
+"""
+Benchmark del cálculo de diferencias del DeltaUpdater.
+
+Genera manifiestos sintéticos de tamaño creciente y mide el tiempo de
+compute_diff + planificación de descargas (lo que hace update_from_zip antes
+de tocar disco). El tiempo por archivo debe mantenerse ~constante: escalado lineal.
+
+Uso:
+    python build/benchmark_delta_diff.py
+    python build/benchmark_delta_diff.py --sizes 1000 10000 20000 40000 --changed 0.05
+"""
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+from delta_updater import DeltaUpdater, index_manifest
+
+
+def synthetic_manifest(version: str, n_files: int, changed_every: int = 0) -> Dict:
+    """Crea un manifiesto con n_files entradas; cambia el hash de 1 de cada changed_every."""
+    files = []
+    for i in range(n_files):
+        seed = f"{i}-{version}" if changed_every and i % changed_every == 0 else str(i)
+        path = f"frontend/vendor/pkg{i % 97}/module_{i}.js"
+        files.append({
+            "path": path,
+            "sha256": hashlib.sha256(seed.encode()).hexdigest(),
+            "size": 1024 + i,
+            "url": f"https://hq.bitstation.local/api/v1/tools/bench/{version}/files/{path}",
+        })
+    return {"tool_id": "bench", "tool_version": version, "files": files}
+
+
+def time_diff(updater: DeltaUpdater, current: Dict, target: Dict, repeat: int) -> float:
+    """Mejor tiempo (segundos) de indexar + diff + planificar descargas."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        target_index = index_manifest(target)
+        diff = updater.compute_diff(current, target, target_index)
+        to_download = [f for f in diff if f.status == "download"]
+        jobs = updater.plan_downloads(to_download, target_index)
+        all(info and info.get("url") for _, info in jobs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de compute_diff (escalado con nº de archivos)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2500, 5000, 10000, 20000, 40000])
+    parser.add_argument("--changed", type=float, default=0.05,
+                        help="Fracción de archivos modificados entre versiones (default 0.05)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    changed_every = max(1, int(round(1 / args.changed))) if args.changed > 0 else 0
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        updater = DeltaUpdater(Path(tmpdir))
+
+        print(f"{'archivos':>10} {'tiempo (ms)':>12} {'us/archivo':>11}")
+        per_file: List[float] = []
+        for n in args.sizes:
+            current = synthetic_manifest("1.0.0", n)
+            target = synthetic_manifest("1.1.0", n, changed_every)
+            elapsed = time_diff(updater, current, target, args.repeat)
+            per_file.append(elapsed / n * 1e6)
+            print(f"{n:>10} {elapsed * 1000:>12.2f} {per_file[-1]:>11.3f}")
+
+    ratio = max(per_file) / min(per_file)
+    print(f"\nVariación de us/archivo entre tamaños: x{ratio:.2f} (lineal ≈ x1, cuadrático ≈ x{args.sizes[-1] / args.sizes[0]:.0f})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+"""
+Benchmark del hashing de generate_manifest (secuencial vs pool de hilos).
+
+Genera un árbol sintético como el de una tool real: muchos archivos pequeños
+(frontend, scripts) y unos pocos archivos de varios GB (runtimes, bundles), y
+mide collect_files con workers=1 frente a N hilos. hashlib libera el GIL, así
+que con disco rápido (NVMe) el tiempo en paralelo lo marca el archivo más
+grande; en HDD conviene bajar --workers.
+
+El árbol se escribe una vez y se hace un run de calentamiento antes de medir
+(page cache caliente en ambos casos: se compara CPU de hashing, no el disco).
+
+Uso:
+    python build/benchmark_manifest_hashing.py
+    python build/benchmark_manifest_hashing.py --small-count 5000 --large-count 3 --large-size-mb 2048
+    python build/benchmark_manifest_hashing.py --dir D:/tmp/bench --workers 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from generate_manifest import DEFAULT_HASH_WORKERS, collect_files
+
+_BLOCK = 8 * 1024 * 1024
+
+
+def synthetic_tree(root: Path, small_count: int, small_size: int, large_count: int, large_size: int) -> int:
+    """Crea el árbol de prueba. Retorna el total de bytes escritos."""
+    total = 0
+    for i in range(small_count):
+        path = root / "frontend" / f"pkg{i % 97}" / f"module_{i}.js"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(small_size))
+        total += small_size
+
+    # Archivos grandes: un bloque aleatorio por archivo repetido (escritura
+    # rápida; el coste de sha256 no depende del contenido)
+    for i in range(large_count):
+        path = root / "runtime" / f"engine_{i}.dat"  # models/ y *.bin se excluyen del manifest
+        path.parent.mkdir(parents=True, exist_ok=True)
+        block = os.urandom(_BLOCK)
+        with path.open("wb") as f:
+            remaining = large_size
+            while remaining > 0:
+                f.write(block[:remaining])
+                remaining -= min(remaining, _BLOCK)
+        total += large_size
+    return total
+
+
+def time_collect(root: Path, workers: int, repeat: int) -> float:
+    """Mejor tiempo (segundos) de collect_files con workers hilos."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        collect_files(root, "https://hq.bitstation.local/api/v1/tools/", "bench", "1.0.0", workers=workers)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de hashing de generate_manifest (secuencial vs paralelo)")
+    parser.add_argument("--small-count", type=int, default=2000, help="Archivos pequeños (default 2000)")
+    parser.add_argument("--small-size-kb", type=int, default=16, help="Tamaño de cada archivo pequeño (default 16 KB)")
+    parser.add_argument("--large-count", type=int, default=2, help="Archivos grandes (default 2)")
+    parser.add_argument("--large-size-mb", type=int, default=2048, help="Tamaño de cada archivo grande (default 2048 MB)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[DEFAULT_HASH_WORKERS],
+                        help=f"Hilos a comparar contra 1 (default {DEFAULT_HASH_WORKERS})")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--dir", type=Path, default=None,
+                        help="Directorio donde crear el árbol (default: temporal del sistema)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmpdir:
+        root = Path(tmpdir) / "bench"
+        total = synthetic_tree(
+            root, args.small_count, args.small_size_kb * 1024, args.large_count, args.large_size_mb * 1024 * 1024
+        )
+        print(f"Árbol: {args.small_count} x {args.small_size_kb} KB + {args.large_count} x {args.large_size_mb} MB "
+              f"({total / (1024 * 1024):.0f} MB)")
+
+        # Calentamiento: page cache y primera importación
+        collect_files(root, "https://hq.bitstation.local/api/v1/tools/", "bench", "1.0.0", workers=1)
+
+        serial = time_collect(root, 1, args.repeat)
+        print(f"\n{'hilos':>6} {'tiempo (s)':>11} {'MB/s':>9} {'speedup':>8}")
+        print(f"{1:>6} {serial:>11.2f} {total / (1024 * 1024) / serial:>9.0f} {1.0:>7.2f}x")
+        for workers in args.workers:
+            elapsed = time_collect(root, workers, args.repeat)
+            print(f"{workers:>6} {elapsed:>11.2f} {total / (1024 * 1024) / elapsed:>9.0f} {serial / elapsed:>7.2f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
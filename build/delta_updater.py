@@ -8,24 +8,49 @@ El updater reporta estadísticas detalladas: archivos descargados, verificados,
 
 import hashlib
 import json
+import os
 import shutil
 import tempfile
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple, Union
 from urllib.request import urlretrieve, urlopen
 from urllib.error import URLError, HTTPError
 
 # Importar downloader inyectable
 try:
-    from file_downloader import FileDownloader, HTTPDownloader
+    from file_downloader import FileDownloader, HTTPDownloader, segment_state_path
+    from file_hashing import DEFAULT_HASH_THREADS, SHA256, ContentHasher, available_algs, digest_alg, entry_digest, hash_file
+    from file_linker import STRATEGIES as LINK_STRATEGIES, materialize_file
+    from file_packs import MIN_MEMBERS_TO_FETCH, PACK_SUFFIX, split_pack
+    from hash_cache import HashCache
+    from manifest_patch import apply_patch, version_key
+    from object_store import ObjectStore
+    from remote_zip import RemoteZip
+    from chunking import index_chunks, missing_ranges
+    from staging_journal import StagingJournal
+    from bandwidth_limiter import configure_bandwidth
+    from transport_compression import SUFFIXES as COMPRESSED_SUFFIXES, available_encodings, decompress_file
 except ImportError:
     # Fallback si se ejecuta standalone
     import sys
     sys.path.insert(0, str(Path(__file__).parent))
-    from file_downloader import FileDownloader, HTTPDownloader
+    from file_downloader import FileDownloader, HTTPDownloader, segment_state_path
+    from file_hashing import DEFAULT_HASH_THREADS, SHA256, ContentHasher, available_algs, digest_alg, entry_digest, hash_file
+    from file_linker import STRATEGIES as LINK_STRATEGIES, materialize_file
+    from file_packs import MIN_MEMBERS_TO_FETCH, PACK_SUFFIX, split_pack
+    from hash_cache import HashCache
+    from manifest_patch import apply_patch, version_key
+    from object_store import ObjectStore
+    from remote_zip import RemoteZip
+    from chunking import index_chunks, missing_ranges
+    from staging_journal import StagingJournal
+    from bandwidth_limiter import configure_bandwidth
+    from transport_compression import SUFFIXES as COMPRESSED_SUFFIXES, available_encodings, decompress_file
 
 
 @dataclass
@@ -36,6 +61,29 @@ class UpdateStats:
     files_deleted: int = 0
     files_skipped: int = 0
     bytes_downloaded: int = 0
+    # FASE 2: cómo se materializaron los archivos sin cambios
+    files_reflinked: int = 0
+    files_hardlinked: int = 0
+    files_copied: int = 0
+    bytes_reused: int = 0
+    # FASE 3: verificaciones resueltas por la caché de hashes (sin releer el archivo)
+    files_hash_cached: int = 0
+    # FASE 1: archivos obtenidos del almacén de objetos compartido (sin descarga)
+    files_from_store: int = 0
+    bytes_from_store: int = 0
+    # FASE 1: archivos reconstruidos por chunks (delta binario)
+    files_chunk_patched: int = 0
+    bytes_saved_by_chunks: int = 0
+    # FASE 1: archivos ya completos en un staging interrumpido (journal)
+    files_resumed: int = 0
+    # FASE 1: archivos descargados como variante comprimida de transporte
+    files_decompressed: int = 0
+    bytes_saved_by_compression: int = 0
+    # FASE 1: packs de archivos pequeños descargados y archivos extraídos de ellos
+    packs_downloaded: int = 0
+    files_unpacked: int = 0
+    # FASE 1: archivos fríos que se descargan en segundo plano tras activar (progresivo)
+    files_deferred: int = 0
     errors: List[str] = field(default_factory=list)
     
     def report(self) -> str:
@@ -45,12 +93,46 @@ class UpdateStats:
             "  REPORTE DE ACTUALIZACION DIFERENCIAL",
             "========================================================",
             f"  [DL]  Archivos descargados:  {self.files_downloaded}",
-            f"  [OK]  Archivos verificados:  {self.files_verified}",
+            f"  [OK]  Archivos verificados:  {self.files_verified} ({self.files_hash_cached} desde cache)",
             f"  [DEL] Archivos eliminados:   {self.files_deleted}",
             f"  [SKIP] Archivos sin cambios:  {self.files_skipped}",
             f"  [DATA] Datos descargados:     {self._format_bytes(self.bytes_downloaded)}",
         ]
         
+        if self.files_resumed:
+            lines.append(f"  [RES] Reanudados de staging:  {self.files_resumed}")
+        
+        if self.packs_downloaded:
+            lines.append(f"  [PACK] Packs descargados:     {self.packs_downloaded} ({self.files_unpacked} archivos)")
+        
+        if self.files_deferred:
+            lines.append(f"  [BG]  Fríos en segundo plano: {self.files_deferred}")
+        
+        if self.files_from_store:
+            lines.append(
+                f"  [CAS] Desde almacén local:   {self.files_from_store} "
+                f"({self._format_bytes(self.bytes_from_store)} sin descargar)"
+            )
+        
+        if self.files_chunk_patched:
+            lines.append(
+                f"  [CHNK] Delta por chunks:      {self.files_chunk_patched} archivos "
+                f"({self._format_bytes(self.bytes_saved_by_chunks)} ahorrados vs descarga completa)"
+            )
+        
+        if self.files_decompressed:
+            lines.append(
+                f"  [CMP] Transporte comprimido:  {self.files_decompressed} archivos "
+                f"({self._format_bytes(self.bytes_saved_by_compression)} ahorrados)"
+            )
+        
+        if self.files_skipped:
+            lines.append(
+                f"  [LINK] Reutilizados:          reflink={self.files_reflinked} "
+                f"hardlink={self.files_hardlinked} copia={self.files_copied} "
+                f"({self._format_bytes(self.bytes_reused)})"
+            )
+        
         if self.errors:
             lines.append(f"  [WARN] Errores:               {len(self.errors)}")
             for err in self.errors[:3]:  # Mostrar solo primeros 3
@@ -69,6 +151,18 @@ class UpdateStats:
         return f"{size:.2f} TB"
 
 
+def index_manifest(manifest: Optional[Dict]) -> Dict[str, Dict]:
+    """
+    Construye el índice path → entrada de files[] de un manifiesto.
+    
+    Se construye una sola vez por actualización y lo comparten compute_diff,
+    la fase de descarga y la de verificación (búsquedas O(1) por path).
+    """
+    if not manifest:
+        return {}
+    return {f["path"]: f for f in manifest.get("files", [])}
+
+
 @dataclass
 class FileStatus:
     """Estado de un archivo en el proceso de actualización."""
@@ -89,8 +183,11 @@ class DeltaUpdater:
         v2.4.1/           (release activo)
           manifest.json
           payload/        (archivos de la tool)
+        v2.4.0/           (releases anteriores conservadas para rollback)
         .staging/         (área temporal para nuevas releases)
+        .trash/           (releases retiradas, se borran en segundo plano)
       current.txt         (apunta a la versión activa, ej: "v2.4.1")
+      pending.json        (archivos fríos aún no descargados de la release activa)
       venv/               (NO se toca)
       cache/              (NO se toca)
       user_data/          (NO se toca)
@@ -99,17 +196,77 @@ class DeltaUpdater:
     
     PROTECTED_DIRS = {"venv", ".venv", "cache", "user_data", "logs"}
     
-    def __init__(self, tool_root: Path, downloader: Optional[FileDownloader] = None):
+    # Descargas simultáneas por defecto en FASE 1
+    DEFAULT_MAX_WORKERS = 8
+    
+    # Releases conservadas por defecto: la activa + una para rollback
+    DEFAULT_KEEP_RELEASES = 2
+    
+    def __init__(
+        self,
+        tool_root: Path,
+        downloader: Optional[FileDownloader] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        link_strategies: Tuple[str, ...] = LINK_STRATEGIES,
+        paranoid: bool = False,
+        object_store: Optional[ObjectStore] = None,
+        zip_workers: int = 1,
+        keep_releases: int = DEFAULT_KEEP_RELEASES,
+        progressive: bool = False,
+        hash_threads: int = DEFAULT_HASH_THREADS
+    ):
         """
         Args:
             tool_root: Raíz de la tool
             downloader: Downloader inyectable (si None, usa HTTPDownloader por default)
+            max_workers: Máximo de descargas concurrentes en FASE 1 (1 = secuencial)
+            link_strategies: Orden de estrategias para reutilizar archivos sin cambios
+                en FASE 2 (default: reflink → hardlink → copy; ("copy",) desactiva links)
+            paranoid: Si True, FASE 3 ignora la caché de hashes y re-hashea todo
+            object_store: Almacén de objetos compartido opcional (ej: ObjectStore(tools_base / ".objects")).
+                Si se indica, los blobs ya presentes no se descargan y las releases
+                quedan como árboles de links hacia el almacén.
+            zip_workers: Hilos para la extracción verificada en modo ZIP (fallback)
+            keep_releases: Releases conservadas en disco (incluida la activa); las
+                anteriores permiten rollback() sin descargar nada
+            progressive: Si True, se activa en cuanto los archivos calientes están
+                verificados y los fríos ("hot": false) se descargan en segundo plano
+            hash_threads: Hilos por archivo al verificar hashes sha256-tree / blake3
+                (manifest v2); sha256 (v1) siempre usa un hilo por archivo
         """
+        if max_workers < 1:
+            raise ValueError("max_workers debe ser >= 1")
+        if zip_workers < 1:
+            raise ValueError("zip_workers debe ser >= 1")
+        if keep_releases < 1:
+            raise ValueError("keep_releases debe ser >= 1")
+        if hash_threads < 1:
+            raise ValueError("hash_threads debe ser >= 1")
+        
         self.tool_root = tool_root
         self.releases_dir = tool_root / "releases"
         self.staging_dir = self.releases_dir / ".staging"
+        self.trash_dir = self.releases_dir / ".trash"
         self.current_file = tool_root / "current.txt"
+        self.pending_file = tool_root / "pending.json"
         self.downloader = downloader or HTTPDownloader()
+        self.max_workers = max_workers
+        self.link_strategies = tuple(link_strategies)
+        self.paranoid = paranoid
+        # Caché persistente de hashes junto a current.txt
+        self.hash_cache = HashCache(tool_root)
+        self.object_store = object_store
+        self.zip_workers = zip_workers
+        # Journal del staging de la actualización en curso (None fuera de update_from_zip)
+        self.journal: Optional[StagingJournal] = None
+        self.keep_releases = keep_releases
+        # Borrado en segundo plano de releases retiradas y staging (ver retire_releases)
+        self._cleanup_thread: Optional[threading.Thread] = None
+        self.progressive = progressive
+        # Descarga en segundo plano de archivos fríos (ver fetch_pending)
+        self._pending_thread: Optional[threading.Thread] = None
+        self.pending_stats: Optional[UpdateStats] = None
+        self.hash_threads = hash_threads
         
     def get_current_version(self) -> Optional[str]:
         """Obtiene la versión actualmente instalada."""
@@ -129,6 +286,310 @@ class DeltaUpdater:
         
         return json.loads(manifest_path.read_text(encoding="utf-8"))
     
+    def list_releases(self) -> List[str]:
+        """Releases instaladas (con manifest.json), de la más antigua a la más nueva."""
+        if not self.releases_dir.exists():
+            return []
+        releases = [
+            p.name for p in self.releases_dir.iterdir()
+            if p.is_dir() and not p.name.startswith(".") and (p / "manifest.json").exists()
+        ]
+        return sorted(releases, key=lambda name: version_key(name.lstrip("v")))
+    
+    def activate(self, version: str) -> str:
+        """
+        Activa una release ya instalada reescribiendo current.txt de forma atómica.
+        
+        No copia ni verifica archivos: la release se verificó al instalarse.
+        
+        Args:
+            version: "1.2.0" o "v1.2.0"
+        
+        Returns:
+            Nombre de la release activada (ej: "v1.2.0")
+        
+        Raises:
+            ValueError: si la release no está instalada
+        """
+        release = version if version.startswith("v") else f"v{version}"
+        if not (self.releases_dir / release / "manifest.json").exists():
+            raise ValueError(f"Release no instalada: {release}")
+        
+        # tmp + rename: current.txt nunca queda vacío ni a medio escribir
+        tmp_path = self.current_file.with_name(self.current_file.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            f.write(release)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.current_file)
+        return release
+    
+    def rollback(self) -> str:
+        """
+        Vuelve a la release conservada inmediatamente anterior a la activa.
+        
+        Returns:
+            Nombre de la release activada
+        
+        Raises:
+            RuntimeError: si no hay versión instalada o ninguna release anterior conservada
+        """
+        current = self.get_current_version()
+        if not current:
+            raise RuntimeError("No hay versión instalada")
+        
+        current_key = version_key(current.lstrip("v"))
+        older = [r for r in self.list_releases() if version_key(r.lstrip("v")) < current_key]
+        if not older:
+            raise RuntimeError(f"No hay release anterior a {current} conservada para rollback")
+        
+        release = self.activate(older[-1])
+        print(f"[updater] Rollback: {current} -> {release}")
+        return release
+    
+    def _move_to_trash(self, path: Path) -> bool:
+        """Retira un directorio con un rename (O(1)); el borrado real es en segundo plano."""
+        self.trash_dir.mkdir(parents=True, exist_ok=True)
+        target = Path(tempfile.mkdtemp(prefix=f"{path.name.lstrip('.')}-", dir=self.trash_dir))
+        try:
+            os.replace(path, target)
+            return True
+        except OSError as e:
+            # p. ej. archivos abiertos en Windows: se reintenta en la próxima limpieza
+            target.rmdir()
+            print(f"[updater]   WARN: no se pudo retirar {path.name}: {e}")
+            return False
+    
+    @staticmethod
+    def _purge(paths: List[Path]) -> None:
+        for path in paths:
+            shutil.rmtree(path, ignore_errors=True)
+    
+    def retire_releases(self, tool_id: str) -> List[str]:
+        """
+        Retira las releases fuera de la retención y el staging, y los borra en
+        un hilo en segundo plano (wait_cleanup() espera a que termine).
+        
+        Se conservan la release activa y las más nuevas hasta keep_releases.
+        
+        Returns:
+            Releases retiradas
+        """
+        current = self.get_current_version()
+        releases = self.list_releases()
+        keep = {current} if current else set()
+        for release in reversed(releases):
+            if len(keep) >= self.keep_releases:
+                break
+            keep.add(release)
+        
+        retired = []
+        for release in releases:
+            if release in keep:
+                continue
+            if self._move_to_trash(self.releases_dir / release):
+                self.hash_cache.drop_prefix(self.releases_dir / release)
+                if self.object_store:
+                    self.object_store.remove_ref(tool_id, release)
+                retired.append(release)
+        
+        if self.staging_dir.exists():
+            self._move_to_trash(self.staging_dir)
+        self.hash_cache.drop_prefix(self.staging_dir)
+        
+        # Incluye restos de limpiezas interrumpidas
+        if self.trash_dir.exists():
+            pending = list(self.trash_dir.iterdir())
+            if pending:
+                self._cleanup_thread = threading.Thread(
+                    target=self._purge, args=(pending,), name=f"release-cleanup-{tool_id}"
+                )
+                self._cleanup_thread.start()
+        return retired
+    
+    def wait_cleanup(self, timeout: Optional[float] = None) -> bool:
+        """Espera al borrado en segundo plano. Retorna True si terminó."""
+        thread = self._cleanup_thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+    
+    def pending_files(self) -> List[str]:
+        """Archivos fríos de la release activa que todavía no están descargados."""
+        if not self.pending_file.exists():
+            return []
+        pending = json.loads(self.pending_file.read_text(encoding="utf-8"))
+        if pending.get("release") != self.get_current_version():
+            return []
+        return pending["files"]
+    
+    def _write_pending(self, release: str, paths: List[str]) -> None:
+        tmp_path = self.pending_file.with_name(self.pending_file.name + ".tmp")
+        tmp_path.write_text(json.dumps({"release": release, "files": sorted(paths)}, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.pending_file)
+    
+    def fetch_pending(self) -> UpdateStats:
+        """
+        Descarga y verifica los archivos fríos pendientes de la release activa.
+        
+        Se ejecuta en segundo plano tras una activación progresiva; si falla,
+        pending.json se conserva y puede volver a llamarse más tarde.
+        """
+        stats = UpdateStats()
+        release = self.get_current_version()
+        paths = self.pending_files()
+        if not paths:
+            return stats
+        
+        manifest = self.get_current_manifest()
+        target_index = index_manifest(manifest)
+        release_dir = self.releases_dir / release
+        to_fetch = [
+            FileStatus(path=path, status="download", target_hash=entry_digest(target_index[path]),
+                       size=target_index[path]["size"])
+            for path in paths
+        ]
+        
+        print(f"[updater] Segundo plano: {len(to_fetch)} archivos fríos de {release}")
+        to_fetch = self.materialize_from_store(to_fetch, release_dir, stats)
+        if to_fetch:
+            self.download_files(self.plan_downloads(to_fetch, target_index), release_dir, stats)
+        
+        done = [path for path in paths if self.verify_file(release_dir / path, entry_digest(target_index[path]), stats)]
+        stats.files_verified = len(done)
+        if self.object_store:
+            for path in done:
+                self.object_store.ingest(release_dir / path, entry_digest(target_index[path]))
+        
+        remaining = sorted(set(paths) - set(done))
+        if remaining:
+            self._write_pending(release, remaining)
+            print(f"[updater]   [FAIL] {len(remaining)} archivos fríos pendientes (se reintentará)")
+        elif self.get_current_version() == release:
+            self.pending_file.unlink(missing_ok=True)
+            print(f"[updater]   [OK] Release completa: {release}")
+        self.hash_cache.save()
+        self.pending_stats = stats
+        return stats
+    
+    def wait_pending(self, timeout: Optional[float] = None) -> bool:
+        """Espera a la descarga de archivos fríos. Retorna True si terminó."""
+        thread = self._pending_thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+    
+    def apply_manifest_patch(self, patch: Dict) -> Dict:
+        """
+        Reconstruye el manifiesto objetivo aplicando un parche (ver manifest_patch)
+        al manifiesto instalado, sin descargar el manifiesto completo.
+        
+        Returns:
+            Manifiesto objetivo con su manifest_hash verificado
+        
+        Raises:
+            ValueError: si no hay instalación, el parche es de otra versión base
+                o el resultado no coincide con el manifest_hash publicado
+        """
+        current_manifest = self.get_current_manifest()
+        if not current_manifest:
+            raise ValueError("No hay versión instalada a la que aplicar el parche")
+        
+        target_manifest = apply_patch(current_manifest, patch)
+        print(
+            f"[updater] Parche {patch['from_version']} -> {patch['to_version']} aplicado: "
+            f"+{len(patch['added'])} ~{len(patch['changed'])} -{len(patch['removed'])} "
+            f"(manifest_hash {target_manifest['manifest_hash'][:16]}... verificado)"
+        )
+        return target_manifest
+    
+    def update_from_patch(
+        self,
+        patch: Dict,
+        zip_path: Optional[Path] = None,
+        asset_url: Optional[str] = None,
+        asset_sha256: Optional[str] = None
+    ) -> UpdateStats:
+        """
+        Actualiza la tool a partir de un parche de manifiesto.
+        
+        El conjunto de descargas sale del diff contra el manifiesto reconstruido;
+        zip_path o asset_url (con el asset_sha256 del catálogo) solo hacen falta
+        si el manifiesto no tiene URLs individuales.
+        """
+        return self.update_from_zip(
+            zip_path, self.apply_manifest_patch(patch), asset_url=asset_url, asset_sha256=asset_sha256
+        )
+    
+    @staticmethod
+    def read_zip_json(zip_path: Union[Path, RemoteZip], name: str) -> Optional[Dict]:
+        """JSON de un miembro del ZIP (local o RemoteZip), o None si no existe."""
+        try:
+            if isinstance(zip_path, RemoteZip):
+                data = zip_path.read(name)
+            else:
+                with zipfile.ZipFile(zip_path, 'r') as zf:
+                    data = zf.read(name)
+        except KeyError:
+            return None
+        return json.loads(data.decode('utf-8'))
+    
+    def select_delta(self, deltas: List[Dict], full_size: Optional[int] = None) -> Optional[Dict]:
+        """
+        Elige el archivo delta más pequeño aplicable a la instalación actual.
+        
+        Un delta (entrada "deltas" del catálogo de pack_tools.py) es aplicable si
+        su base_manifest_hash es el del manifiesto instalado y no quedan archivos
+        fríos pendientes (el delta no los trae). None si ninguno sirve, o si no
+        es más pequeño que el ZIP completo (full_size, "size" del catálogo): se
+        usa el ZIP completo o las URLs individuales.
+        """
+        current_manifest = self.get_current_manifest()
+        if not current_manifest or self.pending_files():
+            return None
+        applicable = [
+            d for d in deltas
+            if d.get("base_manifest_hash") == current_manifest.get("manifest_hash")
+            and (full_size is None or d["size"] < full_size)
+        ]
+        return min(applicable, key=lambda d: d["size"], default=None)
+    
+    def update_from_delta(self, zip_path: Union[Path, RemoteZip]) -> UpdateStats:
+        """
+        Actualiza desde un archivo delta_<tool>_<base>_to_<version>.zip.
+        
+        El delta solo trae los archivos añadidos o cambiados desde su versión
+        base: el resto sale de la release instalada (FASE 2). Los archivos se
+        extraen del ZIP aunque el manifiesto tenga URLs, así que sirve sin red.
+        
+        Raises:
+            ValueError: si el ZIP no es un delta, la base no es la versión
+                instalada o el manifiesto no coincide con el manifest_hash del delta
+        """
+        info = self.read_zip_json(zip_path, "delta.json")
+        if info is None:
+            raise ValueError("El ZIP no es un archivo delta (falta delta.json)")
+        current_manifest = self.get_current_manifest()
+        if not current_manifest or current_manifest.get("manifest_hash") != info["base_manifest_hash"]:
+            raise ValueError(
+                f"El delta es para la versión {info['from_version']} y la instalada es "
+                f"{self.get_current_version() or 'ninguna'}"
+            )
+        if self.pending_files():
+            raise ValueError("Hay archivos fríos pendientes: el delta no los incluye")
+        
+        target_manifest = self.read_zip_json(zip_path, "manifest.json")
+        if not target_manifest or target_manifest.get("manifest_hash") != info["manifest_hash"]:
+            raise ValueError("manifest.json del delta no coincide con su manifest_hash")
+        
+        print(
+            f"[updater] Delta {info['from_version']} -> {info['to_version']}: "
+            f"{len(info['files'])} archivos en el ZIP"
+        )
+        return self.update_from_zip(zip_path, target_manifest, use_urls=False)
+    
     def sha256_file(self, path: Path) -> str:
         """Calcula SHA256 de un archivo."""
         h = hashlib.sha256()
@@ -137,32 +598,76 @@ class DeltaUpdater:
                 h.update(chunk)
         return h.hexdigest()
     
-    def compute_diff(self, current_manifest: Optional[Dict], target_manifest: Dict) -> List[FileStatus]:
+    def file_digest(self, path: Path, alg: str = SHA256) -> str:
+        """
+        Digest de un archivo con el algoritmo indicado (ver file_hashing).
+        
+        sha256-tree y blake3 reparten un archivo grande entre hash_threads hilos.
+        """
+        if alg == SHA256:
+            return self.sha256_file(path)
+        return hash_file(path, alg, self.hash_threads)
+    
+    def local_digest(self, path: Path, alg: str) -> Optional[str]:
+        """Digest de un archivo instalado con otro algoritmo (caché de hashes o re-hash); None si no existe."""
+        cached = self.hash_cache.lookup(path, alg)
+        if cached is not None:
+            return cached
+        if not path.is_file():
+            return None
+        digest = self.file_digest(path, alg)
+        self.hash_cache.record(path, digest)
+        return digest
+    
+    def compute_diff(
+        self,
+        current_manifest: Optional[Dict],
+        target_manifest: Dict,
+        target_index: Optional[Dict[str, Dict]] = None
+    ) -> List[FileStatus]:
         """
         Calcula diferencias entre versión actual y objetivo.
         Retorna lista de FileStatus indicando qué hacer con cada archivo.
+        
+        Args:
+            current_manifest: Manifiesto instalado (None si no hay instalación)
+            target_manifest: Manifiesto objetivo
+            target_index: Índice path → entrada del objetivo (ver index_manifest).
+                Si es None se construye aquí.
+        
+        Complejidad O(n) en el número de archivos de ambos manifiestos.
+        
+        Si un archivo cambia de algoritmo de hash entre versiones (manifest v1 →
+        v2), el archivo instalado se re-hashea con el del objetivo en vez de
+        darlo por modificado.
         """
         diff = []
         
+        if target_index is None:
+            target_index = index_manifest(target_manifest)
+        
         # Crear índice de archivos actuales
-        current_files = {}
-        if current_manifest:
-            for f in current_manifest.get("files", []):
-                current_files[f["path"]] = f["sha256"]
+        current_files = index_manifest(current_manifest)
+        current_version = self.get_current_version() if current_files else None
         
         # Analizar archivos del target
-        for target_file in target_manifest.get("files", []):
-            path = target_file["path"]
-            target_hash = target_file["sha256"]
+        for path, target_file in target_index.items():
+            target_hash = entry_digest(target_file)
             size = target_file["size"]
+            current_file = current_files.get(path)
             
-            if path in current_files:
-                if current_files[path] == target_hash:
+            if current_file is not None:
+                current_hash = entry_digest(current_file)
+                target_alg = digest_alg(target_hash)
+                if current_version and current_hash != target_hash and digest_alg(current_hash) != target_alg:
+                    current_hash = self.local_digest(self.releases_dir / current_version / path, target_alg) or current_hash
+                
+                if current_hash == target_hash:
                     # Archivo sin cambios
                     diff.append(FileStatus(
                         path=path,
                         status="skip",
-                        current_hash=current_files[path],
+                        current_hash=current_hash,
                         target_hash=target_hash,
                         size=size
                     ))
@@ -171,7 +676,7 @@ class DeltaUpdater:
                     diff.append(FileStatus(
                         path=path,
                         status="download",
-                        current_hash=current_files[path],
+                        current_hash=current_hash,
                         target_hash=target_hash,
                         size=size
                     ))
@@ -185,19 +690,29 @@ class DeltaUpdater:
                 ))
         
         # Archivos a eliminar (existen en current pero no en target)
-        if current_manifest:
-            target_paths = {f["path"] for f in target_manifest.get("files", [])}
-            for current_file in current_manifest.get("files", []):
-                path = current_file["path"]
-                if path not in target_paths:
-                    diff.append(FileStatus(
-                        path=path,
-                        status="delete",
-                        current_hash=current_file["sha256"]
-                    ))
+        for path, current_file in current_files.items():
+            if path not in target_index:
+                diff.append(FileStatus(
+                    path=path,
+                    status="delete",
+                    current_hash=entry_digest(current_file)
+                ))
         
         return diff
     
+    def plan_downloads(
+        self,
+        to_download: List[FileStatus],
+        target_index: Dict[str, Dict]
+    ) -> List[Tuple[FileStatus, Optional[Dict]]]:
+        """
+        Asocia cada archivo a descargar con su entrada del manifest objetivo.
+        
+        Returns:
+            Lista de (FileStatus, entrada del manifest o None)
+        """
+        return [(status, target_index.get(status.path)) for status in to_download]
+    
     def download_file_from_url(
         self,
         url: str,
@@ -211,7 +726,7 @@ class DeltaUpdater:
         Args:
             url: URL del archivo
             target_path: Ruta destino
-            expected_sha256: Hash esperado (para verificación)
+            expected_sha256: Digest esperado (para verificación; ver file_hashing)
             expected_size: Tamaño esperado (para progreso)
         
         Returns:
@@ -224,50 +739,592 @@ class DeltaUpdater:
                 if downloaded == total:
                     print(f"[updater]     {target_path.name}: 100% ({downloaded} bytes)")
         
-        # Usar downloader inyectable (con resume support)
-        return self.downloader.download(
-            url=url,
-            target_path=target_path,
-            expected_sha256=expected_sha256,
-            resume=True,  # Siempre intentar resume
-            progress_callback=progress if expected_size and expected_size > 10*1024*1024 else None
-        )
+        # Descargar a <archivo>.part: si se interrumpe, el siguiente intento reanuda con Range
+        part_path = target_path.with_name(target_path.name + ".part")
+        had_partial = part_path.exists()
+        
+        # Parcial ya completo (interrupción entre descarga y rename). Una descarga
+        # segmentada a medias tiene el tamaño final (preasignado): no se hashea
+        if (had_partial and expected_sha256 and expected_size is not None
+                and not segment_state_path(part_path).exists()
+                and part_path.stat().st_size == expected_size
+                and self.file_digest(part_path, digest_alg(expected_sha256)) == expected_sha256):
+            os.replace(part_path, target_path)
+            return True
+        
+        def fetch() -> bool:
+            # Usar downloader inyectable (con resume support)
+            return self.downloader.download(
+                url=url,
+                target_path=part_path,
+                expected_sha256=expected_sha256,
+                resume=True,  # Siempre intentar resume
+                progress_callback=progress if expected_size and expected_size > 10*1024*1024 else None
+            )
+        
+        ok = fetch()
+        if not ok and had_partial and not part_path.exists():
+            # El parcial previo estaba corrupto (el downloader lo descartó): reintentar desde cero
+            ok = fetch()
+        
+        if ok:
+            os.replace(part_path, target_path)
+        return ok
+    
+    def resume_from_journal(
+        self,
+        completed: Dict[str, Dict],
+        to_download: List[FileStatus],
+        staging_release: Path,
+        stats: UpdateStats
+    ) -> List[FileStatus]:
+        """
+        Descarta de la lista de descarga los archivos que un intento previo dejó
+        completos en staging (según el journal), revalidando su hash.
+        
+        Los archivos registrados pero modificados o corruptos se eliminan y se
+        vuelven a descargar. Los .part de descargas interrumpidas se conservan.
+        
+        Returns:
+            Archivos que todavía hay que descargar
+        """
+        remaining = []
+        for status in to_download:
+            entry = completed.get(status.path)
+            staged = staging_release / status.path
+            if (entry is not None
+                    and entry.get("sha256") == status.target_hash
+                    and self.journal.is_intact(entry)
+                    and self.verify_file(staged, status.target_hash)):
+                stats.files_resumed += 1
+                continue
+            
+            if staged.exists():
+                staged.unlink()
+            remaining.append(status)
+        
+        return remaining
+    
+    def materialize_from_store(
+        self,
+        to_download: List[FileStatus],
+        staging_release: Path,
+        stats: UpdateStats
+    ) -> List[FileStatus]:
+        """
+        Materializa en staging los archivos cuyo blob ya está en el almacén de objetos
+        (aunque provenga de otra tool) en lugar de descargarlos.
+        
+        Cada archivo materializado se verifica (el hash queda en la caché para
+        FASE 3): un blob que no coincide se elimina del almacén y el archivo se
+        descarga normalmente.
+        
+        Returns:
+            Archivos que todavía hay que descargar
+        """
+        if self.object_store is None:
+            return to_download
+        
+        remaining = []
+        for status in to_download:
+            if not status.target_hash or not self.object_store.has(status.target_hash):
+                remaining.append(status)
+                continue
+            
+            dst = staging_release / status.path
+            try:
+                self.object_store.materialize(status.target_hash, dst)
+            except OSError as e:
+                # Blob recolectado en paralelo o ilegible: se descarga normalmente
+                print(f"[updater]     WARN: blob no disponible para {status.path}: {e}")
+                dst.unlink(missing_ok=True)
+                remaining.append(status)
+                continue
+            
+            if not self.verify_file(dst, status.target_hash):
+                print(f"[updater]     WARN: blob corrupto para {status.path}, se elimina del almacén y se descarga")
+                dst.unlink(missing_ok=True)
+                self.object_store.discard(status.target_hash)
+                remaining.append(status)
+                continue
+            
+            stats.files_from_store += 1
+            stats.bytes_from_store += status.size
+            if self.journal:
+                self.journal.record(status.path, status.target_hash)
+        
+        return remaining
+    
+    def download_from_packs(
+        self,
+        to_download: List[FileStatus],
+        target_manifest: Dict,
+        staging_release: Path,
+        stats: UpdateStats,
+        exclude: Optional[Set[str]] = None
+    ) -> List[FileStatus]:
+        """
+        Descarga los packs de archivos pequeños que cubren varios de los archivos
+        necesarios y los reparte en staging, verificando el hash de cada archivo.
+        
+        Los packs se descargan en paralelo (max_workers), verificados contra su
+        sha256. Un pack que falla no aborta: sus archivos siguen en la lista y se
+        descargan por su URL individual.
+        
+        Args:
+            exclude: Paths que no deben salir de packs (p. ej. fríos diferidos)
+        
+        Returns:
+            Archivos que todavía hay que descargar
+        """
+        needed = {status.path: status for status in to_download if status.path not in (exclude or ())}
+        selected = []
+        for pack in target_manifest.get("packs", []):
+            wanted = {m["path"]: needed[m["path"]].target_hash for m in pack["files"] if m["path"] in needed}
+            if len(wanted) >= MIN_MEMBERS_TO_FETCH:
+                selected.append((pack, wanted))
+                for path in wanted:
+                    needed.pop(path)
+        if not selected:
+            return to_download
+        
+        packs_dir = staging_release / ".packs"
+        
+        def fetch(pack: Dict, wanted: Dict[str, str]) -> Tuple[bool, List[str]]:
+            pack_path = packs_dir / f"{pack['sha256']}{PACK_SUFFIX}"
+            pack_path.parent.mkdir(parents=True, exist_ok=True)
+            if not self.download_file_from_url(pack["url"], pack_path, pack["sha256"], pack["size"]):
+                return False, []
+            try:
+                extracted, corrupt = split_pack(pack_path, pack, wanted, staging_release)
+            finally:
+                pack_path.unlink(missing_ok=True)
+            for path in corrupt:
+                print(f"[updater]     WARN: {path} no coincide con su hash dentro del pack")
+            return True, extracted
+        
+        done: Set[str] = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [(pack, wanted, pool.submit(fetch, pack, wanted)) for pack, wanted in selected]
+            for pack, wanted, future in futures:
+                try:
+                    ok, extracted = future.result()
+                except Exception as e:
+                    print(f"[updater]     ERROR descargando pack {pack['sha256'][:16]}...: {e}")
+                    ok, extracted = False, []
+                if not ok:
+                    print(f"[updater]     WARN: pack {pack['sha256'][:16]}... no disponible, descarga individual")
+                    continue
+                stats.packs_downloaded += 1
+                stats.bytes_downloaded += pack["size"]
+                for path in extracted:
+                    self.hash_cache.record(staging_release / path, wanted[path])
+                    if self.journal:
+                        self.journal.record(path, wanted[path])
+                    done.add(path)
+        
+        if packs_dir.exists():
+            shutil.rmtree(packs_dir, ignore_errors=True)
+        stats.files_unpacked += len(done)
+        stats.files_downloaded += len(done)
+        return [status for status in to_download if status.path not in done]
+    
+    def download_files(
+        self,
+        jobs: List[Tuple[FileStatus, Optional[Dict]]],
+        staging_release: Path,
+        stats: UpdateStats,
+        current_release_dir: Optional[Path] = None,
+        local_chunks: Optional[Dict] = None
+    ) -> int:
+        """
+        Descarga en paralelo (pool acotado a max_workers) los archivos indicados a staging.
+        
+        Cada descarga verifica su hash dentro del downloader. Las estadísticas se
+        actualizan solo desde el hilo llamador, por lo que los contadores son exactos.
+        Ante el primer fallo se cancelan las descargas que aún no comenzaron.
+        
+        Args:
+            jobs: Lista de (FileStatus, entrada del manifest objetivo)
+            staging_release: Directorio de staging de la release
+            stats: Estadísticas a actualizar
+            current_release_dir: Release instalada (origen de chunks reutilizables)
+            local_chunks: Índice de chunks de la release instalada (ver chunking.index_chunks)
+        
+        Returns:
+            Número de archivos que no se pudieron descargar
+        """
+        failed = 0
+        
+        def fetch(status: FileStatus, file_info: Dict) -> Tuple[bool, int, str]:
+            """Retorna (ok, bytes transferidos, modo: "chunks" | "compressed" | "full")."""
+            target_path = staging_release / status.path
+            if local_chunks and current_release_dir and file_info.get("chunks"):
+                fetched = self.download_file_by_chunks(file_info, target_path, current_release_dir, local_chunks)
+                if fetched is not None:
+                    return True, fetched, "chunks"
+            
+            if self.should_use_compressed(file_info):
+                fetched = self.download_file_compressed(file_info, target_path)
+                if fetched is not None:
+                    return True, fetched, "compressed"
+            
+            ok = self.download_file_from_url(
+                file_info["url"],
+                target_path,
+                expected_sha256=entry_digest(file_info),
+                expected_size=file_info.get("size")
+            )
+            return ok, status.size if ok else 0, "full"
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {}
+            for status, file_info in jobs:
+                if not file_info or not file_info.get("url"):
+                    stats.errors.append(f"Sin URL para: {status.path}")
+                    failed += 1
+                    continue
+                futures[pool.submit(fetch, status, file_info)] = (status, file_info)
+            
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                
+                status, file_info = futures[future]
+                try:
+                    ok, transferred, mode = future.result()
+                except Exception as e:
+                    print(f"[updater]     ERROR descargando {status.path}: {e}")
+                    ok, transferred, mode = False, 0, "full"
+                
+                if ok:
+                    stats.files_downloaded += 1
+                    stats.bytes_downloaded += transferred
+                    if mode == "chunks":
+                        stats.files_chunk_patched += 1
+                        stats.bytes_saved_by_chunks += status.size - transferred
+                    elif mode == "compressed":
+                        stats.files_decompressed += 1
+                        stats.bytes_saved_by_compression += status.size - transferred
+                    # El downloader verificó el hash durante el streaming: registrarlo
+                    digest = entry_digest(file_info)
+                    self.hash_cache.record(staging_release / status.path, digest)
+                    if self.journal:
+                        self.journal.record(status.path, digest)
+                else:
+                    stats.errors.append(f"No se pudo descargar: {status.path}")
+                    failed += 1
+                    # Abortar: no tiene sentido seguir descargando una release que no se activará
+                    for pending in futures:
+                        pending.cancel()
+        
+        return failed
+    
+    def should_use_compressed(self, file_info: Dict) -> bool:
+        """
+        True si conviene descargar la variante comprimida del archivo: el encoding
+        está disponible y ningún par de la LAN tiene ya el archivo crudo.
+        """
+        variant = file_info.get("compressed")
+        if not variant or not variant.get("url"):
+            return False
+        if variant.get("encoding") not in available_encodings():
+            return False
+        return not self.downloader.has_peer_copy(entry_digest(file_info))
+    
+    def download_file_compressed(self, file_info: Dict, target_path: Path) -> Optional[int]:
+        """
+        Descarga la variante comprimida de un archivo y la descomprime por
+        streaming a staging, verificando el hash del contenido descomprimido.
+        
+        La variante se descarga (verificada por su propio hash y reanudable) a
+        <archivo><sufijo>.transport junto al destino y se elimina al terminar.
+        
+        Returns:
+            Bytes transferidos, o None si hay que descargar el archivo crudo
+        """
+        variant = file_info["compressed"]
+        encoding = variant["encoding"]
+        transport_path = target_path.with_name(target_path.name + COMPRESSED_SUFFIXES[encoding] + ".transport")
+        part_path = target_path.with_name(target_path.name + ".part")
+        
+        try:
+            if not self.download_file_from_url(
+                variant["url"],
+                transport_path,
+                expected_sha256=variant.get("sha256"),
+                expected_size=variant.get("size")
+            ):
+                return None
+            
+            expected = entry_digest(file_info)
+            actual = decompress_file(transport_path, part_path, encoding, digest_alg(expected))
+            if actual != expected:
+                print(f"[updater]     Variante {encoding} de {target_path.name} no coincide; descarga completa")
+                part_path.unlink(missing_ok=True)
+                return None
+            
+            os.replace(part_path, target_path)
+            return variant.get("size", transport_path.stat().st_size)
+        except OSError as e:
+            print(f"[updater]     Variante {encoding} de {target_path.name} inválida ({e}); descarga completa")
+            part_path.unlink(missing_ok=True)
+            return None
+        finally:
+            transport_path.unlink(missing_ok=True)
+    
+    def download_file_by_chunks(
+        self,
+        file_info: Dict,
+        target_path: Path,
+        source_release: Path,
+        local_chunks: Dict
+    ) -> Optional[int]:
+        """
+        Reconstruye un archivo a partir de sus chunks (delta binario).
+        
+        Los chunks presentes en la release instalada se copian desde disco y solo
+        los ausentes se descargan por HTTP Range. Cada chunk se verifica por
+        SHA256 y el archivo final con el hash de su entrada.
+        
+        Args:
+            file_info: Entrada del manifest objetivo (con "chunks")
+            target_path: Ruta destino en staging
+            source_release: Directorio de la release instalada
+            local_chunks: Índice sha256 → (path, offset, size) de la release instalada
+        
+        Returns:
+            Bytes transferidos por red, o None si no aplica o falló
+            (el llamador descarga el archivo completo)
+        """
+        chunks = file_info["chunks"]
+        ranges = missing_ranges(chunks, local_chunks)
+        if sum(length for _, length in ranges) >= file_info["size"]:
+            return None  # Nada que reutilizar
+        
+        range_starts = dict(ranges)
+        tmp_path = target_path.with_name(target_path.name + ".chunks.tmp")
+        tmp_path.parent.mkdir(parents=True, exist_ok=True)
+        sources: Dict[str, object] = {}
+        transferred = 0
+        remote = b""
+        remote_offset = 0
+        expected = entry_digest(file_info)
+        file_hash = ContentHasher.for_digest(expected)
+        
+        try:
+            with tmp_path.open("wb") as out:
+                for chunk in chunks:
+                    local = local_chunks.get(chunk["sha256"])
+                    if local is not None:
+                        src_path, src_offset, size = local
+                        src = sources.get(src_path)
+                        if src is None:
+                            src = sources[src_path] = (source_release / src_path).open("rb")
+                        src.seek(src_offset)
+                        data = src.read(size)
+                    else:
+                        if chunk["offset"] in range_starts:
+                            remote_offset = chunk["offset"]
+                            remote = self.downloader.fetch_range(
+                                file_info["url"], remote_offset, range_starts[remote_offset]
+                            )
+                            transferred += len(remote)
+                        start = chunk["offset"] - remote_offset
+                        data = remote[start:start + chunk["size"]]
+                    
+                    if hashlib.sha256(data).hexdigest() != chunk["sha256"]:
+                        raise ValueError(f"chunk corrupto en offset {chunk['offset']}")
+                    out.write(data)
+                    file_hash.update(data)
+            
+            if file_hash.hexdigest() != expected:
+                raise ValueError("hash final no coincide")
+            
+            tmp_path.replace(target_path)
+            return transferred
+        
+        except (NotImplementedError, OSError, ValueError) as e:
+            print(f"[updater]     WARN: delta por chunks no aplicable a {file_info['path']} ({e}), descarga completa")
+            tmp_path.unlink(missing_ok=True)
+            return None
+        finally:
+            for src in sources.values():
+                src.close()
+    
+    def open_release_asset(self, asset_url: str, expected_sha256: Optional[str] = None) -> Union[RemoteZip, Path]:
+        """
+        Abre el ZIP de la release por URL para el fallback ZIP.
+        
+        Si el servidor acepta HTTP Range retorna un RemoteZip (solo se
+        descargan el directorio central y los miembros necesarios); si no,
+        descarga el asset completo a staging y retorna su ruta (el llamador
+        la elimina al terminar).
+        
+        Args:
+            expected_sha256: sha256 del asset publicado en el catálogo; la
+                descarga completa se verifica contra él
+        """
+        size = self.downloader.range_size(asset_url)
+        if size is not None:
+            return RemoteZip(asset_url, self.downloader, size)
+        
+        print(f"[updater]   El servidor no acepta Range: descargando el asset completo")
+        asset_path = self.staging_dir / ".asset.zip"
+        asset_path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.downloader.download(asset_url, asset_path, expected_sha256=expected_sha256):
+            asset_path.unlink(missing_ok=True)
+            raise RuntimeError(f"No se pudo descargar el asset: {asset_url}")
+        return asset_path
     
-    def download_from_zip(self, zip_path: Path, target_dir: Path, file_list: List[str]) -> int:
+    def download_from_zip(
+        self,
+        zip_path: Union[Path, RemoteZip],
+        target_dir: Path,
+        file_list: List[str],
+        expected_hashes: Optional[Dict[str, str]] = None
+    ) -> int:
         """
         Extrae archivos específicos de un ZIP a un directorio.
         Retorna número de archivos extraídos.
         
+        Cada miembro se copia por streaming a staging calculando su SHA256 en la
+        misma pasada: si el hash no coincide el miembro se rechaza de inmediato y
+        los archivos aceptados quedan en la caché de hashes (FASE 3 no los relee).
+        Con zip_workers > 1 la extracción se reparte entre hilos, cada uno con
+        su propio handle de ZipFile.
+        
+        zip_path puede ser un RemoteZip: cada miembro se pide por HTTP Range y
+        se descomprime y verifica al vuelo, sin descargar el ZIP completo.
+        
         NOTA: Este método es fallback para modo ZIP. El modo preferido
         es descargar archivos individuales desde URLs.
+        
+        Raises:
+            RuntimeError: si algún miembro no coincide con su hash esperado
         """
-        extracted = 0
-        with zipfile.ZipFile(zip_path, 'r') as zf:
+        expected_hashes = expected_hashes or {}
+        target_root = target_dir.resolve()
+        abort = threading.Event()
+        
+        def open_zip() -> zipfile.ZipFile:
+            if isinstance(zip_path, RemoteZip):
+                return zip_path.open()
+            return zipfile.ZipFile(zip_path, 'r')
+        
+        with open_zip() as zf:
+            members = []
             for file_path in file_list:
                 try:
-                    # Extraer archivo
-                    zf.extract(file_path, target_dir)
-                    extracted += 1
+                    members.append(zf.getinfo(file_path))
                 except KeyError:
                     print(f"[updater] WARN: {file_path} no encontrado en ZIP")
         
+        def extract_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> None:
+            target_path = target_dir / info.filename
+            if not target_path.resolve().is_relative_to(target_root):
+                raise RuntimeError(f"Ruta fuera de staging en ZIP: {info.filename}")
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            expected = expected_hashes.get(info.filename)
+            # Nunca escribir sobre un archivo existente (podría ser un hardlink compartido)
+            target_path.unlink(missing_ok=True)
+            h = ContentHasher.for_digest(expected)
+            with zf.open(info) as src, target_path.open("wb") as dst:
+                for chunk in iter(lambda: src.read(1024 * 1024), b""):
+                    dst.write(chunk)
+                    h.update(chunk)
+            
+            actual = h.hexdigest()
+            if expected and actual != expected:
+                target_path.unlink()
+                raise RuntimeError(f"Verificacion de integridad fallida en ZIP: {info.filename}")
+            self.hash_cache.record(target_path, actual)
+            if self.journal:
+                self.journal.record(info.filename, actual)
+        
+        def extract_batch(batch: List[zipfile.ZipInfo]) -> int:
+            done = 0
+            with open_zip() as zf:
+                for info in batch:
+                    if abort.is_set():
+                        break
+                    try:
+                        extract_member(zf, info)
+                    except Exception:
+                        abort.set()
+                        raise
+                    done += 1
+            return done
+        
+        workers = min(self.zip_workers, len(members)) or 1
+        if workers == 1:
+            return extract_batch(members)
+        
+        # Repartir por tamaño (mayor primero, round-robin) para equilibrar hilos
+        members.sort(key=lambda info: info.file_size, reverse=True)
+        batches = [members[i::workers] for i in range(workers)]
+        
+        extracted = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(extract_batch, batch) for batch in batches]:
+                extracted += future.result()
+        
         return extracted
     
-    def verify_file(self, path: Path, expected_hash: str) -> bool:
-        """Verifica que el hash de un archivo coincida con el esperado."""
+    def verify_file(self, path: Path, expected_hash: str, stats: Optional[UpdateStats] = None) -> bool:
+        """
+        Verifica que el hash de un archivo coincida con el esperado.
+        
+        Si el archivo está en la caché de hashes con la misma identidad
+        (size, mtime_ns, inode) no se relee, salvo en modo paranoid.
+        """
         if not path.exists():
             return False
-        actual_hash = self.sha256_file(path)
+        
+        alg = digest_alg(expected_hash)
+        if not self.paranoid:
+            cached_hash = self.hash_cache.lookup(path, alg)
+            if cached_hash is not None:
+                if stats is not None:
+                    stats.files_hash_cached += 1
+                return cached_hash == expected_hash
+        
+        actual_hash = self.file_digest(path, alg)
+        self.hash_cache.record(path, actual_hash)
         return actual_hash == expected_hash
     
-    def update_from_zip(self, zip_path: Path, target_manifest: Dict) -> UpdateStats:
+    def update_from_zip(
+        self,
+        zip_path: Union[Path, RemoteZip, None],
+        target_manifest: Dict,
+        asset_url: Optional[str] = None,
+        use_urls: bool = True,
+        asset_sha256: Optional[str] = None
+    ) -> UpdateStats:
         """
         Actualiza la tool desde un ZIP usando el manifiesto objetivo.
         Implementa actualización diferencial con staging y activación atómica.
         
+        zip_path puede ser un RemoteZip, o None si todos los archivos a
+        descargar tienen URL individual (p. ej. tras update_from_patch). Si no las tienen y se indica
+        asset_url (URL del ZIP de la release), los miembros necesarios se leen
+        por HTTP Range sin descargar el ZIP completo. Si el servidor no acepta
+        Range, el asset completo se verifica contra asset_sha256 (el sha256 del
+        catálogo) y se elimina tras extraer.
+        
+        Con progressive, los archivos fríos que hay que descargar por URL se
+        omiten de FASE 1 y FASE 3: la release se activa con pending.json y
+        fetch_pending() los descarga en segundo plano.
+        
+        Con use_urls=False se ignoran las URLs individuales y los packs: todo
+        sale del ZIP (archivos delta, workers sin acceso a las URLs).
+        
         CHECKPOINT WORKER-UPDATE-DELTA-1: Retorna estadísticas detalladas.
         """
         stats = UpdateStats()
+        # Una descarga de fríos de la release activa no debe solaparse con la siguiente actualización
+        self.wait_pending()
         
         tool_id = target_manifest["tool_id"]
         target_version = target_manifest["tool_version"]
@@ -276,14 +1333,22 @@ class DeltaUpdater:
         print(f"[updater] Tool: {tool_id}")
         print(f"[updater] Versión objetivo: {target_version}")
         
-        # Obtener manifiesto actual
+        # Obtener manifiesto actual (los fríos aún no descargados no se pueden reutilizar)
         current_manifest = self.get_current_manifest()
         current_version = self.get_current_version() or "ninguna"
+        pending = set(self.pending_files())
+        if current_manifest and pending:
+            current_manifest = dict(current_manifest)
+            current_manifest["files"] = [f for f in current_manifest["files"] if f["path"] not in pending]
         print(f"[updater] Versión actual: {current_version}")
         
-        # Calcular diff
+        # Calcular diff (el índice del target se comparte con descarga y verificación)
         print(f"[updater] Calculando diferencias...")
-        diff = self.compute_diff(current_manifest, target_manifest)
+        target_index = index_manifest(target_manifest)
+        unsupported = {f["hash_alg"] for f in target_index.values() if f.get("hash_alg", SHA256) not in available_algs()}
+        if unsupported:
+            raise RuntimeError(f"Algoritmos de hash no soportados en este worker: {', '.join(sorted(unsupported))}")
+        diff = self.compute_diff(current_manifest, target_manifest, target_index)
         
         to_download = [f for f in diff if f.status == "download"]
         to_skip = [f for f in diff if f.status == "skip"]
@@ -293,62 +1358,111 @@ class DeltaUpdater:
         print(f"[updater]   Archivos sin cambios: {len(to_skip)}")
         print(f"[updater]   Archivos a eliminar: {len(to_delete)}")
         
-        # Crear staging directory
+        # Crear staging directory (o reanudar uno interrumpido del mismo manifest)
         staging_release = self.staging_dir / f"v{target_version}"
-        if staging_release.exists():
-            shutil.rmtree(staging_release)
-        staging_release.mkdir(parents=True, exist_ok=True)
+        self.journal = StagingJournal(staging_release, target_manifest["manifest_hash"])
+        completed = self.journal.open()
         
         print(f"[updater] Staging: {staging_release}")
+        if completed:
+            print(f"[updater]   Reanudando: {len(completed)} archivos registrados en el journal")
+        
+        release_name = f"v{target_version}"
+        target_hashes = [entry_digest(f) for f in target_index.values()]
+        deferred: Set[str] = set()
+        if self.object_store:
+            # Proteger frente a gc los blobs que esta actualización va a usar
+            self.object_store.add_pending_ref(tool_id, release_name, target_hashes)
         
         try:
             # FASE 1: Descargar archivos necesarios a staging
             print(f"\n[updater] FASE 1: Descarga de archivos individuales")
             
+            if to_download and completed:
+                to_download = self.resume_from_journal(completed, to_download, staging_release, stats)
+                print(f"[updater]   [OK] {stats.files_resumed} archivos reanudados desde staging")
+            
+            if to_download and self.object_store:
+                to_download = self.materialize_from_store(to_download, staging_release, stats)
+                print(f"[updater]   [OK] {stats.files_from_store} archivos desde almacén local (sin descarga)")
+            
+            if to_download and use_urls and target_manifest.get("packs"):
+                # Archivos pequeños: un pack por grupo en vez de una petición por archivo
+                cold = {f["path"] for f in target_index.values() if f.get("hot", True) is False} if self.progressive else set()
+                to_download = self.download_from_packs(to_download, target_manifest, staging_release, stats, cold)
+                if stats.packs_downloaded:
+                    print(f"[updater]   [OK] {stats.files_unpacked} archivos desde {stats.packs_downloaded} packs")
+            
             if to_download:
                 # Intentar descarga individual desde URLs si están disponibles
-                use_individual_urls = all(
-                    any(f.get("url") for f in target_manifest.get("files", []) if f["path"] == status.path)
-                    for status in to_download
+                jobs = self.plan_downloads(to_download, target_index)
+                use_individual_urls = use_urls and all(
+                    file_info and file_info.get("url") for _, file_info in jobs
                 )
                 
+                if use_individual_urls and self.progressive:
+                    # Fríos: después de activar, en segundo plano
+                    deferred = {status.path for status, file_info in jobs if file_info.get("hot", True) is False}
+                    jobs = [job for job in jobs if job[0].path not in deferred]
+                    stats.files_deferred = len(deferred)
+                    if deferred:
+                        print(f"[updater]   Progresivo: {len(deferred)} archivos fríos diferidos")
+                
                 if use_individual_urls:
                     print(f"[updater]   Modo: Descarga individual por URL (delta update real)")
-                    downloaded = 0
-                    for status in to_download:
-                        # Buscar URL del archivo en manifest
-                        file_info = next(
-                            (f for f in target_manifest["files"] if f["path"] == status.path),
-                            None
+                    print(f"[updater]   Concurrencia: {min(self.max_workers, max(1, len(jobs)))} descargas simultáneas")
+                    
+                    current_release_dir = None
+                    local_chunks = index_chunks(current_manifest)
+                    if local_chunks:
+                        current_release_dir = self.releases_dir / self.get_current_version()
+                    
+                    failed = self.download_files(
+                        jobs, staging_release, stats,
+                        current_release_dir=current_release_dir,
+                        local_chunks=local_chunks
+                    )
+                    if failed:
+                        raise RuntimeError(
+                            f"Verificacion de integridad fallida: {failed} archivos no se pudieron descargar"
                         )
-                        
-                        if file_info and file_info.get("url"):
-                            target_path = staging_release / status.path
-                            # Descargar con verificación de hash y resume support
-                            if self.download_file_from_url(
-                                file_info["url"],
-                                target_path,
-                                expected_sha256=file_info.get("sha256"),
-                                expected_size=file_info.get("size")
-                            ):
-                                downloaded += 1
-                                stats.bytes_downloaded += status.size
-                            else:
-                                stats.errors.append(f"No se pudo descargar: {status.path}")
-                        else:
-                            stats.errors.append(f"Sin URL para: {status.path}")
                     
-                    stats.files_downloaded = downloaded
-                    print(f"[updater]   [OK] {downloaded} archivos descargados individualmente")
+                    print(f"[updater]   [OK] {stats.files_downloaded} archivos descargados individualmente")
                 
                 else:
                     # Fallback: extraer desde ZIP
-                    print(f"[updater]   Modo: Extracción desde ZIP (fallback)")
-                    files_to_extract = [f.path for f in to_download]
-                    extracted = self.download_from_zip(zip_path, staging_release, files_to_extract)
-                    stats.files_downloaded = extracted
-                    stats.bytes_downloaded = sum(f.size for f in to_download)
-                    print(f"[updater]   [OK] {extracted} archivos extraidos del ZIP")
+                    zip_source = zip_path
+                    if zip_source is None:
+                        if not asset_url:
+                            raise RuntimeError("El manifiesto no tiene URLs individuales y no se indicó ZIP")
+                        zip_source = self.open_release_asset(asset_url, asset_sha256)
+                    
+                    try:
+                        if isinstance(zip_source, RemoteZip):
+                            print(f"[updater]   Modo: ZIP remoto por HTTP Range (fallback)")
+                        else:
+                            print(f"[updater]   Modo: Extracción desde ZIP (fallback)")
+                        files_to_extract = [f.path for f in to_download]
+                        extracted = self.download_from_zip(
+                            zip_source, staging_release, files_to_extract,
+                            expected_hashes={f.path: f.target_hash for f in to_download}
+                        )
+                        stats.files_downloaded += extracted
+                        if isinstance(zip_source, RemoteZip):
+                            stats.bytes_downloaded += zip_source.bytes_fetched
+                            print(
+                                f"[updater]   {zip_source.requests} peticiones Range, "
+                                f"{zip_source.bytes_fetched} de {zip_source.size} bytes del ZIP"
+                            )
+                        elif zip_path is None:
+                            stats.bytes_downloaded += zip_source.stat().st_size
+                        else:
+                            stats.bytes_downloaded += sum(f.size for f in to_download)
+                        print(f"[updater]   [OK] {extracted} archivos extraidos del ZIP")
+                    finally:
+                        # El asset completo descargado aquí solo sirve para esta extracción
+                        if zip_path is None and isinstance(zip_source, Path):
+                            zip_source.unlink(missing_ok=True)
             
             # FASE 2: Copiar archivos sin cambios desde current
             print(f"\n[updater] FASE 2: Verificación de archivos sin cambios")
@@ -362,21 +1476,37 @@ class DeltaUpdater:
                     dst = staging_release / file_status.path
                     
                     if src.exists():
-                        dst.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(src, dst)
+                        # reflink → hardlink → copia (evita reescribir payloads sin cambios)
+                        strategy = materialize_file(src, dst, self.link_strategies)
+                        # El origen ya estaba verificado: heredar su hash si sigue vigente
+                        if self.hash_cache.lookup(src, digest_alg(file_status.target_hash)) == file_status.target_hash:
+                            self.hash_cache.record(dst, file_status.target_hash)
+                        if strategy == "reflink":
+                            stats.files_reflinked += 1
+                        elif strategy == "hardlink":
+                            stats.files_hardlinked += 1
+                        else:
+                            stats.files_copied += 1
+                        stats.bytes_reused += file_status.size
                         stats.files_skipped += 1
                 
-                print(f"[updater]   [OK] {stats.files_skipped} archivos copiados desde version actual")
+                print(
+                    f"[updater]   [OK] {stats.files_skipped} archivos reutilizados desde version actual "
+                    f"(reflink={stats.files_reflinked}, hardlink={stats.files_hardlinked}, "
+                    f"copia={stats.files_copied})"
+                )
             
             # FASE 3: Verificar todos los archivos en staging
-            print(f"\n[updater] FASE 3: Verificación de integridad")
+            print(f"\n[updater] FASE 3: Verificación de integridad{' (paranoid: re-hash completo)' if self.paranoid else ''}")
             
             verification_failed = []
-            for target_file in target_manifest["files"]:
+            for target_file in target_index.values():
+                if target_file["path"] in deferred:
+                    continue
                 file_path = staging_release / target_file["path"]
-                expected_hash = target_file["sha256"]
+                expected_hash = entry_digest(target_file)
                 
-                if self.verify_file(file_path, expected_hash):
+                if self.verify_file(file_path, expected_hash, stats):
                     stats.files_verified += 1
                 else:
                     error_msg = f"Verificación fallida: {target_file['path']}"
@@ -391,6 +1521,13 @@ class DeltaUpdater:
             
             print(f"[updater]   [OK] {stats.files_verified} archivos verificados correctamente")
             
+            # Publicar los archivos verificados en el almacén (la release queda como árbol de links)
+            if self.object_store:
+                for target_file in target_index.values():
+                    if target_file["path"] in deferred:
+                        continue
+                    self.object_store.ingest(staging_release / target_file["path"], entry_digest(target_file))
+            
             # FASE 4: Guardar manifiesto en staging
             manifest_path = staging_release / "manifest.json"
             manifest_path.write_text(
@@ -403,31 +1540,53 @@ class DeltaUpdater:
             
             final_release_dir = self.releases_dir / f"v{target_version}"
             if final_release_dir.exists():
-                shutil.rmtree(final_release_dir)
+                # Reinstalación de una release conservada: se retira con un rename
+                self.hash_cache.drop_prefix(final_release_dir)
+                if not self._move_to_trash(final_release_dir):
+                    raise RuntimeError(f"No se pudo reemplazar {final_release_dir}")
             
             shutil.move(str(staging_release), str(final_release_dir))
+            self.hash_cache.move_prefix(staging_release, final_release_dir)
+            self.journal.discard()
+            self.journal = None
+            
+            # pending.json antes que current.txt: la release nunca parece completa sin estarlo
+            if deferred:
+                self._write_pending(release_name, list(deferred))
+            else:
+                self.pending_file.unlink(missing_ok=True)
             
-            # Actualizar current.txt
-            self.current_file.write_text(f"v{target_version}", encoding="utf-8")
+            # Actualizar current.txt (rename atómico)
+            self.activate(release_name)
+            
+            if self.object_store:
+                self.object_store.add_ref(tool_id, release_name, target_hashes)
+                self.object_store.remove_pending_ref(tool_id, release_name)
             
             print(f"[updater]   [OK] Release activado: v{target_version}")
             
-            # FASE 6: Limpieza segura
+            # FASE 6: Limpieza segura (fuera del camino crítico)
             print(f"\n[updater] FASE 5: Limpieza de archivos obsoletos")
             
-            if to_delete and current_version != "ninguna":
-                # Solo eliminar si hay versión anterior
-                old_release_dir = self.releases_dir / current_version
-                
-                # Eliminar release anterior completo (seguro porque está en releases/)
-                if old_release_dir.exists():
-                    shutil.rmtree(old_release_dir)
-                    stats.files_deleted = len(to_delete)
-                    print(f"[updater]   [OK] Release anterior eliminado: {current_version}")
+            if current_version != "ninguna":
+                # Los archivos eliminados dejan de estar en la release activa
+                stats.files_deleted = len(to_delete)
             
-            # Limpiar staging
-            if self.staging_dir.exists():
-                shutil.rmtree(self.staging_dir)
+            # Releases fuera de la retención y staging: rename ahora, borrado en segundo plano
+            retired = self.retire_releases(tool_id)
+            self.hash_cache.save()
+            kept = ", ".join(self.list_releases())
+            if retired:
+                print(f"[updater]   [OK] Releases retiradas (borrado en segundo plano): {', '.join(retired)}")
+            print(f"[updater]   [OK] Releases conservadas: {kept}")
+            
+            if deferred:
+                self.pending_stats = None
+                self._pending_thread = threading.Thread(
+                    target=self.fetch_pending, name=f"cold-files-{tool_id}"
+                )
+                self._pending_thread.start()
+                print(f"[updater]   Archivos fríos descargándose en segundo plano: {len(deferred)}")
             
             print(f"\n[updater] [OK] Actualizacion completada exitosamente")
             
@@ -444,9 +1603,16 @@ class DeltaUpdater:
             stats.errors.append(str(e))
             print(f"\n[updater] [FAIL] ERROR: {e}")
             
-            # Rollback: eliminar staging
+            # No activar. El staging y su journal se conservan para reanudar
+            # (los archivos corruptos ya fueron descartados)
+            if self.journal:
+                self.journal.close()
             if staging_release.exists():
-                shutil.rmtree(staging_release)
+                print(f"[updater] Staging conservado para reanudar: {staging_release}")
+            self.hash_cache.drop_prefix(staging_release)
+            self.hash_cache.save()
+            if self.object_store:
+                self.object_store.remove_pending_ref(tool_id, release_name)
             
             raise
     
@@ -484,7 +1650,8 @@ class DeltaUpdater:
         
         Retorna:
         - "ELIGIBLE": versión y hash coinciden
-        - "OUTDATED": versión/hash no coinciden
+        - "OUTDATED": versión/hash no coinciden, o la release activa aún tiene
+          archivos fríos pendientes (activación progresiva)
         - "NO_INSTALLATION": no hay versión instalada
         """
         current_manifest = self.get_current_manifest()
@@ -492,6 +1659,10 @@ class DeltaUpdater:
         if not current_manifest:
             return "NO_INSTALLATION"
         
+        # El manifest_hash solo certifica la release completa
+        if self.pending_files():
+            return "OUTDATED"
+        
         current_version = current_manifest["tool_version"]
         current_hash = current_manifest["manifest_hash"]
         
@@ -504,38 +1675,152 @@ class DeltaUpdater:
 def main() -> int:
     """
     Ejemplo de uso del DeltaUpdater.
+    
+    Ejemplo:
+      python delta_updater.py D:/Tools/z-image-turbo tool_z-image-turbo_0.5.2.zip
+      python delta_updater.py D:/Tools/z-image-turbo https://github.com/.../tool_z-image-turbo_0.5.2.zip
+      python delta_updater.py D:/Tools/z-image-turbo delta_z-image-turbo_0.5.1_to_0.5.2.zip
+      python delta_updater.py D:/Tools/z-image-turbo --rollback
     """
-    import sys
+    import argparse
     
-    if len(sys.argv) < 3:
-        print("Uso: python delta_updater.py <tool_root> <zip_path>")
-        print("\nEjemplo:")
-        print("  python delta_updater.py D:/Tools/z-image-turbo tool_z-image-turbo_0.5.2.zip")
-        return 1
+    parser = argparse.ArgumentParser(description="Actualización diferencial de una tool desde su ZIP de release")
+    parser.add_argument("tool_root", type=Path, help="Raíz de la tool instalada")
+    parser.add_argument(
+        "zip_path",
+        nargs="?",
+        help="ZIP de la release (contiene manifest.json): ruta local o URL (se lee por HTTP Range si se puede)"
+    )
+    parser.add_argument(
+        "--sha256",
+        default=None,
+        help="sha256 del ZIP publicado en el catálogo (verifica la descarga completa si el servidor no acepta Range)"
+    )
+    parser.add_argument(
+        "--keep-releases",
+        type=int,
+        default=DeltaUpdater.DEFAULT_KEEP_RELEASES,
+        help=f"Releases conservadas para rollback, incluida la activa (default {DeltaUpdater.DEFAULT_KEEP_RELEASES})"
+    )
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Activa la release conservada anterior a la actual (sin descargas)"
+    )
+    parser.add_argument(
+        "--activate",
+        metavar="VERSION",
+        default=None,
+        help="Activa una release ya instalada (ej: 1.2.0)"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DeltaUpdater.DEFAULT_MAX_WORKERS,
+        help=f"Descargas concurrentes (default {DeltaUpdater.DEFAULT_MAX_WORKERS})"
+    )
+    parser.add_argument(
+        "--zip-workers",
+        type=int,
+        default=1,
+        help="Hilos de extracción verificada en modo ZIP (default 1)"
+    )
+    parser.add_argument(
+        "--hash-threads",
+        type=int,
+        default=DEFAULT_HASH_THREADS,
+        help=f"Hilos por archivo al verificar hashes sha256-tree/blake3 de manifest v2 (default {DEFAULT_HASH_THREADS})"
+    )
+    parser.add_argument(
+        "--paranoid",
+        action="store_true",
+        help="Ignora la caché de hashes y re-hashea todos los archivos en la verificación"
+    )
+    parser.add_argument(
+        "--progressive",
+        action="store_true",
+        help="Activa en cuanto los archivos calientes están verificados; los fríos se descargan después"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Extrae todo del ZIP aunque el manifiesto tenga URLs individuales"
+    )
+    parser.add_argument(
+        "--max-rate-mb",
+        type=float,
+        default=None,
+        help="Límite de ancho de banda de descarga en MB/s (default sin límite)"
+    )
+    args = parser.parse_args()
     
-    tool_root = Path(sys.argv[1])
-    zip_path = Path(sys.argv[2])
+    tool_root = args.tool_root
     
     if not tool_root.exists():
         print(f"Error: {tool_root} no existe")
         return 1
     
-    if not zip_path.exists():
-        print(f"Error: {zip_path} no existe")
+    if args.rollback or args.activate:
+        updater = DeltaUpdater(tool_root, keep_releases=args.keep_releases)
+        try:
+            release = updater.rollback() if args.rollback else updater.activate(args.activate)
+        except (RuntimeError, ValueError) as e:
+            print(f"Error: {e}")
+            return 1
+        print(f"[updater] Release activa: {release}")
+        return 0
+    
+    if not args.zip_path:
+        parser.error("zip_path es obligatorio salvo con --rollback o --activate")
+    is_url = args.zip_path.startswith(("http://", "https://"))
+    
+    if not is_url and not Path(args.zip_path).exists():
+        print(f"Error: {args.zip_path} no existe")
         return 1
     
-    # Extraer manifiesto del ZIP
-    with zipfile.ZipFile(zip_path, 'r') as zf:
-        manifest_data = zf.read("manifest.json")
-        target_manifest = json.loads(manifest_data.decode('utf-8'))
+    if args.max_rate_mb:
+        configure_bandwidth(rate=args.max_rate_mb * 1024 * 1024)
+    
+    updater = DeltaUpdater(
+        tool_root,
+        max_workers=args.jobs,
+        paranoid=args.paranoid,
+        zip_workers=args.zip_workers,
+        keep_releases=args.keep_releases,
+        progressive=args.progressive,
+        hash_threads=args.hash_threads
+    )
     
-    # Ejecutar actualización
-    updater = DeltaUpdater(tool_root)
-    stats = updater.update_from_zip(zip_path, target_manifest)
+    # ZIP remoto: directorio central por Range (o descarga completa verificada si no se puede)
+    zip_path = updater.open_release_asset(args.zip_path, args.sha256) if is_url else Path(args.zip_path)
+    
+    try:
+        # Extraer manifiesto del ZIP
+        target_manifest = updater.read_zip_json(zip_path, "manifest.json")
+        if target_manifest is None:
+            print(f"Error: {args.zip_path} no contiene manifest.json")
+            return 1
+        
+        # Ejecutar actualización (un archivo delta trae delta.json y solo los cambios)
+        if updater.read_zip_json(zip_path, "delta.json") is not None:
+            try:
+                stats = updater.update_from_delta(zip_path)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return 1
+        else:
+            stats = updater.update_from_zip(zip_path, target_manifest, use_urls=not args.offline)
+    finally:
+        if is_url and isinstance(zip_path, Path):
+            zip_path.unlink(missing_ok=True)
     
     # Mostrar reporte (CHECKPOINT WORKER-UPDATE-DELTA-1)
     print("\n" + stats.report())
     
+    # Archivos fríos: el proceso espera a que terminen antes de salir
+    if updater.pending_files():
+        updater.wait_pending()
+    
     # Verificar elegibilidad de red
     eligibility = updater.get_network_eligibility(
         target_manifest["tool_version"],
@@ -2,19 +2,51 @@
 Sistema de descarga de archivos con soporte de resume (HTTP Range).
 
 Diseñado para ser inyectable/mockeable en tests.
+
+Implementaciones:
+- HTTPDownloader: urllib, una conexión por archivo (segmentos paralelos si es grande)
+- AsyncHTTPDownloader: asyncio, conexiones keep-alive reutilizadas por host
+- MockDownloader: fixtures locales (tests)
 """
 
-import hashlib
+import asyncio
+import json
+import os
+import ssl
+import threading
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, Callable
+from typing import AsyncIterator, Dict, List, Optional, Callable, Tuple
+from urllib.parse import urljoin, urlsplit
 from urllib.request import Request, urlopen
 from urllib.error import URLError, HTTPError
 
+try:
+    from bandwidth_limiter import FOREGROUND, BandwidthLimiter, get_limiter
+    from file_hashing import ContentHasher, digest_alg, hash_file
+except ImportError:
+    # Fallback si se ejecuta standalone
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent))
+    from bandwidth_limiter import FOREGROUND, BandwidthLimiter, get_limiter
+    from file_hashing import ContentHasher, digest_alg, hash_file
+
+SEGMENT_STATE_SUFFIX = ".segments.json"
+
+# El estado de segmentos se persiste cada tantos bytes o segundos (y al cortarse
+# la descarga), no en cada chunk: cada guardado es un volcado JSON bajo el lock
+SEGMENT_STATE_SAVE_BYTES = 4 * 1024 * 1024
+SEGMENT_STATE_SAVE_INTERVAL = 1.0
+
 
 class FileDownloader(ABC):
     """Interfaz abstracta para downloaders (permite mocking en tests)."""
     
+    # Prioridad de ancho de banda (FOREGROUND/BACKGROUND); se puede cambiar en caliente
+    priority = FOREGROUND
+    
     @abstractmethod
     def download(
         self,
@@ -30,7 +62,8 @@ class FileDownloader(ABC):
         Args:
             url: URL del archivo
             target_path: Ruta destino
-            expected_sha256: Hash esperado (verifica después de descargar)
+            expected_sha256: Hash esperado, verifica después de descargar (hex sha256
+                o "<alg>-<hex>" de manifest v2, ver file_hashing)
             resume: Si True, intenta resumir descarga parcial
             progress_callback: callback(bytes_downloaded, total_bytes)
         
@@ -38,19 +71,94 @@ class FileDownloader(ABC):
             True si exitoso, False si falla
         """
         pass
+    
+    def fetch_range(self, url: str, offset: int, length: int) -> bytes:
+        """
+        Descarga el rango de bytes [offset, offset + length) de una URL.
+        
+        Usado por el updater para deltas por chunks. Los downloaders que no
+        lo soportan dejan la implementación por defecto y el updater descarga
+        el archivo completo.
+        
+        Raises:
+            NotImplementedError: si el downloader no soporta rangos
+            OSError: si el rango no se pudo obtener completo
+        """
+        raise NotImplementedError
+    
+    def range_size(self, url: str) -> Optional[int]:
+        """
+        Tamaño total del recurso si el servidor acepta HTTP Range, si no None.
+        
+        El updater lo usa para leer un ZIP remoto por rangos en vez de
+        descargarlo completo.
+        """
+        return None
+    
+    def has_peer_copy(self, sha256: str) -> bool:
+        """
+        True si el archivo crudo se puede obtener de una fuente cercana (LAN).
+        
+        El updater lo consulta para no preferir una variante comprimida de la
+        WAN cuando un par ya tiene el archivo.
+        """
+        return False
+
+
+class _RangeNotSupported(Exception):
+    """El servidor respondió a una petición con Range sin 206."""
+
+
+def segment_state_path(target_path: Path) -> Path:
+    """Archivo de estado de una descarga segmentada en curso (<archivo>.segments.json)."""
+    return target_path.with_name(target_path.name + SEGMENT_STATE_SUFFIX)
 
 
 class HTTPDownloader(FileDownloader):
     """
     Downloader real con soporte de HTTP Range (resume).
+    
+    Los archivos de al menos segment_threshold bytes se descargan en paralelo
+    por segmentos (N rangos sobre el archivo preasignado). El progreso de cada
+    segmento se guarda en <archivo>.segments.json para reanudar; el SHA256 se
+    verifica una sola vez al final. Si el servidor no responde 206, se descarga
+    en un solo stream.
+    
+    Todas las lecturas de red pasan por el limitador de ancho de banda global
+    del proceso (ver bandwidth_limiter.py).
     """
     
-    def __init__(self, chunk_size: int = 8 * 1024 * 1024):
+    def __init__(
+        self,
+        chunk_size: int = 8 * 1024 * 1024,
+        segments: int = 4,
+        segment_threshold: int = 64 * 1024 * 1024,
+        priority: str = FOREGROUND,
+        limiter: Optional[BandwidthLimiter] = None,
+        timeout: float = 30.0
+    ):
         """
         Args:
             chunk_size: Tamaño de bloque para descarga (default 8MB)
+            segments: Rangos paralelos para archivos grandes (1 = siempre un stream)
+            segment_threshold: Tamaño mínimo (bytes) para descargar por segmentos
+            priority: Prioridad de ancho de banda (FOREGROUND o BACKGROUND)
+            limiter: Limitador a usar (default: el global del proceso)
+            timeout: Timeout (s) de conexión y de cada lectura
         """
         self.chunk_size = chunk_size
+        self.segments = segments
+        self.segment_threshold = segment_threshold
+        self.timeout = timeout
+        self.priority = priority
+        self.limiter = limiter if limiter is not None else get_limiter()
+    
+    def _read(self, response, max_bytes: int) -> bytes:
+        """Lee de la respuesta respetando el limitador de ancho de banda."""
+        chunk = response.read(min(max_bytes, self.limiter.read_size(self.chunk_size, self.priority)))
+        if chunk:
+            self.limiter.throttle(len(chunk), self.priority)
+        return chunk
     
     def download(
         self,
@@ -67,80 +175,680 @@ class HTTPDownloader(FileDownloader):
             # Crear directorio padre
             target_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Verificar si hay descarga parcial
+            # Descarga segmentada interrumpida: reanudar sus segmentos
+            if self.segments > 1 and segment_state_path(target_path).exists():
+                if resume:
+                    result = self._download_segmented(url, target_path, None, expected_sha256, progress_callback)
+                    if result is not None:
+                        return result
+                segment_state_path(target_path).unlink(missing_ok=True)
+                target_path.unlink(missing_ok=True)
+            
+            return self._download_stream(url, target_path, expected_sha256, resume, progress_callback,
+                                         allow_segments=self.segments > 1)
+        
+        except (URLError, HTTPError) as e:
+            print(f"[downloader] ERROR descargando {url}: {e}")
+            return False
+        except Exception as e:
+            print(f"[downloader] ERROR inesperado: {e}")
+            return False
+    
+    def _download_stream(
+        self,
+        url: str,
+        target_path: Path,
+        expected_sha256: Optional[str],
+        resume: bool,
+        progress_callback: Optional[Callable[[int, int], None]],
+        allow_segments: bool
+    ) -> bool:
+        """Descarga en un solo stream (o delega en segmentos si el archivo es grande)."""
+        # Verificar si hay descarga parcial
+        bytes_downloaded = 0
+        if resume and target_path.exists():
+            bytes_downloaded = target_path.stat().st_size
+        
+        # Construir request con Range header si hay descarga parcial
+        headers = {}
+        mode = 'wb'
+        
+        if bytes_downloaded > 0:
+            headers['Range'] = f'bytes={bytes_downloaded}-'
+            mode = 'ab'  # Append mode
+        
+        request = Request(url, headers=headers)
+        
+        # Abrir conexión
+        with urlopen(request, timeout=self.timeout) as response:
+            # Obtener tamaño total
+            total_size = int(response.headers.get('Content-Length', 0))
+            
+            # Archivo grande desde cero con Range anunciado: pasar a segmentos
+            if (allow_segments and response.status == 200 and bytes_downloaded == 0
+                    and total_size >= self.segment_threshold
+                    and 'bytes' in response.headers.get('Accept-Ranges', '').lower()):
+                response.close()
+                result = self._download_segmented(url, target_path, total_size, expected_sha256, progress_callback)
+                if result is not None:
+                    return result
+                # El servidor no respondió 206: un solo stream desde cero
+                return self._download_stream(url, target_path, expected_sha256, False, progress_callback,
+                                             allow_segments=False)
+            
+            # Si server no soporta Range, empezar desde cero
+            if response.status == 200 and bytes_downloaded > 0:
+                # Server no soportó Range, empezar de nuevo
+                bytes_downloaded = 0
+                mode = 'wb'
+            
+            # Calcular tamaño final esperado
+            if response.status == 206:  # Partial Content
+                # Server soportó Range
+                expected_total = bytes_downloaded + total_size
+            else:
+                expected_total = total_size
+            
+            # Descargar por chunks con hash incremental (algoritmo del digest esperado)
+            h = ContentHasher.for_digest(expected_sha256)
+            
+            # Si resumimos, hash el contenido existente primero
+            if mode == 'ab' and bytes_downloaded > 0:
+                with target_path.open('rb') as f:
+                    for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                        h.update(chunk)
+            
+            with target_path.open(mode) as f:
+                while True:
+                    chunk = self._read(response, self.chunk_size)
+                    if not chunk:
+                        break
+                    
+                    f.write(chunk)
+                    h.update(chunk)
+                    bytes_downloaded += len(chunk)
+                    
+                    # Callback de progreso
+                    if progress_callback:
+                        progress_callback(bytes_downloaded, expected_total)
+        
+        # Verificar hash si se proporciona
+        if expected_sha256:
+            actual_sha256 = h.hexdigest()
+            if actual_sha256 != expected_sha256:
+                print(f"[downloader] ERROR: Hash mismatch")
+                print(f"  Esperado: {expected_sha256}")
+                print(f"  Obtenido: {actual_sha256}")
+                target_path.unlink()  # Borrar archivo corrupto
+                return False
+        
+        return True
+    
+    def _download_segmented(
+        self,
+        url: str,
+        target_path: Path,
+        total_size: Optional[int],
+        expected_sha256: Optional[str],
+        progress_callback: Optional[Callable[[int, int], None]]
+    ) -> Optional[bool]:
+        """
+        Descarga por rangos paralelos sobre el archivo preasignado.
+        
+        Args:
+            total_size: Tamaño del archivo (None = reanudar desde el estado guardado)
+        
+        Returns:
+            True/False como download(), o None si el servidor no soporta Range
+            (el archivo y su estado quedan eliminados)
+        """
+        state_path = segment_state_path(target_path)
+        state = None
+        if state_path.exists() and target_path.exists():
+            try:
+                state = json.loads(state_path.read_text(encoding="utf-8"))
+            except ValueError:
+                state = None
+            if state is not None and (
+                    state.get("sha256") != expected_sha256
+                    or (total_size is not None and state.get("size") != total_size)
+                    or target_path.stat().st_size != state.get("size")):
+                state = None
+        
+        if state is None:
+            if total_size is None:
+                return None
+            # Preasignar el archivo completo y repartirlo en segmentos contiguos
+            with target_path.open('wb') as f:
+                f.truncate(total_size)
+                if hasattr(os, 'posix_fallocate'):
+                    try:
+                        os.posix_fallocate(f.fileno(), 0, total_size)
+                    except OSError:
+                        pass  # Sistema de archivos sin fallocate: queda sparse
+            count = max(1, min(self.segments, total_size))
+            bounds = [total_size * i // count for i in range(count + 1)]
+            state = {
+                "size": total_size,
+                "sha256": expected_sha256,
+                "segments": [{"start": bounds[i], "end": bounds[i + 1] - 1, "done": 0} for i in range(count)],
+            }
+        
+        total = state["size"]
+        lock = threading.Lock()
+        stop = threading.Event()
+        downloaded = [sum(seg["done"] for seg in state["segments"])]
+        last_saved = [downloaded[0], time.monotonic()]
+        
+        def save_state() -> None:
+            tmp_path = state_path.with_name(state_path.name + ".tmp")
+            tmp_path.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp_path, state_path)
+            last_saved[:] = [downloaded[0], time.monotonic()]
+        
+        def fetch_segment(seg: Dict) -> None:
+            start = seg["start"] + seg["done"]
+            if start > seg["end"]:
+                return
+            request = Request(url, headers={'Range': f'bytes={start}-{seg["end"]}'})
+            with urlopen(request, timeout=self.timeout) as response:
+                if response.status != 206:
+                    raise _RangeNotSupported()
+                remaining = seg["end"] - start + 1
+                with target_path.open('r+b') as f:
+                    f.seek(start)
+                    while remaining > 0 and not stop.is_set():
+                        chunk = self._read(response, remaining)
+                        if not chunk:
+                            raise OSError(f"Segmento incompleto de {url}: faltan {remaining} bytes")
+                        f.write(chunk)
+                        f.flush()
+                        remaining -= len(chunk)
+                        with lock:
+                            seg["done"] += len(chunk)
+                            downloaded[0] += len(chunk)
+                            if (downloaded[0] - last_saved[0] >= SEGMENT_STATE_SAVE_BYTES
+                                    or time.monotonic() - last_saved[1] >= SEGMENT_STATE_SAVE_INTERVAL):
+                                save_state()
+                            if progress_callback:
+                                progress_callback(downloaded[0], total)
+        
+        with lock:
+            save_state()
+        
+        pending = [seg for seg in state["segments"] if seg["done"] < seg["end"] - seg["start"] + 1]
+        error: Optional[BaseException] = None
+        with ThreadPoolExecutor(max_workers=max(1, len(pending))) as pool:
+            futures = [pool.submit(fetch_segment, seg) for seg in pending]
+            for future in as_completed(futures):
+                exc = future.exception()
+                if exc is not None and error is None:
+                    error = exc
+                    stop.set()
+        
+        if isinstance(error, _RangeNotSupported):
+            state_path.unlink(missing_ok=True)
+            target_path.unlink(missing_ok=True)
+            return None
+        if error is not None:
+            # Guardar lo escrito desde el último guardado: el próximo intento reanuda los segmentos
+            with lock:
+                save_state()
+            raise error
+        
+        # Verificar hash una sola vez sobre el archivo completo (sha256-tree: bloques en paralelo)
+        if expected_sha256:
+            actual_sha256 = hash_file(target_path, digest_alg(expected_sha256))
+            if actual_sha256 != expected_sha256:
+                print(f"[downloader] ERROR: Hash mismatch")
+                print(f"  Esperado: {expected_sha256}")
+                print(f"  Obtenido: {actual_sha256}")
+                state_path.unlink(missing_ok=True)
+                target_path.unlink()
+                return False
+        
+        state_path.unlink(missing_ok=True)
+        return True
+    
+    def fetch_range(self, url: str, offset: int, length: int) -> bytes:
+        """
+        Descarga un rango de bytes con HTTP Range (requiere respuesta 206).
+        """
+        request = Request(url, headers={'Range': f'bytes={offset}-{offset + length - 1}'})
+        with urlopen(request, timeout=self.timeout) as response:
+            if response.status != 206:
+                # El server ignoró Range: no leer el archivo completo
+                raise OSError(f"Servidor sin soporte de Range para {url} (status {response.status})")
+            data = bytearray()
+            while len(data) <= length:
+                chunk = self._read(response, length + 1 - len(data))
+                if not chunk:
+                    break
+                data += chunk
+        
+        if len(data) != length:
+            raise OSError(f"Rango incompleto de {url}: {len(data)}/{length} bytes")
+        return bytes(data)
+    
+    def range_size(self, url: str) -> Optional[int]:
+        """
+        Sondea con Range: bytes=0-0; solo un 206 con Content-Range confirma soporte.
+        """
+        request = Request(url, headers={'Range': 'bytes=0-0'})
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                if response.status != 206:
+                    return None  # Cerrar sin leer el cuerpo completo
+                total = response.headers.get('Content-Range', '').rpartition('/')[2]
+                response.read()
+        except (URLError, OSError) as e:
+            print(f"[downloader] Sondeo de Range fallido para {url}: {e}")
+            return None
+        return int(total) if total.isdigit() else None
+
+
+class _Connection:
+    """Conexión HTTP/1.1 persistente (par reader/writer de asyncio)."""
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+    
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _Response:
+    """Respuesta HTTP con el cuerpo pendiente de leer sobre una conexión del pool."""
+    
+    def __init__(self, pool: "AsyncHTTPDownloader", key: Tuple[str, str, int], conn: _Connection,
+                 status: int, headers: Dict[str, str], keep_alive: bool):
+        self.pool = pool
+        self.key = key
+        self.conn = conn
+        self.status = status
+        self.headers = headers
+        self.keep_alive = keep_alive
+        self._consumed = False
+    
+    async def iter_body(self, chunk_size: int) -> AsyncIterator[bytes]:
+        """Itera el cuerpo (Content-Length, chunked o hasta EOF)."""
+        reader = self.conn.reader
+        timeout = self.pool.timeout
+        
+        if self.status in (204, 304):
+            pass
+        elif "chunked" in self.headers.get("transfer-encoding", "").lower():
+            while True:
+                size_line = await asyncio.wait_for(reader.readline(), timeout)
+                size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # Trailers hasta línea vacía
+                    while (await asyncio.wait_for(reader.readline(), timeout)).strip():
+                        pass
+                    break
+                while size > 0:
+                    data = await asyncio.wait_for(reader.readexactly(min(size, chunk_size)), timeout)
+                    size -= len(data)
+                    yield data
+                await asyncio.wait_for(reader.readexactly(2), timeout)
+        elif "content-length" in self.headers:
+            remaining = int(self.headers["content-length"])
+            while remaining > 0:
+                data = await asyncio.wait_for(reader.read(min(remaining, chunk_size)), timeout)
+                if not data:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(data)
+                yield data
+        else:
+            # Sin longitud: el cuerpo termina al cerrar la conexión
+            self.keep_alive = False
+            while True:
+                data = await asyncio.wait_for(reader.read(chunk_size), timeout)
+                if not data:
+                    break
+                yield data
+        
+        self._consumed = True
+    
+    async def drain(self) -> None:
+        async for _ in self.iter_body(64 * 1024):
+            pass
+    
+    def release(self) -> None:
+        """Devuelve la conexión al pool (o la cierra si no es reutilizable)."""
+        self.pool._release(self.key, self.conn, reuse=self._consumed and self.keep_alive)
+
+
+class AsyncHTTPDownloader(FileDownloader):
+    """
+    Downloader asyncio con conexiones HTTP/1.1 persistentes (keep-alive) por host.
+    
+    Un único event loop (en un hilo propio) multiplexa todas las transferencias;
+    cada archivo pequeño reutiliza una conexión ya abierta en vez de pagar de
+    nuevo TCP + TLS. Mantiene el resume por HTTP Range y el hash incremental de
+    HTTPDownloader.
+    
+    download() es síncrono y thread-safe, así que se inyecta en DeltaUpdater
+    como cualquier otro downloader: los hilos de FASE 1 solo esperan mientras
+    el event loop hace el trabajo. Desde código asyncio usar download_async().
+    
+    Respeta el limitador de ancho de banda global sin bloquear el event loop.
+    
+    NOTA: no usa proxies del entorno (HTTPDownloader sí, vía urllib).
+    """
+    
+    def __init__(
+        self,
+        chunk_size: int = 1024 * 1024,
+        max_connections_per_host: int = 8,
+        timeout: float = 30.0,
+        max_redirects: int = 5,
+        priority: str = FOREGROUND,
+        limiter: Optional[BandwidthLimiter] = None
+    ):
+        """
+        Args:
+            chunk_size: Tamaño de lectura del cuerpo (default 1MB)
+            max_connections_per_host: Conexiones simultáneas máximas por host
+            timeout: Timeout (s) de conexión y de cada lectura
+            max_redirects: Redirecciones máximas a seguir (GitHub Releases redirige)
+            priority: Prioridad de ancho de banda (FOREGROUND o BACKGROUND)
+            limiter: Limitador a usar (default: el global del proceso)
+        """
+        self.chunk_size = chunk_size
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.priority = priority
+        self.limiter = limiter if limiter is not None else get_limiter()
+        self.connections_opened = 0
+        
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        self._idle: Dict[Tuple[str, str, int], List[_Connection]] = {}
+        self._slots: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+    
+    # --- Event loop propio ---
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="async-downloader", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+    
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+    
+    def close(self) -> None:
+        """Cierra las conexiones del pool y detiene el event loop."""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        
+        async def shutdown():
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+            self._slots.clear()
+        
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
+    
+    def __enter__(self) -> "AsyncHTTPDownloader":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+    
+    # --- Pool de conexiones ---
+    
+    async def _acquire(self, key: Tuple[str, str, int]) -> Tuple[_Connection, bool]:
+        """Obtiene una conexión (idle si hay). Retorna (conexión, reutilizada)."""
+        slots = self._slots.get(key)
+        if slots is None:
+            slots = self._slots[key] = asyncio.Semaphore(self.max_connections_per_host)
+        await slots.acquire()
+        
+        idle = self._idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if not conn.reader.at_eof() and not conn.writer.is_closing():
+                return conn, True
+            conn.close()
+        
+        try:
+            return await self._connect(key), False
+        except BaseException:
+            slots.release()
+            raise
+    
+    async def _connect(self, key: Tuple[str, str, int]) -> _Connection:
+        scheme, host, port = key
+        ssl_context = ssl.create_default_context() if scheme == "https" else None
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=ssl_context, limit=2 ** 20),
+            self.timeout
+        )
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+    
+    def _release(self, key: Tuple[str, str, int], conn: _Connection, reuse: bool) -> None:
+        if reuse:
+            self._idle.setdefault(key, []).append(conn)
+        else:
+            conn.close()
+        self._slots[key].release()
+    
+    # --- HTTP/1.1 ---
+    
+    async def _send(self, url: str, headers: Dict[str, str]) -> _Response:
+        """GET siguiendo redirecciones. El llamador debe consumir y liberar la respuesta."""
+        for _ in range(self.max_redirects + 1):
+            parts = urlsplit(url)
+            if parts.scheme not in ("http", "https"):
+                raise ValueError(f"Esquema no soportado: {url}")
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            key = (parts.scheme, parts.hostname, port)
+            target = parts.path or "/"
+            if parts.query:
+                target += "?" + parts.query
+            host_header = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+            
+            lines = [f"GET {target} HTTP/1.1", f"Host: {host_header}",
+                     "Connection: keep-alive", "Accept-Encoding: identity"]
+            lines += [f"{name}: {value}" for name, value in headers.items()]
+            request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+            
+            conn, reused = await self._acquire(key)
+            try:
+                try:
+                    status, resp_headers, keep_alive = await self._exchange(conn, request)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    if not reused:
+                        raise
+                    # El server cerró la conexión idle: reintentar en una nueva
+                    conn.close()
+                    conn = await self._connect(key)
+                    status, resp_headers, keep_alive = await self._exchange(conn, request)
+            except BaseException:
+                self._release(key, conn, reuse=False)
+                raise
+            
+            response = _Response(self, key, conn, status, resp_headers, keep_alive)
+            location = resp_headers.get("location")
+            if status in (301, 302, 303, 307, 308) and location:
+                try:
+                    await response.drain()
+                finally:
+                    response.release()
+                url = urljoin(url, location)
+                continue
+            return response
+        
+        raise ValueError(f"Demasiadas redirecciones: {url}")
+    
+    async def _exchange(self, conn: _Connection, request: bytes) -> Tuple[int, Dict[str, str], bool]:
+        """Envía la petición y lee status + headers."""
+        conn.writer.write(request)
+        await asyncio.wait_for(conn.writer.drain(), self.timeout)
+        
+        status_line = await asyncio.wait_for(conn.reader.readline(), self.timeout)
+        if not status_line:
+            raise asyncio.IncompleteReadError(b"", None)
+        version, status, _ = (status_line.decode("latin-1").rstrip("\r\n") + "  ").split(" ", 2)
+        
+        headers: Dict[str, str] = {}
+        while True:
+            line = await asyncio.wait_for(conn.reader.readline(), self.timeout)
+            line = line.decode("latin-1").rstrip("\r\n")
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+        return int(status), headers, keep_alive
+    
+    # --- API ---
+    
+    def _read_size(self) -> int:
+        return self.limiter.read_size(self.chunk_size, self.priority)
+    
+    async def download_async(
+        self,
+        url: str,
+        target_path: Path,
+        expected_sha256: Optional[str] = None,
+        resume: bool = True,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> bool:
+        """Versión asyncio de download() (mismas garantías que HTTPDownloader)."""
+        try:
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            
             bytes_downloaded = 0
             if resume and target_path.exists():
                 bytes_downloaded = target_path.stat().st_size
             
-            # Construir request con Range header si hay descarga parcial
             headers = {}
             mode = 'wb'
-            
             if bytes_downloaded > 0:
                 headers['Range'] = f'bytes={bytes_downloaded}-'
-                mode = 'ab'  # Append mode
-            
-            request = Request(url, headers=headers)
+                mode = 'ab'
             
-            # Abrir conexión
-            with urlopen(request, timeout=30) as response:
-                # Obtener tamaño total
-                total_size = int(response.headers.get('Content-Length', 0))
+            response = await self._send(url, headers)
+            try:
+                if response.status not in (200, 206):
+                    print(f"[downloader] ERROR descargando {url}: HTTP {response.status}")
+                    await response.drain()
+                    return False
                 
-                # Si server no soporta Range, empezar desde cero
+                total_size = int(response.headers.get('content-length', 0))
                 if response.status == 200 and bytes_downloaded > 0:
                     # Server no soportó Range, empezar de nuevo
                     bytes_downloaded = 0
                     mode = 'wb'
+                expected_total = bytes_downloaded + total_size if response.status == 206 else total_size
                 
-                # Calcular tamaño final esperado
-                if response.status == 206:  # Partial Content
-                    # Server soportó Range
-                    expected_total = bytes_downloaded + total_size
-                else:
-                    expected_total = total_size
-                
-                # Descargar por chunks con hash incremental
-                h = hashlib.sha256()
-                
-                # Si resumimos, hash el contenido existente primero
-                if mode == 'ab' and bytes_downloaded > 0:
+                h = ContentHasher.for_digest(expected_sha256)
+                if mode == 'ab':
                     with target_path.open('rb') as f:
                         for chunk in iter(lambda: f.read(self.chunk_size), b""):
                             h.update(chunk)
                 
                 with target_path.open(mode) as f:
-                    while True:
-                        chunk = response.read(self.chunk_size)
-                        if not chunk:
-                            break
-                        
+                    async for chunk in response.iter_body(self._read_size()):
+                        await self.limiter.throttle_async(len(chunk), self.priority)
                         f.write(chunk)
                         h.update(chunk)
                         bytes_downloaded += len(chunk)
-                        
-                        # Callback de progreso
                         if progress_callback:
                             progress_callback(bytes_downloaded, expected_total)
+            finally:
+                response.release()
             
-            # Verificar hash si se proporciona
             if expected_sha256:
                 actual_sha256 = h.hexdigest()
                 if actual_sha256 != expected_sha256:
                     print(f"[downloader] ERROR: Hash mismatch")
                     print(f"  Esperado: {expected_sha256}")
                     print(f"  Obtenido: {actual_sha256}")
-                    target_path.unlink()  # Borrar archivo corrupto
+                    target_path.unlink()
                     return False
             
             return True
         
-        except (URLError, HTTPError) as e:
-            print(f"[downloader] ERROR descargando {url}: {e}")
-            return False
-        except Exception as e:
-            print(f"[downloader] ERROR inesperado: {e}")
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            print(f"[downloader] ERROR descargando {url}: {e!r}")
             return False
+    
+    async def fetch_range_async(self, url: str, offset: int, length: int) -> bytes:
+        """Versión asyncio de fetch_range()."""
+        response = await self._send(url, {'Range': f'bytes={offset}-{offset + length - 1}'})
+        try:
+            if response.status != 206:
+                await response.drain()
+                raise OSError(f"Servidor sin soporte de Range para {url} (status {response.status})")
+            data = bytearray()
+            async for chunk in response.iter_body(self._read_size()):
+                await self.limiter.throttle_async(len(chunk), self.priority)
+                data += chunk
+        finally:
+            response.release()
+        
+        if len(data) != length:
+            raise OSError(f"Rango incompleto de {url}: {len(data)}/{length} bytes")
+        return bytes(data)
+    
+    async def range_size_async(self, url: str) -> Optional[int]:
+        """Versión asyncio de range_size()."""
+        try:
+            response = await self._send(url, {'Range': 'bytes=0-0'})
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            print(f"[downloader] Sondeo de Range fallido para {url}: {e}")
+            return None
+        try:
+            if response.status != 206:
+                return None  # Sin drenar: la conexión se cierra al liberarla
+            await response.drain()
+        finally:
+            response.release()
+        total = response.headers.get('content-range', '').rpartition('/')[2]
+        return int(total) if total.isdigit() else None
+    
+    def download(
+        self,
+        url: str,
+        target_path: Path,
+        expected_sha256: Optional[str] = None,
+        resume: bool = True,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> bool:
+        """
+        Descarga archivo con soporte de resume (bloquea hasta terminar; thread-safe).
+        """
+        return self._run(self.download_async(url, target_path, expected_sha256, resume, progress_callback))
+    
+    def fetch_range(self, url: str, offset: int, length: int) -> bytes:
+        """
+        Descarga un rango de bytes con HTTP Range (requiere respuesta 206).
+        """
+        return self._run(self.fetch_range_async(url, offset, length))
+    
+    def range_size(self, url: str) -> Optional[int]:
+        """Versión síncrona de range_size_async()."""
+        return self._run(self.range_size_async(url))
 
 
 class MockDownloader(FileDownloader):
@@ -186,12 +894,7 @@ class MockDownloader(FileDownloader):
             
             # Verificar hash si se proporciona
             if expected_sha256:
-                h = hashlib.sha256()
-                with target_path.open('rb') as f:
-                    for chunk in iter(lambda: f.read(8 * 1024 * 1024), b""):
-                        h.update(chunk)
-                
-                actual_sha256 = h.hexdigest()
+                actual_sha256 = hash_file(target_path, digest_alg(expected_sha256))
                 if actual_sha256 != expected_sha256:
                     print(f"[mock] Hash mismatch: {filename}")
                     target_path.unlink()
@@ -202,15 +905,40 @@ class MockDownloader(FileDownloader):
         except Exception as e:
             print(f"[mock] ERROR: {e}")
             return False
+    
+    def fetch_range(self, url: str, offset: int, length: int) -> bytes:
+        """
+        "Descarga" un rango leyendo el fixture local.
+        """
+        fixture_path = self.fixtures_dir / url.split('/')[-1]
+        with fixture_path.open('rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+        
+        if len(data) != length:
+            raise OSError(f"Rango incompleto en fixture {fixture_path.name}")
+        return data
+    
+    def range_size(self, url: str) -> Optional[int]:
+        """
+        Tamaño del fixture local (los fixtures siempre "aceptan" rangos).
+        """
+        fixture_path = self.fixtures_dir / url.split('/')[-1]
+        return fixture_path.stat().st_size if fixture_path.exists() else None
 
 
-def create_downloader(mock: bool = False, fixtures_dir: Optional[Path] = None) -> FileDownloader:
+def create_downloader(
+    mock: bool = False,
+    fixtures_dir: Optional[Path] = None,
+    use_asyncio: bool = False
+) -> FileDownloader:
     """
     Factory para crear downloader apropiado.
     
     Args:
         mock: Si True, usa MockDownloader (para tests)
         fixtures_dir: Directorio de fixtures (requerido si mock=True)
+        use_asyncio: Si True, usa AsyncHTTPDownloader (conexiones persistentes)
     
     Returns:
         FileDownloader instance
@@ -219,5 +947,7 @@ def create_downloader(mock: bool = False, fixtures_dir: Optional[Path] = None) -
         if fixtures_dir is None:
             raise ValueError("fixtures_dir requerido para MockDownloader")
         return MockDownloader(fixtures_dir)
+    elif use_asyncio:
+        return AsyncHTTPDownloader()
     else:
         return HTTPDownloader()
@@ -0,0 +1,192 @@
+"""
+Algoritmos de hash del contenido de los archivos de un manifest.
+
+Manifest v1: cada archivo lleva "sha256" (un solo hilo por archivo: en payloads
+de varios GB la verificación queda limitada por CPU). Manifest v2 declara el
+algoritmo por archivo:
+
+    {"path": "models/weights.dat", "hash_alg": "sha256-tree", "hash": "<hex>", ...}
+
+Algoritmos:
+- sha256: SHA-256 del archivo completo (el de v1)
+- sha256-tree: árbol de SHA-256 sobre bloques de TREE_CHUNK_SIZE; los bloques
+  se hashean en paralelo (hashlib libera el GIL) y la raíz es
+      sha256(0x01 || tamaño u64 LE || hoja_0 || hoja_1 || ...),
+      hoja_i = sha256(0x00 || bloque_i)
+- blake3: requiere el paquete opcional `blake3` (multihilo propio)
+
+Dentro del sistema (caché de hashes, journal, almacén de objetos, caché LAN)
+un hash se maneja como "digest": el hex para sha256, igual que en v1, y
+"<alg>-<hex>" para los demás. Dos digests iguales implican el mismo algoritmo
+y el mismo contenido.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import blake3
+except ImportError:  # Opcional: sin él, los manifests con blake3 no se pueden verificar
+    blake3 = None
+
+SHA256 = "sha256"
+SHA256_TREE = "sha256-tree"
+BLAKE3 = "blake3"
+HASH_ALGS = (SHA256, SHA256_TREE, BLAKE3)
+
+# Bloque del árbol: fijo, forma parte de la definición de sha256-tree
+TREE_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Hilos por archivo para sha256-tree y blake3
+DEFAULT_HASH_THREADS = min(8, os.cpu_count() or 1)
+
+_READ_BLOCK = 8 * 1024 * 1024
+
+
+def available_algs() -> Tuple[str, ...]:
+    """Algoritmos utilizables en este proceso (blake3 solo con el paquete instalado)."""
+    return HASH_ALGS if blake3 is not None else (SHA256, SHA256_TREE)
+
+
+def _require(alg: str) -> None:
+    if alg not in HASH_ALGS:
+        raise ValueError(f"Algoritmo de hash desconocido: {alg}")
+    if alg not in available_algs():
+        raise RuntimeError(f"Algoritmo {alg} requiere el paquete 'blake3' (pip install blake3)")
+
+
+def format_digest(alg: str, hexdigest: str) -> str:
+    """Digest interno: el hex para sha256, "<alg>-<hex>" para el resto."""
+    return hexdigest if alg == SHA256 else f"{alg}-{hexdigest}"
+
+
+def parse_digest(digest: str) -> Tuple[str, str]:
+    """(algoritmo, hex) de un digest interno."""
+    if "-" in digest:
+        alg, hexdigest = digest.rsplit("-", 1)
+        return alg, hexdigest
+    return SHA256, digest
+
+
+def digest_alg(digest: Optional[str]) -> str:
+    """Algoritmo de un digest interno (sha256 si no hay digest)."""
+    return parse_digest(digest)[0] if digest else SHA256
+
+
+def entry_digest(entry: Dict) -> str:
+    """Digest interno de una entrada de files[] (v1: "sha256"; v2: "hash_alg" + "hash")."""
+    if "hash_alg" in entry:
+        return format_digest(entry["hash_alg"], entry["hash"])
+    return entry["sha256"]
+
+
+def entry_fields(digest: str) -> Dict[str, str]:
+    """Campos de hash de una entrada de files[]: formato v1 para sha256, v2 para el resto."""
+    alg, hexdigest = parse_digest(digest)
+    if alg == SHA256:
+        return {"sha256": hexdigest}
+    return {"hash_alg": alg, "hash": hexdigest}
+
+
+def _leaf(data) -> bytes:
+    h = hashlib.sha256(b"\x00")
+    h.update(data)
+    return h.digest()
+
+
+def _root(size: int, leaves) -> str:
+    h = hashlib.sha256(b"\x01" + size.to_bytes(8, "little"))
+    for leaf in leaves:
+        h.update(leaf)
+    return h.hexdigest()
+
+
+class TreeHasher:
+    """sha256-tree incremental (secuencial; hash_file() paraleliza sobre un archivo)."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._leaves = []
+        self._size = 0
+
+    def update(self, data: bytes) -> None:
+        self._size += len(data)
+        self._buffer += data
+        if len(self._buffer) >= TREE_CHUNK_SIZE:
+            view = memoryview(self._buffer)
+            full = len(self._buffer) - len(self._buffer) % TREE_CHUNK_SIZE
+            for start in range(0, full, TREE_CHUNK_SIZE):
+                self._leaves.append(_leaf(view[start:start + TREE_CHUNK_SIZE]))
+            view.release()
+            del self._buffer[:full]
+
+    def hexdigest(self) -> str:
+        leaves = list(self._leaves)
+        if self._buffer or not leaves:
+            leaves.append(_leaf(self._buffer))
+        return _root(self._size, leaves)
+
+
+class ContentHasher:
+    """
+    Hash incremental de contenido con el algoritmo de un digest.
+
+    hexdigest() retorna el digest interno (comparable con entry_digest()).
+    """
+
+    def __init__(self, alg: str = SHA256, threads: int = 1):
+        _require(alg)
+        self.alg = alg
+        if alg == SHA256_TREE:
+            self._h = TreeHasher()
+        elif alg == BLAKE3:
+            self._h = blake3.blake3(max_threads=threads)
+        else:
+            self._h = hashlib.sha256()
+
+    @classmethod
+    def for_digest(cls, digest: Optional[str], threads: int = 1) -> "ContentHasher":
+        """Hasher del algoritmo de un digest esperado (sha256 si es None)."""
+        return cls(digest_alg(digest), threads)
+
+    def update(self, data: bytes) -> None:
+        self._h.update(data)
+
+    def hexdigest(self) -> str:
+        return format_digest(self.alg, self._h.hexdigest())
+
+
+def hash_bytes(data: bytes, alg: str = SHA256) -> str:
+    """Digest interno de un contenido en memoria."""
+    h = ContentHasher(alg)
+    h.update(data)
+    return h.hexdigest()
+
+
+def hash_file(path: Path, alg: str = SHA256, threads: int = DEFAULT_HASH_THREADS) -> str:
+    """
+    Digest interno de un archivo.
+
+    Con sha256-tree, los bloques de un archivo grande se leen y hashean en
+    threads hilos (cada uno abre el archivo y lee su bloque por offset).
+    """
+    _require(alg)
+    size = path.stat().st_size
+    if alg == SHA256_TREE and threads > 1 and size > TREE_CHUNK_SIZE:
+        def leaf_at(offset: int) -> bytes:
+            with path.open("rb") as f:
+                f.seek(offset)
+                return _leaf(f.read(TREE_CHUNK_SIZE))
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            leaves = list(pool.map(leaf_at, range(0, size, TREE_CHUNK_SIZE)))
+        return format_digest(alg, _root(size, leaves))
+
+    h = ContentHasher(alg, threads)
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(_READ_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
@@ -0,0 +1,99 @@
+"""
+Materialización de archivos sin copiar bytes cuando el sistema de archivos lo permite.
+
+Estrategias (en orden de preferencia):
+1. reflink:  clon copy-on-write (Btrfs/XFS vía FICLONE, APFS vía clonefile)
+2. hardlink: mismo inodo compartido entre releases (NTFS/ext4/...)
+3. copy:     copia byte a byte (shutil.copy2)
+
+IMPORTANTE: con hardlink el contenido se comparte entre releases. El updater
+nunca escribe in-place sobre un archivo existente de una release (descarga a
+archivos nuevos en staging y activa por rename), por lo que compartir es seguro.
+"""
+
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Sequence
+
+STRATEGIES = ("reflink", "hardlink", "copy")
+
+# ioctl FICLONE de Linux (_IOW(0x94, 9, int))
+_FICLONE = 0x40049409
+
+
+def _reflink_linux(src: Path, dst: Path) -> None:
+    import fcntl
+
+    with src.open("rb") as fsrc, dst.open("wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+
+
+def _reflink_darwin(src: Path, dst: Path) -> None:
+    import ctypes
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+
+
+def reflink(src: Path, dst: Path) -> None:
+    """
+    Clona src en dst con copy-on-write.
+
+    Raises:
+        OSError: si la plataforma o el sistema de archivos no soporta reflinks
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            _reflink_linux(src, dst)
+        except OSError:
+            # FICLONE deja un archivo vacío si falla
+            dst.unlink(missing_ok=True)
+            raise
+    elif sys.platform == "darwin":
+        _reflink_darwin(src, dst)
+    else:
+        raise OSError(f"reflink no soportado en {sys.platform}")
+    shutil.copystat(src, dst)
+
+
+def materialize_file(src: Path, dst: Path, strategies: Sequence[str] = STRATEGIES) -> str:
+    """
+    Crea dst con el mismo contenido que src usando la estrategia más barata disponible.
+
+    Si dst ya existe (p. ej. staging reanudado) se elimina antes: nunca se
+    escribe sobre él, porque podría ser un hardlink compartido con otra release.
+
+    Args:
+        src: Archivo origen (existente)
+        dst: Ruta destino
+        strategies: Estrategias a intentar en orden
+
+    Returns:
+        Estrategia usada: "reflink", "hardlink" o "copy"
+
+    Raises:
+        OSError: si ninguna estrategia funcionó
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    dst.unlink(missing_ok=True)
+
+    last_error: OSError = OSError(f"sin estrategias para materializar {dst}")
+    for strategy in strategies:
+        try:
+            if strategy == "reflink":
+                reflink(src, dst)
+            elif strategy == "hardlink":
+                os.link(src, dst)
+            elif strategy == "copy":
+                shutil.copy2(src, dst)
+            else:
+                raise ValueError(f"Estrategia desconocida: {strategy}")
+            return strategy
+        except OSError as e:
+            last_error = e
+
+    raise last_error
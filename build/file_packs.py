@@ -0,0 +1,151 @@
+"""
+Packs de archivos pequeños para la transferencia delta.
+
+Un frontend o una tool como BitMusic son cientos de archivos de pocos KB: con
+una URL por archivo, una actualización cuesta una petición HTTP por archivo.
+generate_manifest.py puede agrupar los archivos pequeños (en orden de path, los
+de un mismo directorio quedan juntos) en packs direccionados por contenido:
+
+    "packs": [
+      {
+        "sha256": "<hash del pack>", "size": 812345,
+        "url": ".../bitmusic/packs/<hash>.pack",
+        "files": [{"path": "frontend/app.js", "offset": 0, "size": 5120}, ...]
+      }
+    ]
+
+El pack es la concatenación de los archivos, sin cabeceras: el índice de
+offsets va en el manifest. Las entradas de files[] no cambian (siguen teniendo
+su URL individual), así que un manifest con packs sigue siendo válido para un
+updater que no los conozca. Un pack sin cambios conserva su URL entre versiones.
+
+El updater descarga un pack solo si necesita varios de sus miembros, lo
+verifica contra su sha256 y lo reparte en staging verificando el sha256 de
+cada archivo; lo que no sale del pack se descarga por su URL individual.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import quote
+
+try:
+    from file_hashing import digest_alg, entry_digest, hash_bytes
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent))
+    from file_hashing import digest_alg, entry_digest, hash_bytes
+
+PACK_SUFFIX = ".pack"
+
+# Archivos hasta este tamaño van a packs; cada pack se cierra al llegar a target
+DEFAULT_PACK_FILE_MAX = 64 * 1024
+DEFAULT_PACK_TARGET = 1024 * 1024
+
+# Un pack se descarga si cubre al menos estos archivos necesarios (con uno solo,
+# la URL individual es una petición igual y transfiere menos)
+MIN_MEMBERS_TO_FETCH = 2
+
+
+def plan_packs(files: List[Dict], max_file_size: int, target_size: int) -> List[List[Dict]]:
+    """
+    Agrupa las entradas pequeñas del manifest en packs, en orden de path.
+
+    Solo se forman packs de 2 o más archivos.
+    """
+    groups: List[List[Dict]] = []
+    current: List[Dict] = []
+    current_size = 0
+    for entry in sorted(files, key=lambda f: f["path"]):
+        if entry["size"] > max_file_size:
+            continue
+        if current and current_size + entry["size"] > target_size:
+            groups.append(current)
+            current, current_size = [], 0
+        current.append(entry)
+        current_size += entry["size"]
+    if current:
+        groups.append(current)
+    return [group for group in groups if len(group) > 1]
+
+
+def pack_url(base_url: str, tool_id: str, sha256: str) -> str:
+    """URL de un pack (sin versión: el nombre es su hash)."""
+    return f"{base_url.rstrip('/')}/{quote(tool_id)}/packs/{sha256}{PACK_SUFFIX}"
+
+
+def write_pack(tool_dir: Path, members: List[Dict], packs_dir: Path, base_url: str, tool_id: str) -> Dict:
+    """
+    Escribe un pack en packs_dir/{tool_id}/packs/{sha256}.pack y retorna su entrada.
+
+    Raises:
+        ValueError: si un archivo cambió desde que se hasheó para el manifest
+    """
+    data = bytearray()
+    index = []
+    for entry in members:
+        content = (tool_dir / entry["path"]).read_bytes()
+        expected = entry_digest(entry)
+        if hash_bytes(content, digest_alg(expected)) != expected:
+            raise ValueError(f"{entry['path']} cambió durante la generación del manifest")
+        index.append({"path": entry["path"], "offset": len(data), "size": len(content)})
+        data += content
+
+    sha256 = hashlib.sha256(data).hexdigest()
+    pack_path = packs_dir / tool_id / "packs" / f"{sha256}{PACK_SUFFIX}"
+    if not (pack_path.exists() and pack_path.stat().st_size == len(data)):
+        pack_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = pack_path.with_name(pack_path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, pack_path)
+
+    return {"sha256": sha256, "size": len(data), "url": pack_url(base_url, tool_id, sha256), "files": index}
+
+
+def build_packs(
+    tool_dir: Path,
+    files: List[Dict],
+    packs_dir: Path,
+    base_url: str,
+    tool_id: str,
+    max_file_size: int = DEFAULT_PACK_FILE_MAX,
+    target_size: int = DEFAULT_PACK_TARGET
+) -> List[Dict]:
+    """Packs de los archivos pequeños de una tool (entradas para manifest["packs"])."""
+    return [
+        write_pack(tool_dir, group, packs_dir, base_url, tool_id)
+        for group in plan_packs(files, max_file_size, target_size)
+    ]
+
+
+def split_pack(pack_path: Path, pack: Dict, wanted: Dict[str, str], dest_dir: Path) -> Tuple[List[str], List[str]]:
+    """
+    Reparte los miembros pedidos de un pack descargado en dest_dir.
+
+    Cada archivo se verifica contra su hash antes de publicarse (tmp + rename).
+
+    Args:
+        wanted: {path: digest esperado (ver file_hashing)} de los miembros a extraer
+
+    Returns:
+        (paths extraídos, paths cuyo contenido no coincide con su hash)
+    """
+    extracted, corrupt = [], []
+    with pack_path.open("rb") as f:
+        for member in pack["files"]:
+            expected = wanted.get(member["path"])
+            if expected is None:
+                continue
+            f.seek(member["offset"])
+            content = f.read(member["size"])
+            if len(content) != member["size"] or hash_bytes(content, digest_alg(expected)) != expected:
+                corrupt.append(member["path"])
+                continue
+            target = dest_dir / member["path"]
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = target.with_name(target.name + ".unpack")
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, target)
+            extracted.append(member["path"])
+    return extracted, corrupt
@@ -2,6 +2,9 @@
 Generador de manifiestos para releases de tools con actualización diferencial.
 Calcula hashes SHA256 de cada archivo y genera manifest.json.
 
+Con --hash-alg sha256-tree (o blake3) el manifest es v2: cada archivo declara
+su "hash_alg" y su "hash", verificables en paralelo (ver file_hashing.py).
+
 DISTRIBUCIÓN:
 - Opción A (recomendada): HQ como mirror
   BASE_URL = "https://hq.bitstation.local/tools/{tool_id}/{version}/files/"
@@ -9,14 +12,38 @@ DISTRIBUCIÓN:
   BASE_URL = "https://raw.githubusercontent.com/user/repo/{tag}/tools/{tool_id}/"
 """
 
+import fnmatch
 import hashlib
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from urllib.parse import quote
 
+try:
+    from chunking import chunk_file, chunking_params, vectorized_available
+    from file_hashing import SHA256, available_algs, entry_fields, hash_file
+    from file_linker import materialize_file
+    from file_packs import DEFAULT_PACK_TARGET, build_packs
+    from hash_cache import HashCache
+    from manifest_patch import make_patch, patch_name, version_key
+    from transport_compression import MAX_RATIO, SUFFIXES, compress_file, is_compressible
+    from tree_walk import walk_files
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent))
+    from chunking import chunk_file, chunking_params, vectorized_available
+    from file_hashing import SHA256, available_algs, entry_fields, hash_file
+    from file_linker import materialize_file
+    from file_packs import DEFAULT_PACK_TARGET, build_packs
+    from hash_cache import HashCache
+    from manifest_patch import make_patch, patch_name, version_key
+    from transport_compression import MAX_RATIO, SUFFIXES, compress_file, is_compressible
+    from tree_walk import walk_files
+
 # Scopes explícitos (según recomendación)
 EXCLUDE_NAMES = {".git", "__pycache__", ".venv", "venv", "dist", ".pytest_cache", "node_modules", "models", "output", "temp", "uploads"}
 EXCLUDE_PATTERNS = {"*.pyc", ".DS_Store", "Thumbs.db", "*.tmp", "*.gguf", "*.safetensors", "*.bin", "*.pth", "*.ckpt"}
@@ -24,6 +51,20 @@ EXCLUDE_PATTERNS = {"*.pyc", ".DS_Store", "Thumbs.db", "*.tmp", "*.gguf", "*.saf
 # IMPORTANTE: Los modelos/pesos DEBEN estar en el manifest para garantizar consistencia
 # NO excluir .gguf, .safetensors, .bin, .pth, .ckpt si afectan el output
 
+# Hilos de hashing por defecto: hashlib libera el GIL, así que las lecturas y
+# los hashes de varios archivos se solapan (el chunking CDC es Python puro)
+DEFAULT_HASH_WORKERS = min(8, os.cpu_count() or 1)
+
+# Caché de hashes de build: no registrar archivos modificados hace menos de esto
+# (con la resolución de mtime, otra escritura en el mismo instante pasaría inadvertida)
+CACHE_MIN_AGE_NS = 2 * 1_000_000_000
+
+# Archivos "fríos" (no necesarios para ejecutar la tool): llevan "hot": false y el
+# updater puede descargarlos en segundo plano tras activar. Se comparan con el path
+# relativo (fnmatch: * también cruza /). Opt-in: cada tool los declara con
+# "cold_globs" en tool.json; sin ellos todos los archivos son calientes
+DEFAULT_COLD_GLOBS: List[str] = []
+
 DEFAULT_IGNORE_GLOBS = [
     "venv/**",
     ".venv/**",
@@ -77,8 +118,13 @@ def should_exclude(path: Path, base: Path) -> bool:
     - runtime_scope/: venv/, cache/ (NUNCA en manifest, protegido)
     - user_scope/: user_data/ (NUNCA en manifest, protegido)
     """
-    # Excluir por nombre de directorio (runtime_scope + user_scope)
-    if any(part in EXCLUDE_NAMES for part in path.parts):
+    # Excluir por nombre de directorio (runtime_scope + user_scope), solo dentro de la tool
+    if any(part in EXCLUDE_NAMES for part in path.relative_to(base).parts):
+        return True
+    
+    # El manifest no se lista a sí mismo: se reescribe en cada run (created_at)
+    # y el updater escribe el suyo al activar la release
+    if path.name == "manifest.json" and path.parent == base:
         return True
     
     # Excluir por patrón (archivos temporales/compilados)
@@ -93,7 +139,20 @@ def should_exclude(path: Path, base: Path) -> bool:
     return False
 
 
-def collect_files(tool_dir: Path, base_url: str, tool_id: str, version: str) -> List[Dict[str, Any]]:
+def collect_files(
+    tool_dir: Path,
+    base_url: str,
+    tool_id: str,
+    version: str,
+    chunk_threshold: Optional[int] = None,
+    compress: Optional[str] = None,
+    compressed_dir: Optional[Path] = None,
+    hash_cache: Optional[HashCache] = None,
+    workers: Optional[int] = None,
+    cold_globs: Optional[List[str]] = None,
+    hot_paths: Optional[List[str]] = None,
+    hash_alg: str = SHA256
+) -> List[Dict[str, Any]]:
     """
     Recolecta información de todos los archivos de una tool.
     
@@ -102,28 +161,75 @@ def collect_files(tool_dir: Path, base_url: str, tool_id: str, version: str) ->
         base_url: URL base para descargas (ej: "https://hq.bitstation.local/api/v1/tools/")
         tool_id: ID de la tool
         version: Versión de la tool
+        chunk_threshold: Si se indica, los archivos de este tamaño o mayores incluyen
+            su lista de chunks por contenido (deltas binarios en el updater)
+        compress: Encoding de transporte ("gzip" o "zstd"); None = sin variantes comprimidas
+        compressed_dir: Directorio donde escribir las variantes, con el mismo layout que
+            las URLs ({tool_id}/{version}/files/{path}.gz) para publicarlas junto a los crudos
+        hash_cache: Caché de build (path, size, mtime_ns) → sha256/chunks/variante; los
+            archivos sin cambios reutilizan lo registrado en vez de releerse
+        workers: Hilos de hashing (default DEFAULT_HASH_WORKERS, 1 = secuencial)
+        cold_globs: Patrones de archivos fríos ("hot": false); None = todos calientes
+        hot_paths: Paths siempre calientes aunque coincidan con cold_globs (entrypoints)
+        hash_alg: Algoritmo de hash por archivo (sha256 = entradas v1; otro = "hash_alg" + "hash")
     
     GARANTÍAS:
     - Orden determinista: Ordenado por path normalizado
     - Paths normalizados: Siempre forward slash (/)
-    - Hashing eficiente: Streaming para archivos grandes
+    - Hashing eficiente: Streaming para archivos grandes, varios archivos en paralelo
     - URLs individuales: Para delta update real
+    - Variantes comprimidas deterministas: mismo contenido → mismo sha256
+    - Con caché o en paralelo: resultado idéntico al de un run completo secuencial
     """
-    files = []
-    
-    # Recolectar todos los archivos primero
-    all_files = [p for p in tool_dir.rglob("*") if p.is_file() and not should_exclude(p, tool_dir)]
-    
-    # Ordenar por path relativo normalizado para determinismo
-    all_files.sort(key=lambda p: p.relative_to(tool_dir).as_posix())
-    
-    for p in all_files:
+    if compress and compressed_dir is None:
+        raise ValueError("compressed_dir requerido si compress está activo")
+    if workers is None:
+        workers = DEFAULT_HASH_WORKERS
+    
+    params = chunking_params()
+    
+    # Recolectar todos los archivos primero, sin entrar en directorios excluidos
+    # (walk_files ya ordena por path relativo normalizado, para determinismo)
+    all_files = [
+        p for _, p in walk_files(tool_dir, EXCLUDE_NAMES, lambda rel, p: should_exclude(p, tool_dir))
+    ]
+    
+    # Los hilos van a un solo nivel: con varios archivos en paralelo, cada archivo
+    # se hashea en un hilo (si no, sha256-tree abriría workers² hilos)
+    parallel_files = workers > 1 and len(all_files) > 1
+    leaf_threads = 1 if parallel_files else workers
+    
+    def process(p: Path) -> Tuple[Dict[str, Any], bool]:
+        """Entrada de manifest de un archivo y si salió de la caché."""
         # Normalizar path: siempre forward slash
         rel_path = p.relative_to(tool_dir).as_posix()
         
-        # Hash con streaming eficiente
-        file_hash = sha256_file(p)
-        file_size = p.stat().st_size
+        st = p.stat()
+        file_size = st.st_size
+        chunks = None
+        wants_chunks = chunk_threshold is not None and file_size >= chunk_threshold
+        cached = hash_cache.lookup_entry(p, hash_alg) if hash_cache is not None else None
+        cache_hit = False
+        
+        # Hash con streaming eficiente (y chunks en la misma lectura para archivos grandes)
+        if cached is not None and (not wants_chunks or cached.get("chunking") == params):
+            file_hash = cached["sha256"]
+            chunks = cached.get("chunks") if wants_chunks else None
+            cache_hit = True
+        elif wants_chunks:
+            print(f"[manifest]   Chunking: {rel_path} ({file_size / (1024*1024):.1f} MB)...")
+            chunks, file_hash = chunk_file(p)
+            if hash_alg != SHA256:
+                file_hash = hash_file(p, hash_alg, leaf_threads)
+        elif hash_alg != SHA256:
+            file_hash = hash_file(p, hash_alg, leaf_threads)
+        else:
+            file_hash = sha256_file(p)
+        
+        cache_extra: Dict[str, Any] = {}
+        if chunks is not None:
+            cache_extra["chunks"] = chunks
+            cache_extra["chunking"] = params
         
         # Construir URL individual para el archivo
         # HQ mirror: {base_url}/{tool_id}/{version}/files/{path}
@@ -133,7 +239,7 @@ def collect_files(tool_dir: Path, base_url: str, tool_id: str, version: str) ->
         
         file_info = {
             "path": rel_path,  # Normalizado
-            "sha256": file_hash,
+            **entry_fields(file_hash),  # "sha256" (v1) o "hash_alg" + "hash" (v2)
             "size": file_size,
             "url": file_url  # URL individual (requerido)
         }
@@ -142,11 +248,96 @@ def collect_files(tool_dir: Path, base_url: str, tool_id: str, version: str) ->
         if p.suffix in {".ps1", ".sh", ".py"} or p.name in {"run", "setup"}:
             file_info["executable"] = True
         
-        files.append(file_info)
+        # Archivos fríos: no hacen falta para arrancar la tool
+        if is_cold(rel_path, cold_globs, hot_paths):
+            file_info["hot"] = False
+        
+        if chunks is not None:
+            file_info["chunks"] = chunks
+        
+        # Variante comprimida de transporte (solo si ahorra lo suficiente)
+        if compress and file_size > 0 and is_compressible(p):
+            variant_path = compressed_dir / f"{tool_id}/{version}/files/{rel_path}{SUFFIXES[compress]}"
+            variant = reuse_cached_variant(cached, compress, variant_path, file_size)
+            if variant is None:
+                variant_size, variant_hash = compress_file(p, variant_path, compress)
+                variant = {"size": variant_size, "sha256": variant_hash, "file": str(variant_path)}
+                if variant_size > file_size * MAX_RATIO:
+                    variant_path.unlink()
+            
+            if variant["size"] <= file_size * MAX_RATIO:
+                file_info["compressed"] = {
+                    "encoding": compress,
+                    "url": file_url + SUFFIXES[compress],
+                    "size": variant["size"],
+                    "sha256": variant["sha256"]
+                }
+            cache_extra["compressed"] = {compress: variant}
+        
+        # Registrar en caché (salvo archivos recién modificados, ver CACHE_MIN_AGE_NS)
+        if hash_cache is not None and time.time_ns() - st.st_mtime_ns >= CACHE_MIN_AGE_NS:
+            hash_cache.record(p, file_hash, **cache_extra)
+        
+        return file_info, cache_hit
+    
+    if parallel_files:
+        # Los más grandes primero (no quedan solos al final); el resultado se
+        # arma en el orden determinista de all_files
+        sizes = {p: p.stat().st_size for p in all_files}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {p: pool.submit(process, p) for p in sorted(all_files, key=sizes.get, reverse=True)}
+            results = [futures[p].result() for p in all_files]
+    else:
+        results = [process(p) for p in all_files]
+    
+    files = [file_info for file_info, _ in results]
+    
+    if hash_cache is not None:
+        cache_hits = sum(1 for _, hit in results if hit)
+        print(f"[manifest]   Caché de hashes: {cache_hits}/{len(all_files)} archivos sin re-hashear")
     
     return files
 
 
+def is_cold(rel_path: str, cold_globs: Optional[List[str]], hot_paths: Optional[List[str]] = None) -> bool:
+    """True si el archivo coincide con algún patrón frío y no es un entrypoint."""
+    if not cold_globs or rel_path in (hot_paths or ()):
+        return False
+    return any(fnmatch.fnmatchcase(rel_path, pattern) for pattern in cold_globs)
+
+
+def reuse_cached_variant(
+    cached: Optional[Dict[str, Any]],
+    encoding: str,
+    variant_path: Path,
+    file_size: int
+) -> Optional[Dict[str, Any]]:
+    """
+    Variante comprimida registrada en la caché de build, si sigue siendo utilizable.
+    
+    Si la variante se publica y su archivo está en otra ruta (otra versión), se
+    enlaza/copia a variant_path en vez de recomprimir.
+    
+    Returns:
+        {"size", "sha256", "file"} o None si hay que recomprimir
+    """
+    variant = (cached or {}).get("compressed", {}).get(encoding)
+    if variant is None:
+        return None
+    if variant["size"] > file_size * MAX_RATIO:
+        return variant  # No compensa publicarla: no hace falta el archivo
+    
+    source = Path(variant["file"])
+    try:
+        if source.stat().st_size != variant["size"]:
+            return None
+        if source != variant_path:
+            materialize_file(source, variant_path, ("reflink", "hardlink", "copy"))
+    except OSError:
+        return None
+    return {**variant, "file": str(variant_path)}
+
+
 def normalize_manifest_for_hash(manifest: Dict[str, Any]) -> str:
     """
     Normaliza el manifiesto para cálculo de hash (excluye el campo manifest_hash y created_at).
@@ -159,7 +350,19 @@ def normalize_manifest_for_hash(manifest: Dict[str, Any]) -> str:
     return json.dumps(normalized, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
 
 
-def generate_manifest(tool_dir: Path, tool_meta: Dict[str, Any], base_url: Optional[str] = None) -> Dict[str, Any]:
+def generate_manifest(
+    tool_dir: Path,
+    tool_meta: Dict[str, Any],
+    base_url: Optional[str] = None,
+    chunk_threshold: Optional[int] = None,
+    compress: Optional[str] = None,
+    compressed_dir: Optional[Path] = None,
+    hash_cache: Optional[HashCache] = None,
+    workers: Optional[int] = None,
+    pack_max_file: Optional[int] = None,
+    packs_dir: Optional[Path] = None,
+    hash_alg: str = SHA256
+) -> Dict[str, Any]:
     """
     Genera el manifiesto completo para una tool.
     
@@ -167,7 +370,18 @@ def generate_manifest(tool_dir: Path, tool_meta: Dict[str, Any], base_url: Optio
         tool_dir: Directorio de la tool
         tool_meta: Metadata de tool.json
         base_url: URL base para descarga de archivos (si None, usa env var o default)
+        chunk_threshold: Tamaño mínimo (bytes) para registrar chunks por archivo (None = desactivado)
+        compress: Encoding de las variantes comprimidas de transporte (None = desactivado)
+        compressed_dir: Directorio de salida de las variantes comprimidas
+        hash_cache: Caché de hashes de build (None = hashear todo)
+        workers: Hilos de hashing (default DEFAULT_HASH_WORKERS, 1 = secuencial)
+        pack_max_file: Agrupar los archivos de hasta este tamaño en packs (None = desactivado)
+        packs_dir: Directorio de salida de los packs ({tool_id}/packs/{sha256}.pack)
+        hash_alg: Algoritmo de hash por archivo; distinto de sha256 genera un manifest v2
     """
+    if pack_max_file and packs_dir is None:
+        raise ValueError("packs_dir requerido si pack_max_file está activo")
+    
     tool_id = tool_meta["tool_id"]
     tool_version = tool_meta["version"]
     
@@ -180,14 +394,29 @@ def generate_manifest(tool_dir: Path, tool_meta: Dict[str, Any], base_url: Optio
     
     print(f"[manifest] Generando manifiesto para {tool_id} v{tool_version}...")
     print(f"[manifest]   Base URL: {base_url}")
-    
-    # Recolectar archivos con URLs individuales
-    files = collect_files(tool_dir, base_url, tool_id, tool_version)
+    if hash_alg != SHA256:
+        print(f"[manifest]   Hash por archivo: {hash_alg} (manifest v2)")
+    
+    # Recolectar archivos con URLs individuales (los entrypoints siempre calientes)
+    cold_globs = tool_meta.get("cold_globs", DEFAULT_COLD_GLOBS)
+    hot_paths = [v for k, v in tool_meta.items() if k.startswith("entrypoint") and isinstance(v, str)]
+    files = collect_files(
+        tool_dir, base_url, tool_id, tool_version, chunk_threshold, compress, compressed_dir, hash_cache, workers,
+        cold_globs, hot_paths, hash_alg
+    )
     print(f"[manifest]   {len(files)} archivos procesados")
-    
-    # Construir manifiesto base
+    cold = [f for f in files if f.get("hot") is False]
+    if cold:
+        print(f"[manifest]   {len(cold)} archivos fríos (descarga diferida): {sum(f['size'] for f in cold)} bytes")
+    if compress:
+        variants = [f for f in files if "compressed" in f]
+        raw = sum(f["size"] for f in variants)
+        packed = sum(f["compressed"]["size"] for f in variants)
+        print(f"[manifest]   {len(variants)} variantes {compress}: {raw} -> {packed} bytes")
+    
+    # Construir manifiesto base (v2 solo si los archivos declaran hash_alg)
     manifest = {
-        "manifest_version": "1.0",
+        "manifest_version": "1.0" if hash_alg == SHA256 else "2.0",
         "tool_id": tool_id,
         "tool_version": tool_version,
         "created_at": datetime.now(timezone.utc).isoformat(),
@@ -196,6 +425,18 @@ def generate_manifest(tool_dir: Path, tool_meta: Dict[str, Any], base_url: Optio
         "ignore_globs": DEFAULT_IGNORE_GLOBS.copy()
     }
     
+    # Packs de archivos pequeños (índice de offsets; files[] no cambia)
+    if pack_max_file:
+        packs = build_packs(tool_dir, files, packs_dir, base_url, tool_id, pack_max_file, DEFAULT_PACK_TARGET)
+        if packs:
+            manifest["packs"] = packs
+            packed = sum(len(pack["files"]) for pack in packs)
+            print(f"[manifest]   {packed} archivos pequeños en {len(packs)} packs")
+    
+    # Parámetros de chunking (solo si algún archivo se chunkeó)
+    if any("chunks" in f for f in files):
+        manifest["chunking"] = chunking_params()
+    
     # Agregar configuración Flash GPU si la tool lo soporta
     if tool_meta.get("supports_gpu_persistence"):
         manifest["flash_gpu_config"] = {
@@ -217,19 +458,99 @@ def generate_manifest(tool_dir: Path, tool_meta: Dict[str, Any], base_url: Optio
     return manifest
 
 
-def generate_manifests_for_all_tools(repo_root: Path, base_url: str) -> Dict[str, Dict[str, Any]]:
+def record_release(history_dir: Path, manifest: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+    """
+    Archiva el manifest en el historial y emite el parche desde la versión anterior.
+    
+    Layout:
+        {history_dir}/{tool_id}/manifests/{version}.json
+        {history_dir}/{tool_id}/patches/{from}_to_{to}.json
+    
+    Args:
+        history_dir: Directorio del historial de releases
+        manifest: Manifest recién generado
+        previous: manifest.json que había en la tool antes de regenerar (se
+            archiva si es de otra versión; así el historial arranca solo)
+    
+    Returns:
+        Path del parche escrito, o None si no hay versión anterior archivada
+    """
+    tool_history = history_dir / manifest["tool_id"]
+    manifests_dir = tool_history / "manifests"
+    manifests_dir.mkdir(parents=True, exist_ok=True)
+    
+    def dump(path: Path, data: Dict[str, Any]) -> None:
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    
+    if previous and previous.get("tool_id") == manifest["tool_id"] and previous.get("tool_version") != manifest["tool_version"]:
+        previous_path = manifests_dir / f"{previous['tool_version']}.json"
+        if not previous_path.exists():
+            dump(previous_path, previous)
+    dump(manifests_dir / f"{manifest['tool_version']}.json", manifest)
+    
+    # Base del parche: la versión archivada inmediatamente anterior
+    current_key = version_key(manifest["tool_version"])
+    older = [p for p in manifests_dir.glob("*.json") if version_key(p.stem) < current_key]
+    if not older:
+        return None
+    base_path = max(older, key=lambda p: version_key(p.stem))
+    base = json.loads(base_path.read_text(encoding="utf-8"))
+    
+    patch = make_patch(base, manifest)
+    patch_path = tool_history / "patches" / patch_name(patch["from_version"], patch["to_version"])
+    patch_path.parent.mkdir(parents=True, exist_ok=True)
+    dump(patch_path, patch)
+    print(
+        f"[manifest]   Parche {patch['from_version']} -> {patch['to_version']}: "
+        f"+{len(patch['added'])} ~{len(patch['changed'])} -{len(patch['removed'])} "
+        f"({patch_path.stat().st_size} bytes)"
+    )
+    return patch_path
+
+
+def generate_manifests_for_all_tools(
+    repo_root: Path,
+    base_url: str,
+    chunk_threshold: Optional[int] = None,
+    compress: Optional[str] = None,
+    compressed_dir: Optional[Path] = None,
+    tool_ids: Optional[List[str]] = None,
+    cache_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+    history_dir: Optional[Path] = None,
+    pack_max_file: Optional[int] = None,
+    packs_dir: Optional[Path] = None,
+    hash_alg: str = SHA256
+) -> Dict[str, Dict[str, Any]]:
     """
     Genera manifiestos para todas las tools en el repo.
     
     Args:
         repo_root: Raíz del repositorio
         base_url: URL base para descargas
+        chunk_threshold: Tamaño mínimo (bytes) para registrar chunks por archivo (None = desactivado)
+        compress: Encoding de las variantes comprimidas de transporte (None = desactivado)
+        compressed_dir: Directorio de salida de las variantes (default dist/files)
+        tool_ids: Regenerar solo estas tools (tool_id o nombre de carpeta); None = todas
+        cache_dir: Directorio de la caché de hashes de build, un archivo por tool
+            (None = sin caché, se hashea todo)
+        workers: Hilos de hashing por tool (default DEFAULT_HASH_WORKERS, 1 = secuencial)
+        history_dir: Historial de manifests y parches entre versiones (ver
+            record_release); None = no emitir parches
+        pack_max_file: Agrupar archivos de hasta este tamaño en packs (None = desactivado)
+        packs_dir: Directorio de salida de los packs (default dist/files)
+        hash_alg: Algoritmo de hash por archivo (default sha256 = manifest v1)
     
     Returns:
         Diccionario {tool_id: manifest}
     """
     tools_dir = repo_root / "tools"
     manifests = {}
+    matched = set()
+    if compress and compressed_dir is None:
+        compressed_dir = repo_root / "dist" / "files"
+    if pack_max_file and packs_dir is None:
+        packs_dir = repo_root / "dist" / "files"
     
     for tool_path in sorted([p for p in tools_dir.iterdir() if p.is_dir() and p.name not in EXCLUDE_NAMES]):
         meta_path = tool_path / "tool.json"
@@ -240,10 +561,35 @@ def generate_manifests_for_all_tools(repo_root: Path, base_url: str) -> Dict[str
         
         try:
             tool_meta = json.loads(meta_path.read_text(encoding="utf-8"))
-            manifest = generate_manifest(tool_path, tool_meta, base_url)
+            if tool_ids:
+                if tool_meta["tool_id"] not in tool_ids and tool_path.name not in tool_ids:
+                    continue
+                matched.update({tool_meta["tool_id"], tool_path.name})
             
-            # Guardar manifest.json dentro de la tool
+            hash_cache = None
+            if cache_dir is not None:
+                hash_cache = HashCache(tool_path, cache_path=cache_dir / f"{tool_path.name}.json", track_inode=False)
+            
+            # Manifest anterior (base del parche si cambió la versión)
             manifest_path = tool_path / "manifest.json"
+            previous = None
+            if history_dir is not None and manifest_path.exists():
+                try:
+                    previous = json.loads(manifest_path.read_text(encoding="utf-8"))
+                except ValueError:
+                    previous = None
+            
+            manifest = generate_manifest(
+                tool_path, tool_meta, base_url, chunk_threshold, compress, compressed_dir, hash_cache, workers,
+                pack_max_file, packs_dir, hash_alg
+            )
+            if hash_cache is not None:
+                hash_cache.save()
+            
+            if history_dir is not None:
+                record_release(history_dir, manifest, previous)
+            
+            # Guardar manifest.json dentro de la tool
             
             # Verificar si hay problemas de escritura
             try:
@@ -262,6 +608,9 @@ def generate_manifests_for_all_tools(repo_root: Path, base_url: str) -> Dict[str
             print(f"[manifest] ERROR procesando {tool_path.name}: {e}")
             continue
     
+    for tool_id in sorted(set(tool_ids or ()) - matched):
+        print(f"[manifest] WARN: tool no encontrada: {tool_id}")
+    
     return manifests
 
 
@@ -282,8 +631,85 @@ def main() -> int:
         help="Usar GitHub raw URLs (formato: https://github.com/{user}/{repo}/releases/download/{tag}/)"
     )
     
+    parser.add_argument(
+        "--chunk-threshold-mb",
+        type=float,
+        default=None,
+        help="Registrar chunks por contenido (deltas binarios) para archivos >= N MB (default: desactivado). "
+             "Con numpy ~60 MB/s por archivo; sin numpy ~5 MB/s (un modelo de varios GB tarda más de 10 min)"
+    )
+    parser.add_argument(
+        "--compress",
+        choices=sorted(SUFFIXES),
+        default=None,
+        help="Publicar variantes comprimidas de transporte por archivo (default: desactivado)"
+    )
+    parser.add_argument(
+        "--compressed-dir",
+        type=Path,
+        default=None,
+        help="Salida de las variantes comprimidas, con el layout de las URLs (default: dist/files)"
+    )
+    
+    parser.add_argument(
+        "--pack-small-kb",
+        type=float,
+        default=None,
+        help="Agrupar archivos de hasta N KB en packs (una petición por pack; default: desactivado)"
+    )
+    parser.add_argument(
+        "--packs-dir",
+        type=Path,
+        default=None,
+        help="Salida de los packs, con el layout de las URLs (default: dist/files)"
+    )
+    
+    parser.add_argument(
+        "--hash-alg",
+        choices=available_algs(),
+        default=SHA256,
+        help="Hash por archivo: sha256 (manifest v1) o sha256-tree/blake3 (manifest v2, verificación en paralelo)"
+    )
+    
+    parser.add_argument(
+        "--tool",
+        action="append",
+        default=None,
+        help="Regenerar solo esta tool (tool_id o carpeta); repetible (default: todas)"
+    )
+    parser.add_argument(
+        "--hash-workers",
+        type=int,
+        default=DEFAULT_HASH_WORKERS,
+        help=f"Hilos de hashing (default {DEFAULT_HASH_WORKERS}, 1 = secuencial; bajar en discos HDD)"
+    )
+    parser.add_argument(
+        "--history-dir",
+        type=Path,
+        default=None,
+        help="Historial de manifests y parches entre versiones (default: dist/history)"
+    )
+    parser.add_argument(
+        "--no-patches",
+        action="store_true",
+        help="No archivar el manifest ni emitir el parche desde la versión anterior"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignorar la caché de hashes de build (dist/.manifest_cache) y hashear todo"
+    )
+    
     args = parser.parse_args()
     
+    chunk_threshold = None
+    if args.chunk_threshold_mb is not None:
+        chunk_threshold = int(args.chunk_threshold_mb * 1024 * 1024)
+        if not vectorized_available():
+            print("[manifest] WARN: numpy no está instalado: el chunking será Python puro (~5 MB/s); "
+                  "pip install numpy")
+    pack_max_file = int(args.pack_small_kb * 1024) if args.pack_small_kb else None
+    
     repo = Path(__file__).resolve().parents[1]
     
     # Si se especifica GitHub release, construir base_url apropiada
@@ -296,7 +722,14 @@ def main() -> int:
     print("[manifest] Generando manifiestos de release...")
     print(f"[manifest] Base URL: {base_url}")
     
-    manifests = generate_manifests_for_all_tools(repo, base_url)
+    cache_dir = None if args.no_cache else repo / "dist" / ".manifest_cache"
+    history_dir = None if args.no_patches else (args.history_dir or repo / "dist" / "history")
+    
+    manifests = generate_manifests_for_all_tools(
+        repo, base_url, chunk_threshold, args.compress, args.compressed_dir,
+        tool_ids=args.tool, cache_dir=cache_dir, workers=args.hash_workers, history_dir=history_dir,
+        pack_max_file=pack_max_file, packs_dir=args.packs_dir, hash_alg=args.hash_alg
+    )
     
     print(f"\n[manifest] OK: {len(manifests)} manifiestos generados")
     
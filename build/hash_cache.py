@@ -0,0 +1,179 @@
+"""
+Caché persistente de hashes del worker (por tool).
+
+Vive junto a current.txt (tools/<tool_id>/hash_cache.json) y guarda el SHA256
+de cada archivo de releases/ junto con su identidad en disco:
+(path, size, mtime_ns, inode). Si la identidad no cambió, el hash registrado
+sigue siendo válido y la verificación no necesita releer el archivo.
+
+Las entradas se registran:
+- Al descargar (el downloader ya verificó el hash mientras hacía streaming)
+- Al reutilizar un archivo de la release actual (reflink/hardlink/copia)
+- Al hashear un archivo durante la verificación (cache miss)
+
+Modo paranoid: el updater ignora la caché y re-hashea todo (la caché se
+reescribe con los resultados).
+
+El campo "sha256" guarda el digest de file_hashing: el hex para sha256 o
+"<alg>-<hex>" (manifest v2). lookup(path, alg) solo acepta un digest del mismo
+algoritmo; con otro, el archivo se re-hashea.
+
+generate_manifest.py usa la misma clase en el lado de build, con la caché
+fuera del árbol de la tool y sin inode en la identidad (un checkout o una
+copia cambian el inode pero no el contenido).
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    from file_hashing import digest_alg
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent))
+    from file_hashing import digest_alg
+
+CACHE_FILENAME = "hash_cache.json"
+CACHE_FORMAT_VERSION = 1
+
+
+class HashCache:
+    """
+    Caché (path, size, mtime_ns, inode) → sha256.
+
+    Las claves son rutas relativas a la raíz de la tool (con /), de forma que
+    mover staging → releases/vX solo requiere renombrar el prefijo.
+    """
+
+    def __init__(self, tool_root: Path, cache_path: Optional[Path] = None, track_inode: bool = True):
+        """
+        Args:
+            tool_root: Raíz de la tool (las claves son relativas a ella)
+            cache_path: Archivo de la caché (default tool_root/hash_cache.json)
+            track_inode: Incluir el inode en la identidad del archivo
+        """
+        self.tool_root = tool_root
+        self.path = cache_path if cache_path is not None else tool_root / CACHE_FILENAME
+        self.track_inode = track_inode
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        """Carga la caché desde disco (una caché corrupta se descarta)."""
+        self.entries = {}
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == CACHE_FORMAT_VERSION:
+                self.entries = data.get("entries", {})
+        except (ValueError, OSError) as e:
+            print(f"[hash-cache] WARN: caché ilegible, se descarta: {e}")
+
+    def save(self) -> None:
+        """Escribe la caché de forma atómica (tmp + rename)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": CACHE_FORMAT_VERSION, "entries": self.entries}
+            self._dirty = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def _key(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.tool_root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def _identity(self, path: Path) -> Optional[Dict]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        identity = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        if self.track_inode:
+            identity["inode"] = st.st_ino
+        return identity
+
+    def lookup_entry(self, path: Path, alg: Optional[str] = None) -> Optional[Dict]:
+        """
+        Retorna la entrada registrada (sha256 y datos extra) si la identidad del
+        archivo no cambió (y, con alg, si su digest es de ese algoritmo), si no None.
+        """
+        with self._lock:
+            entry = self.entries.get(self._key(path))
+        if entry is None or (alg is not None and digest_alg(entry["sha256"]) != alg):
+            return None
+
+        identity = self._identity(path)
+        if identity is None:
+            return None
+        if all(entry.get(k) == v for k, v in identity.items()):
+            return entry
+        return None
+
+    def lookup(self, path: Path, alg: Optional[str] = None) -> Optional[str]:
+        """
+        Retorna el hash registrado si la identidad del archivo no cambió, si no None.
+        """
+        entry = self.lookup_entry(path, alg)
+        return entry["sha256"] if entry is not None else None
+
+    def record(self, path: Path, sha256: str, **extra) -> None:
+        """
+        Registra el hash de un archivo con su identidad actual en disco.
+
+        Los argumentos extra (p. ej. chunks) se guardan en la entrada y se
+        recuperan con lookup_entry().
+        """
+        identity = self._identity(path)
+        if identity is None:
+            return
+        identity.update(extra)
+        identity["sha256"] = sha256
+        with self._lock:
+            self.entries[self._key(path)] = identity
+            self._dirty = True
+
+    def forget(self, path: Path) -> None:
+        """Elimina la entrada de un archivo."""
+        with self._lock:
+            if self.entries.pop(self._key(path), None) is not None:
+                self._dirty = True
+
+    def move_prefix(self, old_dir: Path, new_dir: Path) -> None:
+        """Renombra las entradas bajo old_dir a new_dir (tras un rename de directorio)."""
+        old_prefix = self._key(old_dir) + "/"
+        new_prefix = self._key(new_dir) + "/"
+        with self._lock:
+            moved = {
+                new_prefix + key[len(old_prefix):]: entry
+                for key, entry in self.entries.items()
+                if key.startswith(old_prefix)
+            }
+            if not moved:
+                return
+            self.entries = {
+                key: entry for key, entry in self.entries.items()
+                if not key.startswith(old_prefix) and not key.startswith(new_prefix)
+            }
+            self.entries.update(moved)
+            self._dirty = True
+
+    def drop_prefix(self, directory: Path) -> None:
+        """Elimina todas las entradas bajo un directorio (release borrada)."""
+        prefix = self._key(directory) + "/"
+        with self._lock:
+            kept = {k: v for k, v in self.entries.items() if not k.startswith(prefix)}
+            if len(kept) != len(self.entries):
+                self.entries = kept
+                self._dirty = True
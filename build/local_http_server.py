@@ -0,0 +1,179 @@
+"""
+Servidor HTTP local para tests offline de los downloaders.
+
+Sirve un directorio con HTTP/1.1 keep-alive y soporte de Range (206), y
+registra cuántas conexiones TCP y peticiones recibe para poder verificar
+reutilización de conexiones y reanudación.
+
+Uso en tests:
+    with LocalHTTPServer(files_dir) as server:
+        url = server.url_for("file1.txt")
+
+Uso manual:
+    python build/local_http_server.py <directorio> [--port 8765]
+"""
+
+import re
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional
+
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Handler estático con keep-alive y Range de un solo intervalo.
+
+    El servidor debe tener los atributos stats_lock, connections, requests y
+    support_ranges (ver LocalHTTPServer). Las subclases pueden redefinir
+    translate_path() para servir otras rutas.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.stats_lock:
+            self.server.connections += 1
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # Silencioso en tests
+
+    def do_GET(self) -> None:
+        with self.server.stats_lock:
+            self.server.requests.append((self.path, self.headers.get("Range")))
+
+        path = Path(self.translate_path(self.path))
+        if not path.is_file():
+            self.send_error(404)
+            return
+
+        size = path.stat().st_size
+        start, end = 0, size - 1
+        status = 200
+
+        range_header = self.headers.get("Range")
+        if range_header and self.server.support_ranges:
+            match = _RANGE_RE.match(range_header.strip())
+            if not match or (not match.group(1) and not match.group(2)):
+                self.send_error(400)
+                return
+            if match.group(1):
+                start = int(match.group(1))
+                if match.group(2):
+                    end = min(int(match.group(2)), size - 1)
+            else:
+                # Sufijo: últimos N bytes
+                start = max(0, size - int(match.group(2)))
+            if start >= size or start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = 206
+
+        length = end - start + 1
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes" if self.server.support_ranges else "none")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+
+        with path.open("rb") as f:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                data = f.read(min(remaining, 64 * 1024))
+                if not data:
+                    break
+                self.wfile.write(data)
+                remaining -= len(data)
+
+
+class LocalHTTPServer:
+    """Servidor HTTP en un hilo de fondo, sobre 127.0.0.1 y un puerto libre."""
+
+    def __init__(self, directory: Path, port: int = 0, support_ranges: bool = True):
+        """
+        Args:
+            directory: Directorio a servir
+            port: Puerto (0 = elegir uno libre)
+            support_ranges: Si False, ignora Range y responde siempre 200
+        """
+        directory = str(directory)
+
+        class Handler(RangeRequestHandler):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, directory=directory, **kwargs)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.support_ranges = support_ranges
+        self.httpd.stats_lock = threading.Lock()
+        self.httpd.connections = 0
+        self.httpd.requests = []
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def connections(self) -> int:
+        """Conexiones TCP aceptadas."""
+        return self.httpd.connections
+
+    @property
+    def requests(self) -> List[tuple]:
+        """Peticiones recibidas: (path, header Range o None)."""
+        return list(self.httpd.requests)
+
+    def url_for(self, rel_path: str) -> str:
+        return f"{self.base_url}/{rel_path.lstrip('/')}"
+
+    def start(self) -> "LocalHTTPServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="local-http", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "LocalHTTPServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servidor HTTP local con Range (tests offline)")
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = LocalHTTPServer(args.directory, port=args.port)
+    print(f"[http] Sirviendo {args.directory} en {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
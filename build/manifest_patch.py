@@ -0,0 +1,149 @@
+"""
+Parches entre manifiestos de versiones consecutivas de una tool.
+
+El manifest completo de una tool grande ocupa cientos de KB y el worker lo
+descarga entero aunque solo hayan cambiado dos archivos. generate_manifest.py
+emite además un parche compacto por cada versión nueva:
+
+    {
+      "patch_version": "1.0",
+      "tool_id": "bitmusic",
+      "from_version": "1.2.0", "to_version": "1.3.0",
+      "base_manifest_hash": "<hash del manifest instalado>",
+      "manifest_hash": "<hash del manifest resultante>",
+      "header": {... campos del manifest destino salvo files ...},
+      "url_prefix": {"from": ".../bitmusic/1.2.0/files/", "to": ".../bitmusic/1.3.0/files/"},
+      "added": [<entradas>], "changed": [<entradas>], "removed": ["<path>", ...]
+    }
+
+Las URLs de cada archivo incluyen la versión, así que los archivos sin cambios
+no se listan: sus URLs se reescriben con url_prefix. El updater aplica el parche
+a su manifest instalado y verifica que el resultado tenga exactamente el
+manifest_hash publicado antes de usarlo.
+"""
+
+import copy
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+PATCH_VERSION = "1.0"
+
+
+def compute_manifest_hash(manifest: Dict[str, Any]) -> str:
+    """
+    manifest_hash de un manifiesto (misma normalización que
+    generate_manifest.normalize_manifest_for_hash: sin manifest_hash ni created_at).
+    """
+    normalized = {k: v for k, v in manifest.items() if k not in ("manifest_hash", "created_at")}
+    text = json.dumps(normalized, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def version_key(version: str) -> Tuple:
+    """Clave de orden para versiones tipo 1.10.2 / 2.0.0-rc1 (numérico por componente)."""
+    return tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in re.split(r"[.\-+]", version))
+
+
+def patch_name(from_version: str, to_version: str) -> str:
+    """Nombre de archivo del parche entre dos versiones."""
+    return f"{from_version}_to_{to_version}.json"
+
+
+def _url_prefixes(base_index: Dict[str, Dict], target_index: Dict[str, Dict]) -> Optional[Dict[str, str]]:
+    """Prefijos de URL de ambas versiones, deducidos de un path común."""
+    for path in base_index.keys() & target_index.keys():
+        suffix = quote(path, safe="/")
+        old_url, new_url = base_index[path].get("url", ""), target_index[path].get("url", "")
+        if old_url.endswith(suffix) and new_url.endswith(suffix):
+            return {"from": old_url[:-len(suffix)], "to": new_url[:-len(suffix)]}
+    return None
+
+
+def _rebase(entry: Dict[str, Any], url_prefix: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """Entrada del manifest base con sus URLs reescritas a la versión destino."""
+    if not url_prefix:
+        return entry
+    entry = copy.deepcopy(entry)
+    old, new = url_prefix["from"], url_prefix["to"]
+    for holder in (entry, entry.get("compressed")):
+        if holder and holder.get("url", "").startswith(old):
+            holder["url"] = new + holder["url"][len(old):]
+    return entry
+
+
+def make_patch(base: Dict[str, Any], target: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Construye el parche que transforma el manifest base en el destino.
+
+    Un archivo queda fuera del parche solo si su entrada base, con las URLs
+    reescritas, es idéntica a la del destino; aplicar el parche reproduce el
+    manifest destino campo a campo (y por tanto su manifest_hash).
+    """
+    if base["tool_id"] != target["tool_id"]:
+        raise ValueError(f"Parche entre tools distintas: {base['tool_id']} -> {target['tool_id']}")
+
+    base_index = {f["path"]: f for f in base["files"]}
+    target_index = {f["path"]: f for f in target["files"]}
+    url_prefix = _url_prefixes(base_index, target_index)
+
+    added: List[Dict] = []
+    changed: List[Dict] = []
+    for path, entry in target_index.items():
+        if path not in base_index:
+            added.append(entry)
+        elif _rebase(base_index[path], url_prefix) != entry:
+            changed.append(entry)
+
+    patch = {
+        "patch_version": PATCH_VERSION,
+        "tool_id": target["tool_id"],
+        "from_version": base["tool_version"],
+        "to_version": target["tool_version"],
+        "base_manifest_hash": base["manifest_hash"],
+        "manifest_hash": target["manifest_hash"],
+        "header": {k: v for k, v in target.items() if k not in ("files", "manifest_hash")},
+        "added": added,
+        "changed": changed,
+        "removed": sorted(base_index.keys() - target_index.keys()),
+    }
+    if url_prefix and url_prefix["from"] != url_prefix["to"]:
+        patch["url_prefix"] = url_prefix
+    return patch
+
+
+def apply_patch(base: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Aplica un parche al manifest base y retorna el manifest destino verificado.
+
+    Raises:
+        ValueError: si el parche no corresponde al manifest base o el resultado
+            no tiene el manifest_hash publicado
+    """
+    if patch.get("patch_version") != PATCH_VERSION:
+        raise ValueError(f"Versión de parche no soportada: {patch.get('patch_version')}")
+    if patch["tool_id"] != base["tool_id"] or patch["base_manifest_hash"] != base["manifest_hash"]:
+        raise ValueError(
+            f"El parche {patch['from_version']} -> {patch['to_version']} no aplica al manifest "
+            f"instalado ({base['tool_version']}, {base['manifest_hash'][:16]}...)"
+        )
+
+    url_prefix = patch.get("url_prefix")
+    files = {f["path"]: _rebase(f, url_prefix) for f in base["files"]}
+    for path in patch["removed"]:
+        files.pop(path, None)
+    for entry in patch["added"] + patch["changed"]:
+        files[entry["path"]] = entry
+
+    manifest = dict(patch["header"])
+    manifest["files"] = [files[path] for path in sorted(files)]
+    manifest["manifest_hash"] = compute_manifest_hash(manifest)
+
+    if manifest["manifest_hash"] != patch["manifest_hash"]:
+        raise ValueError(
+            f"manifest_hash del parche aplicado no coincide: {manifest['manifest_hash'][:16]}... "
+            f"!= {patch['manifest_hash'][:16]}..."
+        )
+    return manifest
@@ -0,0 +1,222 @@
+"""
+Almacén de objetos direccionado por contenido (sha256), compartido entre
+releases y entre tools de un mismo worker.
+
+Estructura (bajo el directorio base de tools):
+tools/
+  .objects/
+    sha256/ab/abcdef...     (blob, nombre = digest del contenido: sha256 o
+                             "<alg>-<hex>" de manifest v2, ver file_hashing)
+    refs/<tool_id>/v1.2.0.json   (hashes referenciados por una release)
+    tmp/                    (ingestas en curso)
+  <tool_id>/releases/...    (árboles de links hacia los blobs)
+
+El updater nunca escribe in-place, solo crea archivos nuevos y activa por
+rename. Las releases se materializan como links (reflink → hardlink → copia)
+hacia los blobs. La ingesta nunca usa hardlink: el origen es un archivo de una
+release que la tool puede editar in-place en ejecución (config, estado). Aun
+así un blob puede corromperse a través de una release enlazada, por lo que el
+updater verifica cada blob que materializa y descarta el que no coincide.
+
+Conteo de referencias: cada release instalada (o en staging) registra la lista
+de hashes que usa en refs/. El recolector (gc) elimina los blobs que ninguna
+lista referencia. Las actualizaciones registran su lista "pending" antes de
+usar blobs, por lo que gc puede correr en paralelo con ellas.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Sequence, Tuple
+
+try:
+    from file_hashing import parse_digest
+    from file_linker import STRATEGIES as LINK_STRATEGIES, materialize_file
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent))
+    from file_hashing import parse_digest
+    from file_linker import STRATEGIES as LINK_STRATEGIES, materialize_file
+
+PENDING_PREFIX = ".pending-"
+
+# Antigüedad mínima para considerar huérfano un temporal de ingesta. Se mide
+# desde el instante de creación que va en el nombre (un reflink o copia conserva
+# el mtime del origen, que puede ser muy anterior)
+TMP_GRACE_SECONDS = 3600
+
+# La ingesta copia el contenido (reflink o copia), nunca comparte el inodo del origen
+INGEST_STRATEGIES = ("reflink", "copy")
+
+
+class ObjectStore:
+    """Almacén de blobs por sha256 con referencias explícitas por release."""
+
+    def __init__(self, root: Path, link_strategies: Sequence[str] = LINK_STRATEGIES):
+        """
+        Args:
+            root: Directorio del almacén (ej: tools_base / ".objects")
+            link_strategies: Orden de estrategias para ingestar/materializar blobs
+        """
+        self.root = root
+        self.objects_dir = root / "sha256"
+        self.refs_dir = root / "refs"
+        self.tmp_dir = root / "tmp"
+        self.link_strategies = tuple(link_strategies)
+        self.ingest_strategies = tuple(s for s in self.link_strategies if s in INGEST_STRATEGIES) or ("copy",)
+        self._lock = threading.Lock()
+
+    # --- Blobs ---
+
+    def object_path(self, sha256: str) -> Path:
+        """Ruta del blob para un hash (exista o no); se reparte por los 2 primeros hex."""
+        return self.objects_dir / parse_digest(sha256)[1][:2] / sha256
+
+    def has(self, sha256: str) -> bool:
+        """True si el blob ya está en el almacén."""
+        return self.object_path(sha256).is_file()
+
+    def ingest(self, src: Path, sha256: str) -> Path:
+        """
+        Agrega un archivo ya verificado al almacén (si no estaba).
+
+        El archivo se clona (reflink) o copia a un temporal y se publica con
+        rename atómico, así dos tools ingiriendo el mismo blob no se pisan.
+
+        Args:
+            src: Archivo cuyo contenido ya fue verificado contra sha256
+            sha256: Hash del contenido
+
+        Returns:
+            Ruta del blob en el almacén
+        """
+        obj = self.object_path(sha256)
+        if obj.is_file():
+            return obj
+
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.tmp_dir / f"{time.time_ns()}.{uuid.uuid4().hex}.{sha256}"
+        try:
+            materialize_file(src, tmp, self.ingest_strategies)
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp, obj)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return obj
+
+    def materialize(self, sha256: str, dst: Path) -> str:
+        """
+        Crea dst a partir del blob (link tree).
+
+        Returns:
+            Estrategia usada ("reflink", "hardlink" o "copy")
+        """
+        return materialize_file(self.object_path(sha256), dst, self.link_strategies)
+
+    def discard(self, sha256: str) -> None:
+        """Elimina un blob cuyo contenido ya no coincide con su hash."""
+        with self._lock:
+            self.object_path(sha256).unlink(missing_ok=True)
+
+    # --- Referencias ---
+
+    def _ref_path(self, tool_id: str, release: str) -> Path:
+        return self.refs_dir / tool_id / f"{release}.json"
+
+    def add_ref(self, tool_id: str, release: str, hashes: Iterable[str]) -> None:
+        """Registra (o reemplaza) la lista de blobs usados por una release."""
+        path = self._ref_path(tool_id, release)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps(sorted(set(hashes))), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def add_pending_ref(self, tool_id: str, release: str, hashes: Iterable[str]) -> None:
+        """Registra los blobs de una actualización en curso (protege frente a gc)."""
+        self.add_ref(tool_id, PENDING_PREFIX + release, hashes)
+
+    def remove_ref(self, tool_id: str, release: str) -> None:
+        """Elimina la lista de blobs de una release (borrada o abortada)."""
+        self._ref_path(tool_id, release).unlink(missing_ok=True)
+
+    def remove_pending_ref(self, tool_id: str, release: str) -> None:
+        self.remove_ref(tool_id, PENDING_PREFIX + release)
+
+    def refcounts(self) -> Dict[str, int]:
+        """Cuenta cuántas releases (de cualquier tool) referencian cada blob."""
+        counts: Dict[str, int] = {}
+        if not self.refs_dir.exists():
+            return counts
+        ref_files = [
+            ref_file
+            for tool_dir in self.refs_dir.iterdir() if tool_dir.is_dir()
+            for ref_file in tool_dir.iterdir() if ref_file.suffix == ".json"
+        ]
+        for ref_file in ref_files:
+            try:
+                hashes = json.loads(ref_file.read_text(encoding="utf-8"))
+            except (ValueError, OSError) as e:
+                print(f"[objects] WARN: referencias ilegibles en {ref_file}: {e}")
+                continue
+            for sha256 in hashes:
+                counts[sha256] = counts.get(sha256, 0) + 1
+        return counts
+
+    def gc(self, dry_run: bool = False) -> Tuple[int, int]:
+        """
+        Elimina los blobs sin referencias.
+
+        Args:
+            dry_run: Si True, solo informa qué se eliminaría
+
+        Returns:
+            (blobs eliminados, bytes liberados)
+        """
+        with self._lock:
+            counts = self.refcounts()
+            removed = 0
+            freed = 0
+
+            if self.objects_dir.exists():
+                for obj in self.objects_dir.glob("*/*"):
+                    if not obj.is_file() or counts.get(obj.name, 0) > 0:
+                        continue
+                    size = obj.stat().st_size
+                    if not dry_run:
+                        obj.unlink(missing_ok=True)
+                    removed += 1
+                    freed += size
+
+            # Temporales huérfanos de ingestas interrumpidas (no tocar ingestas en curso)
+            if not dry_run and self.tmp_dir.exists():
+                cutoff = time.time_ns() - TMP_GRACE_SECONDS * 1_000_000_000
+                for tmp in self.tmp_dir.iterdir():
+                    created = tmp.name.split(".", 1)[0]
+                    try:
+                        if (int(created) if created.isdigit() else tmp.stat().st_mtime_ns) < cutoff:
+                            tmp.unlink()
+                    except OSError:
+                        pass
+
+        print(f"[objects] gc: {removed} blobs {'a eliminar' if dry_run else 'eliminados'} ({freed} bytes)")
+        return removed, freed
+
+
+def main() -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mantenimiento del almacén de objetos compartido")
+    parser.add_argument("tools_base", type=Path, help="Directorio base de tools del worker")
+    parser.add_argument("--dry-run", action="store_true", help="Solo informa qué se eliminaría")
+    args = parser.parse_args()
+
+    store = ObjectStore(args.tools_base / ".objects")
+    store.gc(dry_run=args.dry_run)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,12 +2,52 @@ import argparse
 import hashlib
 import json
 import os
-import zipfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from file_hashing import SHA256, ContentHasher, digest_alg, entry_digest, hash_bytes
+    from manifest_patch import version_key
+    from transport_compression import INCOMPRESSIBLE_SUFFIXES
+    from tree_walk import walk_files
+    from zip_writer import DEFAULT_LEVEL, METHODS, STORED, DeterministicZipWriter, HashingWriter, compress_member
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent))
+    from file_hashing import SHA256, ContentHasher, digest_alg, entry_digest, hash_bytes
+    from manifest_patch import version_key
+    from transport_compression import INCOMPRESSIBLE_SUFFIXES
+    from tree_walk import walk_files
+    from zip_writer import DEFAULT_LEVEL, METHODS, STORED, DeterministicZipWriter, HashingWriter, compress_member
 
 EXCLUDE_NAMES = {".git", "__pycache__", ".venv", "venv", "dist", "models", "Models for z image turbo temp"}
 
+# Miembros que se guardan sin comprimir: formatos ya comprimidos y pesos binarios
+STORED_SUFFIXES = INCOMPRESSIBLE_SUFFIXES | {".bin", ".pt", ".npy", ".npz", ".whl"}
+
+# Permisos 0755 en el ZIP (misma regla que generate_manifest.py, independiente del SO)
+EXECUTABLE_SUFFIXES = {".ps1", ".sh", ".py"}
+EXECUTABLE_NAMES = {"run", "setup"}
+
+# Miembros hasta este tamaño se comprimen en paralelo en memoria; los mayores, por streaming
+PARALLEL_MEMBER_MAX = 16 * 1024 * 1024
+READ_BLOCK = 1024 * 1024
+
+class PackError(RuntimeError):
+    """Una tool no se pudo empaquetar (manifest desactualizado o asset en uso)."""
+
+# Caché de build en dist/: assets reutilizables entre runs
+PACK_CACHE_FILENAME = ".pack_cache.json"
+PACK_CACHE_VERSION = 1
+
+# Archivos delta contra las últimas K releases archivadas en el historial
+DEFAULT_DELTA_BASES = 3
+DELTA_INFO_NAME = "delta.json"
+
 # GitHub repository for Release URLs
 GITHUB_REPO = os.environ.get("GITHUB_REPOSITORY", "BitStationBusiness/bitstation-tools")
 
@@ -18,142 +58,524 @@ def sha256_file(path: Path) -> str:
             h.update(chunk)
     return h.hexdigest()
 
-def add_dir_to_zip(zf: zipfile.ZipFile, root: Path, base: Path) -> None:
-    for p in root.rglob("*"):
-        if any(part in EXCLUDE_NAMES for part in p.parts):
-            continue
-        if p.is_dir():
-            continue
-        rel = p.relative_to(base).as_posix()
-        zf.write(p, rel)
+def list_members(root: Path, base: Path) -> List[Tuple[str, Path]]:
+    """Archivos a empaquetar como (nombre en el ZIP, path), en orden determinista."""
+    if root == base:
+        return walk_files(root, EXCLUDE_NAMES)
+    prefix = root.relative_to(base).as_posix() + "/"
+    return [(prefix + rel, p) for rel, p in walk_files(root, EXCLUDE_NAMES)]
 
-def main() -> int:
-    parser = argparse.ArgumentParser(description="Empaqueta tools y genera catalog.json")
-    parser.add_argument("--release-tag", default=None,
-                        help="Tag del release (ej: v0.6.0). Se usa para construir URLs de assets.")
-    args = parser.parse_args()
+class PackCache:
+    """
+    Caché de assets empaquetados: asset_name -> {key, sha256, size}.
 
-    release_tag = args.release_tag or os.environ.get("RELEASE_TAG")
+    La clave resume todo lo que determina los bytes del ZIP (contenido y
+    opciones de empaquetado). Como el ZIP es determinista, si la clave no
+    cambió el asset existente en dist/ es el mismo que se produciría ahora y
+    su sha256 registrado sigue siendo válido.
+    """
 
-    repo = Path(__file__).resolve().parents[1]
-    tools_dir = repo / "tools"
-    dist_dir = repo / "dist"
-    dist_dir.mkdir(parents=True, exist_ok=True)
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("version") == PACK_CACHE_VERSION:
+                    self.entries = data.get("entries", {})
+            except (ValueError, OSError) as e:
+                print(f"[pack] WARN: caché de build ilegible, se descarta: {e}")
 
-    tools = []
-    for tdir in sorted([p for p in tools_dir.iterdir() if p.is_dir() and p.name not in EXCLUDE_NAMES]):
-        meta_path = tdir / "tool.json"
-        if not meta_path.exists():
-            print(f"[pack] SKIP: {tdir.name} (no tool.json)")
-            continue
-            
-        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    def lookup(self, asset_path: Path, key: Optional[str]) -> Optional[str]:
+        """sha256 registrado si el asset existe con la misma clave y tamaño; cuenta hit/miss."""
+        with self._lock:
+            entry = self.entries.get(asset_path.name)
+        hit = (
+            key is not None and entry is not None and entry.get("key") == key
+            and asset_path.exists() and asset_path.stat().st_size == entry.get("size")
+        )
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry["sha256"] if hit else None
 
-        tool_id = meta["tool_id"]
-        version = meta["version"]
-        
-        # Leer manifest.json (debe existir previamente)
-        manifest_path = tdir / "manifest.json"
-        manifest_hash = None
-        if manifest_path.exists():
-            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
-            manifest_hash = manifest["manifest_hash"]
-            print(f"[pack] Tool: {tool_id} v{version} (manifest_hash: {manifest_hash[:16]}...)")
-        else:
-            print(f"[pack] WARN: {tool_id} sin manifest.json - ejecuta primero generate_manifest.py")
-        
-        asset_name = f"tool_{tool_id}_{version}.zip"
-        asset_path = dist_dir / asset_name
+    def record(self, asset_path: Path, key: Optional[str], digest: str) -> None:
+        if key is None:
+            return
+        with self._lock:
+            self.entries[asset_path.name] = {"key": key, "sha256": digest, "size": asset_path.stat().st_size}
 
-        # build zip (incluye manifest.json si existe)
-        if asset_path.exists():
-            try:
-                asset_path.unlink()
-            except PermissionError:
-                print(f"[pack] WARN: No se puede eliminar {asset_name} (en uso), saltando...")
-                continue
+    def save(self) -> None:
+        """Escribe la caché de forma atómica, sin entradas de assets que ya no existen."""
+        with self._lock:
+            entries = {name: e for name, e in self.entries.items() if (self.path.parent / name).exists()}
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps({"version": PACK_CACHE_VERSION, "entries": entries}, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self.path)
 
-        print(f"[pack] Empaquetando {asset_name}...")
-        with zipfile.ZipFile(asset_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-            add_dir_to_zip(zf, tdir, tdir)
+def pack_options_key(text_method: int, level: int) -> str:
+    """Opciones que cambian los bytes del ZIP (los hilos no: la salida es determinista)."""
+    return f"method={text_method};level={level if text_method != STORED else 0}"
 
-        digest = sha256_file(asset_path)
-        print(f"[pack]   SHA256: {digest[:16]}...")
+def tool_cache_key(manifest: Dict, members: List[Tuple[str, Path]], options: str) -> str:
+    """
+    Clave del ZIP de la tool: manifest_hash + opciones + (size, mtime_ns) de
+    cada miembro en disco.
 
-        if release_tag:
-            download_url = (
-                f"https://github.com/{GITHUB_REPO}/releases/download/"
-                f"{release_tag}/{asset_name}"
-            )
-        else:
-            download_url = None
+    El manifest no basta: un archivo editado sin regenerarlo dejaría la clave
+    igual y se reutilizaría un ZIP que ya no corresponde a la tool. manifest.json
+    entra por su propio manifest_hash.
+    """
+    h = hashlib.sha256(f"{manifest['manifest_hash']}\n{options}\n".encode("utf-8"))
+    for rel, path in members:
+        if rel != "manifest.json":
+            st = path.stat()
+            h.update(f"{rel}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()
+
+def content_cache_key(
+    members: List[Tuple[str, Path]],
+    options: str,
+    known: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Clave por contenido (frontend): (size, mtime_ns) y sha256 de cada miembro, en orden.
+
+    Los hashes que ya están en known (entradas del manifest) no se recalculan;
+    el (size, mtime_ns) real detecta un archivo editado sin regenerar el manifest.
+    """
+    known = known or {}
+    h = hashlib.sha256(f"{options}\n".encode("utf-8"))
+    for rel, path in members:
+        st = path.stat()
+        h.update(f"{rel}\0{st.st_size}\0{st.st_mtime_ns}\0{known.get(rel) or sha256_file(path)}\n".encode("utf-8"))
+    return h.hexdigest()
+
+def build_asset(
+    asset_path: Path,
+    members: List[Tuple[str, Path]],
+    key: Optional[str],
+    cache: Optional[PackCache],
+    zip_workers: int,
+    text_method: int,
+    level: int,
+    expected: Optional[Dict[str, str]] = None
+) -> Optional[str]:
+    """
+    Reutiliza el asset si la caché lo reconoce; si no, lo (re)construye.
+
+    Un asset solo se registra en la caché tras pasar la comprobación contra
+    expected, y su clave incluye el (size, mtime_ns) de los miembros: un hit
+    implica los mismos archivos que ya se comprobaron.
+
+    Args:
+        expected: path -> digest del manifest (ver file_hashing); los miembros
+            empaquetados deben coincidir (hash calculado en la misma lectura que
+            los comprime, con el algoritmo de cada entrada)
+
+    Returns:
+        sha256 del asset, o None si el asset existente no se pudo reemplazar
+        o su contenido no coincide con el manifest
+    """
+    if cache is not None:
+        digest = cache.lookup(asset_path, key)
+        if digest is not None:
+            print(f"[pack]   Caché: {asset_path.name} sin cambios (reutilizado)")
+            return digest
+
+    if asset_path.exists():
+        try:
+            asset_path.unlink()
+        except PermissionError:
+            print(f"[pack] WARN: No se puede eliminar {asset_path.name} (en uso), saltando...")
+            return None
+
+    print(f"[pack] Empaquetando {asset_path.name}...")
+    algs = {rel: digest_alg(d) for rel, d in expected.items()} if expected is not None else None
+    digest, member_hashes = write_zip(asset_path, members, zip_workers, text_method, level, algs)
+
+    if expected is not None:
+        stale = sorted(rel for rel, sha in member_hashes.items() if rel in expected and expected[rel] != sha)
+        if stale:
+            print(f"[pack] WARN: manifest desactualizado ({len(stale)} archivos, ej: {stale[0]}) - "
+                  f"ejecuta generate_manifest.py; {asset_path.name} descartado")
+            asset_path.unlink()
+            return None
+    if cache is not None:
+        cache.record(asset_path, key, digest)
+    return digest
+
+def member_method(path: Path, text_method: int) -> int:
+    """store para formatos ya comprimidos, text_method para el resto."""
+    return STORED if path.suffix.lower() in STORED_SUFFIXES else text_method
+
+def hashed_blocks(src, h) -> Iterator[bytes]:
+    """Bloques de src, actualizando h con cada uno (una sola lectura para hash y ZIP)."""
+    for block in iter(lambda: src.read(READ_BLOCK), b""):
+        h.update(block)
+        yield block
+
+def write_zip(
+    zip_path: Path,
+    members: List[Tuple[str, Path]],
+    workers: int = 1,
+    text_method: int = METHODS["deflate"],
+    level: int = DEFAULT_LEVEL,
+    algs: Optional[Dict[str, str]] = None
+) -> Tuple[str, Dict[str, str]]:
+    """
+    Escribe un ZIP determinista (fecha fija, orden de members, permisos por regla):
+    el mismo contenido produce siempre el mismo sha256.
+
+    Los miembros de hasta PARALLEL_MEMBER_MAX se comprimen en paralelo en
+    workers hilos; el resto se escribe por streaming en el orden que toca.
+    Cada archivo se lee una sola vez: la misma lectura alimenta su hash y el
+    compresor, y el sha256 del ZIP se calcula mientras se escribe.
+
+    Args:
+        algs: Algoritmo de hash por miembro (ver file_hashing; default sha256)
+
+    Returns:
+        (sha256 del ZIP, {nombre del miembro: digest de su contenido})
+    """
+    algs = algs or {}
+
+    def load(path: Path, method: int, alg: str) -> Tuple[bytes, int, str]:
+        data = path.read_bytes()
+        payload, crc = compress_member(data, method, level)
+        return payload, crc, hash_bytes(data, alg)
+
+    member_hashes: Dict[str, str] = {}
+    tmp_path = zip_path.with_name(zip_path.name + ".part")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        with tmp_path.open("wb") as f:
+            out = HashingWriter(f)
+            writer = DeterministicZipWriter(out, level)
+            pending = deque()
 
-        tool_entry = {
-            "tool_id": tool_id,
-            "name": meta["name"],
-            "latest": version,
+            def write_next() -> None:
+                rel, path, method, size, future = pending.popleft()
+                executable = path.suffix in EXECUTABLE_SUFFIXES or path.name in EXECUTABLE_NAMES
+                if future is not None:
+                    payload, crc, member_hashes[rel] = future.result()
+                    writer.add_compressed(rel, method, payload, crc, size, executable)
+                else:
+                    h = ContentHasher(algs.get(rel, SHA256))
+                    with path.open("rb") as src:
+                        writer.add_stream(rel, method, hashed_blocks(src, h), size, executable)
+                    member_hashes[rel] = h.hexdigest()
+
+            for rel, path in members:
+                size = path.stat().st_size
+                method = member_method(path, text_method)
+                future = pool.submit(load, path, method, algs.get(rel, SHA256)) if size <= PARALLEL_MEMBER_MAX else None
+                pending.append((rel, path, method, size, future))
+                # Ventana acotada: como mucho ~4 miembros comprimidos por hilo en memoria
+                while len(pending) > workers * 4:
+                    write_next()
+            while pending:
+                write_next()
+            writer.close()
+    os.replace(tmp_path, zip_path)
+    return out.hexdigest(), member_hashes
+
+def asset_url(release_tag: Optional[str], asset_name: str) -> Optional[str]:
+    """URL del asset en el GitHub Release (None sin release tag)."""
+    if not release_tag:
+        return None
+    return f"https://github.com/{GITHUB_REPO}/releases/download/{release_tag}/{asset_name}"
+
+def delta_bases(history_dir: Path, manifest: Dict, count: int) -> List[Dict]:
+    """Manifests archivados de las count versiones anteriores, de la más nueva a la más vieja."""
+    manifests_dir = history_dir / manifest["tool_id"] / "manifests"
+    if count < 1 or not manifests_dir.exists():
+        return []
+    current = version_key(manifest["tool_version"])
+    older = sorted(
+        (p for p in manifests_dir.glob("*.json") if version_key(p.stem) < current),
+        key=lambda p: version_key(p.stem), reverse=True
+    )
+    return [json.loads(p.read_text(encoding="utf-8")) for p in older[:count]]
+
+def pack_deltas(
+    tdir: Path,
+    dist_dir: Path,
+    manifest: Dict,
+    history_dir: Path,
+    count: int,
+    release_tag: Optional[str],
+    cache: Optional[PackCache],
+    zip_workers: int,
+    text_method: int,
+    level: int
+) -> List[Dict]:
+    """
+    Empaqueta un archivo delta por cada una de las count versiones anteriores.
+
+    delta_<tool>_<base>_to_<version>.zip contiene delta.json (versiones y
+    manifest_hash base/destino), manifest.json y solo los archivos añadidos o
+    cambiados desde la base. Un worker con la base instalada actualiza con el
+    fallback ZIP sin transferir la tool completa.
+
+    Returns:
+        Entradas "deltas" del catálogo
+    """
+    expected = {f["path"]: entry_digest(f) for f in manifest["files"]}
+    options = pack_options_key(text_method, level)
+    entries = []
+    for base in delta_bases(history_dir, manifest, count):
+        base_index = {f["path"]: entry_digest(f) for f in base["files"]}
+        changed = sorted(path for path, sha in expected.items() if base_index.get(path) != sha)
+        if len(changed) == len(expected):
+            continue  # Nada reutilizable: el ZIP completo es igual de bueno
+
+        asset_name = f"delta_{manifest['tool_id']}_{base['tool_version']}_to_{manifest['tool_version']}.zip"
+        asset_path = dist_dir / asset_name
+        info = {
+            "tool_id": manifest["tool_id"],
+            "from_version": base["tool_version"],
+            "to_version": manifest["tool_version"],
+            "base_manifest_hash": base["manifest_hash"],
+            "manifest_hash": manifest["manifest_hash"],
+            "files": changed,
+        }
+        info_path = dist_dir / f".{asset_name}.{DELTA_INFO_NAME}"
+        info_path.write_text(json.dumps(info, indent=2, sort_keys=True), encoding="utf-8")
+        members = sorted(
+            [(DELTA_INFO_NAME, info_path), ("manifest.json", tdir / "manifest.json")]
+            + [(path, tdir / path) for path in changed]
+        )
+        key = None
+        if cache is not None:
+            # delta.json y manifest.json quedan cubiertos por los manifest_hash
+            h = hashlib.sha256(f"delta\n{base['manifest_hash']}\n{manifest['manifest_hash']}\n{options}".encode("utf-8"))
+            for path in changed:
+                st = (tdir / path).stat()
+                h.update(f"{path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+            key = h.hexdigest()
+        try:
+            digest = build_asset(asset_path, members, key, cache, zip_workers, text_method, level, expected)
+        finally:
+            info_path.unlink(missing_ok=True)
+        if digest is None:
+            continue
+
+        entry = {
+            "from_version": base["tool_version"],
+            "base_manifest_hash": base["manifest_hash"],
             "asset_name": asset_name,
             "sha256": digest,
-            "platforms": meta["platforms"],
-            "category": meta.get("category", "uncategorized"),
+            "size": asset_path.stat().st_size,
+            "files": len(changed),
+        }
+        url = asset_url(release_tag, asset_name)
+        if url:
+            entry["download_url"] = url
+        print(f"[pack]   Delta {base['tool_version']} -> {manifest['tool_version']}: "
+              f"{len(changed)} archivos, {entry['size']} bytes")
+        entries.append(entry)
+    return entries
+
+def pack_tool(
+    tdir: Path,
+    dist_dir: Path,
+    release_tag: Optional[str],
+    zip_workers: int = 1,
+    text_method: int = METHODS["deflate"],
+    level: int = DEFAULT_LEVEL,
+    cache: Optional[PackCache] = None,
+    history_dir: Optional[Path] = None,
+    delta_count: int = 0
+) -> Optional[Dict]:
+    """
+    Empaqueta una tool (ZIP + frontend) y retorna su entrada del catálogo.
+
+    Con cache, los assets cuya clave no cambió desde el último run se reutilizan.
+    Con history_dir y delta_count, además se emiten archivos delta contra las
+    últimas delta_count versiones archivadas por generate_manifest.py.
+
+    Returns:
+        Entrada del catálogo, o None si el directorio no es una tool (sin tool.json)
+
+    Raises:
+        PackError: si el ZIP de la tool o su frontend no se pudieron construir
+    """
+    meta_path = tdir / "tool.json"
+    if not meta_path.exists():
+        print(f"[pack] SKIP: {tdir.name} (no tool.json)")
+        return None
+
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+
+    tool_id = meta["tool_id"]
+    version = meta["version"]
+    
+    # Leer manifest.json (debe existir previamente)
+    manifest_path = tdir / "manifest.json"
+    manifest = None
+    manifest_hash = None
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        manifest_hash = manifest["manifest_hash"]
+        print(f"[pack] Tool: {tool_id} v{version} (manifest_hash: {manifest_hash[:16]}...)")
+    else:
+        print(f"[pack] WARN: {tool_id} sin manifest.json - ejecuta primero generate_manifest.py")
+    
+    asset_name = f"tool_{tool_id}_{version}.zip"
+    asset_path = dist_dir / asset_name
+    options = pack_options_key(text_method, level)
+
+    # build zip (incluye manifest.json si existe); sin manifest no hay clave de caché
+    members = list_members(tdir, tdir)
+    key = tool_cache_key(manifest, members, options) if manifest is not None and cache is not None else None
+    expected = {f["path"]: entry_digest(f) for f in manifest["files"]} if manifest is not None else None
+    digest = build_asset(asset_path, members, key, cache, zip_workers, text_method, level, expected)
+    if digest is None:
+        raise PackError(f"{asset_name} no se pudo empaquetar")
+    print(f"[pack]   SHA256: {digest[:16]}...")
+
+    download_url = asset_url(release_tag, asset_name)
+
+    tool_entry = {
+        "tool_id": tool_id,
+        "name": meta["name"],
+        "latest": version,
+        "asset_name": asset_name,
+        "sha256": digest,
+        "size": asset_path.stat().st_size,
+        "platforms": meta["platforms"],
+        "category": meta.get("category", "uncategorized"),
+    }
+    if download_url:
+        tool_entry["download_url"] = download_url
+    
+    if manifest_hash:
+        tool_entry["manifest_hash"] = manifest_hash
+
+    # --- Deltas contra versiones anteriores (fallback ZIP sin la tool completa) ---
+    if manifest is not None and history_dir is not None and delta_count > 0:
+        deltas = pack_deltas(
+            tdir, dist_dir, manifest, history_dir, delta_count, release_tag, cache, zip_workers, text_method, level
+        )
+        if deltas:
+            tool_entry["deltas"] = deltas
+
+    # --- Frontend packaging (frontend.zip separado) ---
+    frontend_dir = tdir / "frontend"
+    if frontend_dir.is_dir() and any(frontend_dir.iterdir()):
+        frontend_zip_name = f"frontend_{tool_id}_{version}.zip"
+        frontend_zip_path = dist_dir / frontend_zip_name
+        
+        frontend_members = list_members(frontend_dir, frontend_dir)
+        # Los archivos del frontend ya están hasheados en el manifest de la tool
+        known = {
+            path[len("frontend/"):]: sha for path, sha in (expected or {}).items() if path.startswith("frontend/")
         }
-        if download_url:
-            tool_entry["download_url"] = download_url
+        frontend_key = content_cache_key(frontend_members, options, known) if cache is not None else None
+        frontend_sha = build_asset(
+            frontend_zip_path, frontend_members, frontend_key, cache, zip_workers, text_method, level,
+            known if expected is not None else None
+        )
+        if frontend_sha is None:
+            raise PackError(f"{frontend_zip_name} no se pudo empaquetar")
+        print(f"[pack]   Frontend SHA256: {frontend_sha[:16]}...")
         
-        if manifest_hash:
-            tool_entry["manifest_hash"] = manifest_hash
-
-        # --- Frontend packaging (frontend.zip separado) ---
-        frontend_dir = tdir / "frontend"
-        if frontend_dir.is_dir() and any(frontend_dir.iterdir()):
-            frontend_zip_name = f"frontend_{tool_id}_{version}.zip"
-            frontend_zip_path = dist_dir / frontend_zip_name
-            
-            if frontend_zip_path.exists():
-                try:
-                    frontend_zip_path.unlink()
-                except PermissionError:
-                    print(f"[pack] WARN: No se puede eliminar {frontend_zip_name}")
-            
-            print(f"[pack]   Empaquetando frontend: {frontend_zip_name}...")
-            with zipfile.ZipFile(frontend_zip_path, "w", compression=zipfile.ZIP_DEFLATED) as fz:
-                for fp in frontend_dir.rglob("*"):
-                    if fp.is_file() and not any(part in EXCLUDE_NAMES for part in fp.parts):
-                        rel = fp.relative_to(frontend_dir).as_posix()
-                        fz.write(fp, rel)
-            
-            frontend_sha = sha256_file(frontend_zip_path)
-            print(f"[pack]   Frontend SHA256: {frontend_sha[:16]}...")
-            
-            # URL absoluta al asset del GitHub Release
-            if release_tag:
-                tool_entry["frontend_url"] = (
-                    f"https://github.com/{GITHUB_REPO}/releases/download/"
-                    f"{release_tag}/{frontend_zip_name}"
-                )
-            else:
-                tool_entry["frontend_url"] = frontend_zip_name
-            tool_entry["frontend_sha256"] = frontend_sha
-            tool_entry["has_frontend"] = True
-            tool_entry["api_contract"] = meta.get("api_contract", "toolbridge/1")
+        # URL absoluta al asset del GitHub Release
+        if release_tag:
+            tool_entry["frontend_url"] = (
+                f"https://github.com/{GITHUB_REPO}/releases/download/"
+                f"{release_tag}/{frontend_zip_name}"
+            )
         else:
-            tool_entry["has_frontend"] = False
-
-        # --- GPU persistence flag from tool.json ---
-        if meta.get("supports_gpu_persistence"):
-            tool_entry["supports_gpu_persistence"] = True
-        flash_cfg = meta.get("flash_gpu_config")
-        if isinstance(flash_cfg, dict) and flash_cfg.get("enabled"):
-            tool_entry["supports_gpu_persistence"] = True
-
-        # --- Cover image URL (raw GitHub) ---
-        icon_path = tdir / "icon.png"
-        if icon_path.exists():
-            tool_entry["image_url"] = (
-                f"https://raw.githubusercontent.com/{GITHUB_REPO}/main/tools/{tdir.name}/icon.png"
+            tool_entry["frontend_url"] = frontend_zip_name
+        tool_entry["frontend_sha256"] = frontend_sha
+        tool_entry["has_frontend"] = True
+        tool_entry["api_contract"] = meta.get("api_contract", "toolbridge/1")
+    else:
+        tool_entry["has_frontend"] = False
+
+    # --- GPU persistence flag from tool.json ---
+    if meta.get("supports_gpu_persistence"):
+        tool_entry["supports_gpu_persistence"] = True
+    flash_cfg = meta.get("flash_gpu_config")
+    if isinstance(flash_cfg, dict) and flash_cfg.get("enabled"):
+        tool_entry["supports_gpu_persistence"] = True
+
+    # --- Cover image URL (raw GitHub) ---
+    icon_path = tdir / "icon.png"
+    if icon_path.exists():
+        tool_entry["image_url"] = (
+            f"https://raw.githubusercontent.com/{GITHUB_REPO}/main/tools/{tdir.name}/icon.png"
+        )
+
+    return tool_entry
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Empaqueta tools y genera catalog.json")
+    parser.add_argument("--release-tag", default=None,
+                        help="Tag del release (ej: v0.6.0). Se usa para construir URLs de assets.")
+    parser.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Tools empaquetadas en paralelo (default min(4, CPUs))")
+    parser.add_argument("--zip-workers", type=int, default=None,
+                        help="Hilos de compresión de miembros dentro de cada ZIP "
+                             "(default CPUs // --jobs, para no sobresuscribir la máquina)")
+    parser.add_argument("--text-compression", choices=sorted(METHODS), default="deflate",
+                        help="Método para archivos comprimibles (los ya comprimidos van siempre store)")
+    parser.add_argument("--level", type=int, default=DEFAULT_LEVEL,
+                        help=f"Nivel de deflate (default {DEFAULT_LEVEL})")
+    parser.add_argument("--history-dir", type=Path, default=None,
+                        help="Historial de manifests de generate_manifest.py (default dist/history)")
+    parser.add_argument("--delta-bases", type=int, default=DEFAULT_DELTA_BASES,
+                        help=f"Archivos delta contra las últimas K versiones (default {DEFAULT_DELTA_BASES}, 0 = ninguno)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Re-empaquetar todo, ignorando dist/{PACK_CACHE_FILENAME}")
+    parser.add_argument("--tools-dir", type=Path, default=None, help="Directorio de tools (default tools/)")
+    parser.add_argument("--dist-dir", type=Path, default=None, help="Salida de assets y catalog.json (default dist/)")
+    args = parser.parse_args(argv)
+
+    release_tag = args.release_tag or os.environ.get("RELEASE_TAG")
+    jobs = max(1, args.jobs)
+    # Un solo presupuesto de CPUs: cada tool en paralelo recibe su parte
+    zip_workers = args.zip_workers or max(1, (os.cpu_count() or 1) // jobs)
+
+    repo = Path(__file__).resolve().parents[1]
+    tools_dir = args.tools_dir or repo / "tools"
+    dist_dir = args.dist_dir or repo / "dist"
+    dist_dir.mkdir(parents=True, exist_ok=True)
+
+    tool_dirs = sorted([p for p in tools_dir.iterdir() if p.is_dir() and p.name not in EXCLUDE_NAMES])
+    text_method = METHODS[args.text_compression]
+    cache = None if args.no_cache else PackCache(dist_dir / PACK_CACHE_FILENAME)
+    history_dir = args.history_dir or dist_dir / "history"
+    failed: List[str] = []
+
+    def pack(tdir: Path) -> Optional[Dict]:
+        try:
+            return pack_tool(
+                tdir, dist_dir, release_tag, zip_workers, text_method, args.level, cache,
+                history_dir, args.delta_bases
             )
-        
-        tools.append(tool_entry)
+        except PackError as e:
+            print(f"[pack] ERROR: {tdir.name}: {e}")
+            failed.append(tdir.name)
+            return None
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        tools = [entry for entry in pool.map(pack, tool_dirs) if entry is not None]
+    if cache is not None:
+        cache.save()
+        print(f"[pack] Caché de build: {cache.hits} reutilizados, {cache.misses} empaquetados")
+
+    # Un catálogo sin alguna tool no se publica: el build falla
+    if failed:
+        print(f"[pack] ERROR: {len(failed)} tools sin empaquetar ({', '.join(sorted(failed))}); "
+              f"catalog.json no se escribe")
+        return 1
 
     catalog = {
         "catalog_version": datetime.utcnow().strftime("%Y.%m.%d"),
@@ -165,6 +587,8 @@ def main() -> int:
     print(f"[pack] wrote: {dist_dir / 'catalog.json'}")
     for t in tools:
         print(f"[pack] asset: {t['asset_name']} sha256={t['sha256']}")
+        for delta in t.get("deltas", []):
+            print(f"[pack] asset: {delta['asset_name']} sha256={delta['sha256']}")
     return 0
 
 if __name__ == "__main__":
@@ -0,0 +1,414 @@
+"""
+Caché entre pares en la LAN: los workers de un sitio se sirven blobs por sha256.
+
+Cada worker puede levantar un PeerBlobServer que expone los archivos de sus
+releases instaladas (y del almacén de objetos, si lo usa) indexados por hash:
+
+    GET /index            → {"blobs": ["<sha256>", ...]}
+    GET /sha256/<sha256>  → contenido del archivo (keep-alive, HTTP Range)
+
+Con manifests v2 el hash es el digest "<alg>-<hex>" de file_hashing.
+
+PeerDownloader envuelve al downloader normal: para cada archivo consulta qué
+pares conocidos anuncian su hash, lo descarga del primero que responde (el
+SHA256 se verifica siempre en el cliente) y solo si ningún par lo tiene, o
+todos fallan, usa la url del manifest. Así, en un sitio con 40 workers cada
+release cruza la WAN aproximadamente una vez: los que actualizan después la
+obtienen de los que ya la instalaron.
+
+Como el contenido se direcciona por hash, una descarga parcial de un par se
+puede reanudar con Range desde otro par o desde la url original.
+
+El servidor no tiene autenticación: por defecto escucha solo en 127.0.0.1.
+Para servir a la LAN hay que indicar la interfaz (--host) y conviene limitar
+los clientes a los workers del sitio (--allow, IPs o redes CIDR); el resto
+recibe 403.
+
+Las descargas desde pares no pasan por el limitador global del proceso (que
+modela el enlace WAN): usan un limitador propio, sin límite por defecto.
+
+Uso en un worker:
+    python build/peer_cache.py D:/BitStation/Tools --host 192.168.1.20 --port 8766 \
+        --allow 192.168.1.0/24
+"""
+
+import ipaddress
+import json
+import random
+import sys
+import threading
+import time
+from collections import deque
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+try:
+    from bandwidth_limiter import BandwidthLimiter
+    from file_downloader import FileDownloader, HTTPDownloader
+    from file_hashing import entry_digest
+    from local_http_server import RangeRequestHandler
+except ImportError:
+    # Fallback si se ejecuta standalone
+    sys.path.insert(0, str(Path(__file__).parent))
+    from bandwidth_limiter import BandwidthLimiter
+    from file_downloader import FileDownloader, HTTPDownloader
+    from file_hashing import entry_digest
+    from local_http_server import RangeRequestHandler
+
+DEFAULT_PEER_PORT = 8766
+
+# Interfaz de escucha por defecto: el servidor no tiene autenticación
+DEFAULT_PEER_HOST = "127.0.0.1"
+
+# Segundos que un índice (local o de un par) se considera vigente
+INDEX_TTL_SECONDS = 30.0
+
+
+class BlobIndex:
+    """
+    Índice sha256 → archivo local, construido desde los manifests de las
+    releases instaladas en tools_base (y el almacén de objetos compartido).
+    """
+
+    def __init__(self, tools_base: Path, ttl: float = INDEX_TTL_SECONDS):
+        self.tools_base = tools_base
+        self.ttl = ttl
+        self._blobs: Dict[str, Path] = {}
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def _build(self) -> Dict[str, Path]:
+        blobs: Dict[str, Path] = {}
+        if not self.tools_base.exists():
+            return blobs
+
+        # Almacén de objetos: el nombre del blob es su hash
+        objects_dir = self.tools_base / ".objects" / "sha256"
+        if objects_dir.exists():
+            for blob in objects_dir.glob("*/*"):
+                blobs[blob.name] = blob
+
+        for manifest_path in self.tools_base.glob("*/releases/*/manifest.json"):
+            release_dir = manifest_path.parent
+            if release_dir.name.startswith("."):
+                continue  # .staging
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            root = release_dir.resolve()
+            for entry in manifest.get("files", []):
+                path = (release_dir / entry["path"]).resolve()
+                if root not in path.parents:
+                    continue  # Path traversal en un manifest
+                try:
+                    if path.stat().st_size != entry.get("size", path.stat().st_size):
+                        continue  # Archivo alterado: no anunciarlo
+                except OSError:
+                    continue
+                blobs.setdefault(entry_digest(entry), path)
+
+        return blobs
+
+    def refresh(self) -> None:
+        blobs = self._build()
+        with self._lock:
+            self._blobs = blobs
+            self._built_at = time.monotonic()
+
+    def _current(self) -> Dict[str, Path]:
+        with self._lock:
+            stale = time.monotonic() - self._built_at > self.ttl
+        if stale:
+            self.refresh()
+        with self._lock:
+            return self._blobs
+
+    def lookup(self, sha256: str) -> Optional[Path]:
+        return self._current().get(sha256)
+
+    def hashes(self) -> List[str]:
+        return sorted(self._current())
+
+
+def parse_allowed_peers(allowed: Iterable[str]) -> List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    """Convierte IPs o redes CIDR ("192.168.1.0/24") en redes de ipaddress."""
+    return [ipaddress.ip_network(entry, strict=False) for entry in allowed]
+
+
+class _BlobRequestHandler(RangeRequestHandler):
+    """Sirve /index y /sha256/<hash> desde el BlobIndex del servidor."""
+
+    def _forbidden(self) -> bool:
+        """Responde 403 si el cliente no está en la allow-list del servidor."""
+        allowed = self.server.allowed_peers
+        if allowed is None:
+            return False
+        client = ipaddress.ip_address(self.client_address[0])
+        if any(client in network for network in allowed):
+            return False
+        self.send_error(403)
+        return True
+
+    def do_HEAD(self) -> None:
+        if not self._forbidden():
+            super().do_HEAD()
+
+    def translate_path(self, path: str) -> str:
+        path = urlsplit(path).path
+        if path.startswith("/sha256/"):
+            blob = self.server.blob_index.lookup(path[len("/sha256/"):])
+            if blob is not None:
+                return str(blob)
+        return ""  # No es un archivo → 404
+
+    def do_GET(self) -> None:
+        if self._forbidden():
+            return
+        if urlsplit(self.path).path != "/index":
+            super().do_GET()
+            return
+
+        body = json.dumps({"blobs": self.server.blob_index.hashes()}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class PeerBlobServer:
+    """Servidor de blobs por sha256 para los demás workers del sitio."""
+
+    def __init__(
+        self,
+        tools_base: Path,
+        host: str = DEFAULT_PEER_HOST,
+        port: int = DEFAULT_PEER_PORT,
+        allowed_peers: Optional[Iterable[str]] = None
+    ):
+        """
+        Args:
+            tools_base: Directorio base de tools instaladas (como en PCWorker)
+            host: Interfaz de escucha (default solo loopback; para la LAN, la IP del worker)
+            port: Puerto (0 = elegir uno libre)
+            allowed_peers: IPs o redes CIDR que pueden pedir blobs (None = cualquiera
+                que alcance la interfaz)
+        """
+        self.blob_index = BlobIndex(tools_base)
+        self.httpd = ThreadingHTTPServer((host, port), _BlobRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.blob_index = self.blob_index
+        self.httpd.allowed_peers = parse_allowed_peers(allowed_peers) if allowed_peers is not None else None
+        self.httpd.support_ranges = True
+        self.httpd.stats_lock = threading.Lock()
+        self.httpd.connections = 0
+        self.httpd.requests = deque(maxlen=1000)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    @property
+    def requests(self) -> List[tuple]:
+        """Últimas peticiones recibidas: (path, header Range o None)."""
+        return list(self.httpd.requests)
+
+    def start(self) -> "PeerBlobServer":
+        self.blob_index.refresh()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="peer-blobs", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "PeerBlobServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class PeerDownloader(FileDownloader):
+    """
+    Downloader que intenta primero los pares de la LAN y luego la url original.
+
+    Los índices de los pares se consultan como mucho una vez cada
+    INDEX_TTL_SECONDS; un par caído queda con índice vacío hasta entonces.
+    """
+
+    def __init__(
+        self,
+        peers: List[str],
+        fallback: Optional[FileDownloader] = None,
+        peer_timeout: float = 5.0,
+        index_ttl: float = INDEX_TTL_SECONDS,
+        peer_limiter: Optional[BandwidthLimiter] = None
+    ):
+        """
+        Args:
+            peers: URLs base de los pares (ej: "http://192.168.1.20:8766")
+            fallback: Downloader para la url del manifest (default HTTPDownloader)
+            peer_timeout: Timeout (s) contra los pares (la LAN debe responder rápido)
+            index_ttl: Vigencia (s) del índice de cada par
+            peer_limiter: Limitador del tráfico LAN (default uno propio sin límite;
+                nunca el global del proceso, que reparte el enlace WAN)
+        """
+        self.peers = [peer.rstrip("/") for peer in peers]
+        self.fallback = fallback if fallback is not None else HTTPDownloader()
+        self.peer_limiter = peer_limiter if peer_limiter is not None else BandwidthLimiter()
+        self.peer_downloader = HTTPDownloader(segments=1, timeout=peer_timeout, limiter=self.peer_limiter)
+        self.peer_timeout = peer_timeout
+        self.index_ttl = index_ttl
+
+        self.files_from_peers = 0
+        self.bytes_from_peers = 0
+        self.files_from_origin = 0
+
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, Tuple[float, Set[str]]] = {}
+        self._index_locks = {peer: threading.Lock() for peer in self.peers}
+
+    @property
+    def priority(self) -> str:
+        return self.fallback.priority
+
+    @priority.setter
+    def priority(self, value: str) -> None:
+        self.fallback.priority = value
+        self.peer_downloader.priority = value
+
+    def peer_index(self, peer: str) -> Set[str]:
+        """Hashes que anuncia un par (cacheado index_ttl segundos)."""
+        with self._index_locks[peer]:
+            with self._lock:
+                cached = self._indexes.get(peer)
+            if cached and time.monotonic() - cached[0] < self.index_ttl:
+                return cached[1]
+
+            try:
+                with urlopen(f"{peer}/index", timeout=self.peer_timeout) as response:
+                    blobs = set(json.loads(response.read().decode("utf-8"))["blobs"])
+            except Exception as e:
+                print(f"[peer] Par no disponible {peer}: {e}")
+                blobs = set()
+
+            with self._lock:
+                self._indexes[peer] = (time.monotonic(), blobs)
+            return blobs
+
+    def peers_with(self, sha256: str) -> List[str]:
+        """Pares que anuncian el blob, en orden aleatorio (reparte la carga)."""
+        peers = [peer for peer in self.peers if sha256 in self.peer_index(peer)]
+        random.shuffle(peers)
+        return peers
+
+    def has_peer_copy(self, sha256: str) -> bool:
+        """True si algún par anuncia el blob."""
+        return any(sha256 in self.peer_index(peer) for peer in self.peers)
+
+    def _forget(self, peer: str, sha256: str) -> None:
+        with self._lock:
+            cached = self._indexes.get(peer)
+            if cached:
+                cached[1].discard(sha256)
+
+    @staticmethod
+    def _counting_callback(
+        target_path: Path,
+        resume: bool,
+        progress_callback: Optional[Callable[[int, int], None]]
+    ) -> Tuple[Callable[[int, int], None], List[int]]:
+        """
+        Envuelve progress_callback para contar solo los bytes recibidos en esta
+        transferencia (no los de un .part reanudado). Retorna (callback, [bytes]).
+        """
+        received = [0]
+        last = [target_path.stat().st_size if resume and target_path.exists() else 0]
+
+        def callback(done: int, total: int) -> None:
+            if done < last[0]:
+                last[0] = 0  # El par ignoró el Range: la descarga empezó desde cero
+            received[0] += done - last[0]
+            last[0] = done
+            if progress_callback:
+                progress_callback(done, total)
+
+        return callback, received
+
+    def download(
+        self,
+        url: str,
+        target_path: Path,
+        expected_sha256: Optional[str] = None,
+        resume: bool = True,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> bool:
+        """
+        Descarga desde un par que tenga el blob o, si no, desde url.
+        """
+        if expected_sha256:
+            for peer in self.peers_with(expected_sha256):
+                callback, received = self._counting_callback(target_path, resume, progress_callback)
+                if self.peer_downloader.download(
+                    f"{peer}/sha256/{expected_sha256}", target_path, expected_sha256, resume, callback
+                ):
+                    with self._lock:
+                        self.files_from_peers += 1
+                        self.bytes_from_peers += received[0]
+                    return True
+                # Par con el blob corrupto o caído: no volver a pedírselo
+                self._forget(peer, expected_sha256)
+
+        ok = self.fallback.download(url, target_path, expected_sha256, resume, progress_callback)
+        if ok:
+            with self._lock:
+                self.files_from_origin += 1
+        return ok
+
+    def fetch_range(self, url: str, offset: int, length: int) -> bytes:
+        """
+        Rangos (deltas por chunks) siempre desde la url original.
+        """
+        return self.fallback.fetch_range(url, offset, length)
+
+    def range_size(self, url: str) -> Optional[int]:
+        return self.fallback.range_size(url)
+
+
+def main() -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servidor de blobs por sha256 para workers de la LAN")
+    parser.add_argument("tools_base", type=Path, help="Directorio base de tools instaladas")
+    parser.add_argument("--host", default=DEFAULT_PEER_HOST,
+                        help=f"Interfaz de escucha (default {DEFAULT_PEER_HOST}; para la LAN, la IP del worker)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PEER_PORT, help=f"Puerto (default {DEFAULT_PEER_PORT})")
+    parser.add_argument("--allow", action="append", metavar="IP|CIDR",
+                        help="Cliente o red autorizada (repetible; sin --allow se acepta a cualquiera)")
+    args = parser.parse_args()
+
+    server = PeerBlobServer(args.tools_base, host=args.host, port=args.port, allowed_peers=args.allow)
+    if args.allow is None and not ipaddress.ip_address(server.httpd.server_address[0]).is_loopback:
+        print(f"[peer] AVISO: sin --allow, cualquier host que alcance {args.host} puede leer los blobs",
+              file=sys.stderr, flush=True)
+    server.blob_index.refresh()
+    print(f"[peer] Sirviendo {len(server.blob_index.hashes())} blobs de {args.tools_base} "
+          f"en http://{args.host}:{server.port}", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,192 @@
+"""
+Lectura de un ZIP remoto por HTTP Range, sin descargar el asset completo.
+
+El fallback ZIP del updater (manifest sin URLs individuales) solo necesita unos
+pocos miembros del tool_<id>_<version>.zip de pack_tools.py. RemoteZip lee la
+cola del archivo (EOCD, ZIP64 y, si cabe, el directorio central) en una
+petición, parsea el directorio con zipfile y, al abrir cada miembro, pide solo
+el rango [cabecera local, siguiente cabecera): cabecera + datos comprimidos.
+Los miembros grandes se leen por bloques de block_size.
+
+zipfile descomprime y comprueba el CRC al vuelo; el updater verifica además el
+SHA256 de cada miembro mientras lo escribe en staging.
+
+Uso:
+    remote = RemoteZip(url, HTTPDownloader())
+    with remote.open() as zf:          # un ZipFile por hilo (sin red para el directorio)
+        data = zf.read("manifest.json")
+"""
+
+import io
+import threading
+import zipfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from file_downloader import FileDownloader
+except ImportError:
+    # Fallback si se ejecuta standalone
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent))
+    from file_downloader import FileDownloader
+
+# Tamaño de cada petición al leer miembros grandes
+DEFAULT_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Cola pedida al abrir: EOCD + comentario máximo (64 KB) + localizador/EOCD ZIP64
+TAIL_SIZE = 128 * 1024
+
+
+class RangeReader(io.RawIOBase):
+    """
+    Archivo de solo lectura (seekable) sobre un recurso remoto leído por rangos.
+
+    Cada lectura que no está en memoria pide al menos block_size bytes, pero
+    nunca más allá de limit (el fin del miembro que se está leyendo).
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[int, int], bytes],
+        size: int,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        segments: Optional[List[Tuple[int, bytes]]] = None,
+        keep_segments: bool = False
+    ):
+        """
+        Args:
+            fetch: Función (offset, length) -> bytes
+            size: Tamaño total del recurso
+            block_size: Lectura anticipada máxima por petición
+            segments: Rangos ya descargados [(offset, datos)] (p. ej. el directorio central)
+            keep_segments: Si True, todo lo descargado se conserva en segments
+        """
+        self.fetch = fetch
+        self.size = size
+        self.block_size = block_size
+        self.segments = list(segments or [])
+        self.keep_segments = keep_segments
+        self.limit = size
+        self._pos = 0
+        self._buffer: Tuple[int, bytes] = (0, b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self.size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def _from_memory(self, n: int) -> bytes:
+        for start, data in [self._buffer] + self.segments:
+            if start <= self._pos < start + len(data):
+                return data[self._pos - start:self._pos - start + n]
+        return b""
+
+    def read(self, n: int = -1) -> bytes:
+        if n is None or n < 0:
+            n = self.size - self._pos
+        n = min(n, self.size - self._pos)
+
+        out = bytearray()
+        while n > 0:
+            data = self._from_memory(n)
+            if not data:
+                end = min(self.size, max(self._pos + n, min(self.limit, self._pos + self.block_size)))
+                fetched = self.fetch(self._pos, end - self._pos)
+                if self.keep_segments:
+                    self.segments.append((self._pos, fetched))
+                else:
+                    self._buffer = (self._pos, fetched)
+                data = fetched[:n]
+            out += data
+            self._pos += len(data)
+            n -= len(data)
+        return bytes(out)
+
+
+class _RemoteZipFile(zipfile.ZipFile):
+    """ZipFile que acota la lectura anticipada de cada miembro a su propio rango."""
+
+    def __init__(self, reader: RangeReader, member_ends: Optional[Dict[int, int]] = None):
+        super().__init__(reader)
+        self.member_ends = member_ends or {}
+
+    def open(self, name, mode="r", pwd=None, **kwargs):
+        if mode == "r":
+            info = name if isinstance(name, zipfile.ZipInfo) else self.getinfo(name)
+            self.fp.limit = self.member_ends.get(info.header_offset, self.fp.size)
+        return super().open(name, mode, pwd, **kwargs)
+
+
+class RemoteZip:
+    """ZIP remoto: directorio central en memoria, miembros por rangos bajo demanda."""
+
+    def __init__(
+        self,
+        url: str,
+        downloader: FileDownloader,
+        size: Optional[int] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE
+    ):
+        """
+        Args:
+            url: URL del asset ZIP
+            downloader: Downloader con soporte de fetch_range (respeta el límite de ancho de banda)
+            size: Tamaño del asset; si None se sondea con downloader.range_size()
+
+        Raises:
+            OSError: si el servidor no acepta rangos
+            zipfile.BadZipFile: si el recurso no es un ZIP válido
+        """
+        self.url = url
+        self.downloader = downloader
+        self.block_size = block_size
+        self.bytes_fetched = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        self.size = size if size is not None else downloader.range_size(url)
+        if self.size is None:
+            raise OSError(f"Servidor sin soporte de Range para {url}")
+
+        # Cola + directorio central: se descargan una vez y los comparten todos los handles
+        tail_start = max(0, self.size - TAIL_SIZE)
+        reader = RangeReader(
+            self._fetch, self.size, block_size,
+            segments=[(tail_start, self._fetch(tail_start, self.size - tail_start))],
+            keep_segments=True
+        )
+        with _RemoteZipFile(reader) as zf:
+            self.infos = zf.infolist()
+            start_dir = zf.start_dir
+        self._segments = reader.segments
+
+        # Cada miembro ocupa [header_offset, siguiente header_offset o inicio del directorio)
+        offsets = sorted({info.header_offset for info in self.infos})
+        self.member_ends = dict(zip(offsets, offsets[1:] + [start_dir]))
+
+    def _fetch(self, offset: int, length: int) -> bytes:
+        data = self.downloader.fetch_range(self.url, offset, length)
+        with self._lock:
+            self.bytes_fetched += len(data)
+            self.requests += 1
+        return data
+
+    def open(self) -> zipfile.ZipFile:
+        """Nuevo ZipFile de lectura (no thread-safe: uno por hilo)."""
+        reader = RangeReader(self._fetch, self.size, self.block_size, segments=self._segments)
+        return _RemoteZipFile(reader, self.member_ends)
+
+    def read(self, name: str) -> bytes:
+        """Contenido descomprimido (y con CRC verificado) de un miembro."""
+        with self.open() as zf:
+            return zf.read(name)
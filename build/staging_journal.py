@@ -0,0 +1,125 @@
+"""
+Journal de staging para actualizaciones reanudables.
+
+Cada release en staging tiene un journal append-only (JSON Lines) junto a su
+directorio: releases/.staging/v<version>.journal.jsonl
+
+- Primera línea: cabecera con el manifest_hash objetivo
+- Resto: una línea por archivo ya descargado y verificado en staging
+  {"path", "sha256", "size", "mtime_ns"}
+
+Si el updater se interrumpe (corte de luz, kill), al reiniciar la misma
+actualización se reutiliza el staging: los archivos registrados se revalidan
+y solo se rehace lo que falta o está corrupto. Las descargas parciales quedan
+como <archivo>.part para que HTTPDownloader las reanude con HTTP Range.
+
+Una línea final truncada (escritura interrumpida) se ignora.
+"""
+
+import json
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+
+class StagingJournal:
+    """Registro de archivos completos en un staging de release."""
+
+    def __init__(self, staging_release: Path, manifest_hash: str):
+        """
+        Args:
+            staging_release: Directorio de staging (releases/.staging/v<version>)
+            manifest_hash: manifest_hash de la release objetivo
+        """
+        self.staging_release = staging_release
+        self.manifest_hash = manifest_hash
+        self.path = staging_release.with_name(staging_release.name + JOURNAL_SUFFIX)
+        self._lock = threading.Lock()
+        self._fh = None
+
+    def _read_entries(self) -> Optional[Dict[str, Dict]]:
+        """Entradas del journal existente, o None si no existe o es de otro manifest."""
+        if not self.path.exists():
+            return None
+
+        entries: Dict[str, Dict] = {}
+        with self.path.open("r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            return None
+        if header.get("manifest_hash") != self.manifest_hash:
+            return None
+
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Línea truncada por una interrupción
+            entries[entry["path"]] = entry
+        return entries
+
+    def open(self) -> Dict[str, Dict]:
+        """
+        Abre el journal para esta actualización.
+
+        Si existe un staging previo del mismo manifest, lo conserva y retorna
+        sus entradas (path → entrada). Si no, limpia cualquier staging anterior
+        y empieza un journal nuevo.
+
+        Returns:
+            Archivos registrados como completos en un intento previo
+        """
+        entries = self._read_entries()
+
+        if entries is None:
+            # Staging de otra versión del manifest (o sin journal): empezar de cero
+            if self.staging_release.exists():
+                shutil.rmtree(self.staging_release)
+            self.staging_release.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps({"manifest_hash": self.manifest_hash}) + "\n", encoding="utf-8")
+            entries = {}
+        else:
+            self.staging_release.mkdir(parents=True, exist_ok=True)
+
+        self._fh = self.path.open("a", encoding="utf-8")
+        return entries
+
+    def is_intact(self, entry: Dict) -> bool:
+        """True si el archivo registrado sigue en staging con el mismo tamaño y mtime."""
+        try:
+            st = (self.staging_release / entry["path"]).stat()
+        except OSError:
+            return False
+        return st.st_size == entry.get("size") and st.st_mtime_ns == entry.get("mtime_ns")
+
+    def record(self, rel_path: str, sha256: str) -> None:
+        """Registra un archivo completo y verificado en staging."""
+        st = (self.staging_release / rel_path).stat()
+        line = json.dumps({
+            "path": rel_path,
+            "sha256": sha256,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        })
+        with self._lock:
+            if self._fh is None:
+                return
+            self._fh.write(line + "\n")
+            self._fh.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def discard(self) -> None:
+        """Cierra y elimina el journal (release activada)."""
+        self.close()
+        self.path.unlink(missing_ok=True)
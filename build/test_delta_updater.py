@@ -6,17 +6,50 @@ Casos de prueba requeridos:
 2. 1 archivo cambia → descarga 1 archivo
 3. 1 archivo eliminado → borra 1 archivo
 4. Hash mismatch → aborta y no activa
+5. Descarga concurrente → estadísticas exactas, fallo parcial no activa
+6. Archivos sin cambios → reflink/hardlink en vez de copia
+7. Caché de hashes → verificación sin re-hash, paranoid re-hashea, detecta manipulación, también con manifest v2
+8. Almacén de objetos compartido → blob de otra tool no se descarga, gc por referencias, blob corrupto se descarta
+9. Delta por chunks → solo se descargan los chunks que cambiaron
+10. Fallback ZIP → extracción verificada en una pasada, multihilo, rechaza miembros corruptos
+11. Actualización interrumpida → se reanuda desde el journal y conserva el .part
+12. Transporte comprimido → variante gzip determinista, descomprimida y verificada
+13. Caché de hashes de build → run incremental con manifest_hash idéntico, filtro --tool
+14. Hashing en paralelo → mismo resultado y orden que el run secuencial
+15. Parche de manifest → reconstruye el manifest destino verificado y descarga solo lo cambiado
+16. ZIP determinista → mismo sha256 en cada build, store para formatos comprimidos, compresión paralela
+17. Caché de build de pack_tools → tool sin cambios reutiliza el asset y su sha256
+18. Recorrido podado y lectura única → no entra en excluidos, sha256 del ZIP al escribir, manifest desactualizado falla el build
+19. Retención de releases → rollback sin descargas, borrado en segundo plano
+20. Instalación progresiva → activa con los archivos calientes, fríos en segundo plano
+21. Packs de archivos pequeños → pocas peticiones, miembros verificados, fallback individual
+22. Archivos delta entre versiones → solo archivos cambiados, el más pequeño aplicable, base verificada
+23. Manifest v2 con hash_alg → árbol SHA-256 en paralelo, v1 → v2 sin re-descargar, corrupción detectada
 """
 
+import gzip
+import hashlib
 import json
 import shutil
 import tempfile
+import threading
+import time
 import zipfile
 from pathlib import Path
 from typing import Dict, Any
 
 from delta_updater import DeltaUpdater, UpdateStats
+import chunking
+from chunking import chunk_file
 from file_downloader import MockDownloader
+import file_hashing
+import generate_manifest
+from generate_manifest import collect_files
+from hash_cache import HashCache
+from manifest_patch import version_key
+import object_store
+from object_store import ObjectStore
+import pack_tools
 
 
 def create_test_manifest(tool_id: str, version: str, files: list) -> Dict[str, Any]:
@@ -303,6 +336,1412 @@ def test_case_4_hash_mismatch():
             return True
 
 
+class CountingDownloader(MockDownloader):
+    """MockDownloader que registra la concurrencia máxima observada."""
+    
+    def __init__(self, fixtures_dir: Path, delay: float = 0.01):
+        super().__init__(fixtures_dir)
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+    
+    def download(self, url, target_path, expected_sha256=None, resume=True, progress_callback=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            return super().download(url, target_path, expected_sha256, resume, progress_callback)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_case_5_parallel_downloads():
+    """
+    Test Caso 5: Descarga concurrente → estadísticas exactas, fallo parcial no activa
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 5: Descarga concurrente (pool acotado)")
+    print("="*60)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tool_root = Path(tmpdir) / "test_tool"
+        tool_root.mkdir()
+        fixtures_dir = Path(tmpdir) / "fixtures"
+        fixtures_dir.mkdir()
+        
+        # Instalación v1.0.0 con un solo archivo
+        v1_dir = tool_root / "releases" / "v1.0.0"
+        v1_dir.mkdir(parents=True)
+        base = create_test_file(v1_dir / "base.txt", "base")
+        manifest_v1 = create_test_manifest("test", "1.0.0", [base])
+        (v1_dir / "manifest.json").write_text(json.dumps(manifest_v1, indent=2))
+        (tool_root / "current.txt").write_text("v1.0.0")
+        
+        # v1.1.0 agrega 20 archivos nuevos
+        new_files = [create_test_file(fixtures_dir / f"new{i:02d}.txt", f"contenido {i}" * (i + 1))
+                     for i in range(20)]
+        manifest_v2 = create_test_manifest("test", "1.1.0", [base] + new_files)
+        
+        downloader = CountingDownloader(fixtures_dir)
+        updater = DeltaUpdater(tool_root, downloader=downloader, max_workers=4)
+        stats = updater.update_from_zip(Path(tmpdir) / "unused.zip", manifest_v2)
+        
+        assert stats.files_downloaded == 20, f"Esperado 20 descargados, obtenido {stats.files_downloaded}"
+        assert stats.bytes_downloaded == sum(f["size"] for f in new_files)
+        assert stats.files_skipped == 1
+        assert stats.files_verified == 21
+        assert 1 < downloader.max_active <= 4, f"Concurrencia fuera de rango: {downloader.max_active}"
+        assert (tool_root / "current.txt").read_text() == "v1.1.0"
+        
+        # v1.2.0: un archivo con hash incorrecto → debe abortar sin activar
+        broken = dict(create_test_file(fixtures_dir / "broken.txt", "real"))
+        broken["sha256"] = hashlib.sha256(b"otro").hexdigest()
+        manifest_v3 = create_test_manifest("test", "1.2.0", manifest_v2["files"] + [broken])
+        
+        try:
+            updater.update_from_zip(Path(tmpdir) / "unused.zip", manifest_v3)
+            assert False, "Debió abortar por descarga fallida"
+        except RuntimeError as e:
+            assert "integridad" in str(e).lower()
+        
+        assert (tool_root / "current.txt").read_text() == "v1.1.0"
+        assert not (tool_root / "releases" / "v1.2.0").exists()
+        
+        print("[OK] Test Caso 5 PASADO")
+        print(f"  Descargados: {stats.files_downloaded}")
+        print(f"  Concurrencia máxima: {downloader.max_active}")
+        return True
+
+
+def test_case_6_link_unchanged_files():
+    """
+    Test Caso 6: Archivos sin cambios → reflink/hardlink en vez de copia
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 6: Reutilización de archivos sin cambios (reflink/hardlink)")
+    print("="*60)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tool_root = Path(tmpdir) / "test_tool"
+        tool_root.mkdir()
+        fixtures_dir = Path(tmpdir) / "fixtures"
+        fixtures_dir.mkdir()
+        
+        v1_dir = tool_root / "releases" / "v1.0.0"
+        v1_dir.mkdir(parents=True)
+        big = create_test_file(v1_dir / "big.bin", "x" * 100000)
+        gone = create_test_file(v1_dir / "gone.txt", "obsoleto")
+        manifest_v1 = create_test_manifest("test", "1.0.0", [big, gone])
+        (v1_dir / "manifest.json").write_text(json.dumps(manifest_v1, indent=2))
+        (tool_root / "current.txt").write_text("v1.0.0")
+        
+        added = create_test_file(fixtures_dir / "added.txt", "nuevo")
+        manifest_v2 = create_test_manifest("test", "1.1.0", [big, added])
+        
+        updater = DeltaUpdater(tool_root, downloader=MockDownloader(fixtures_dir), keep_releases=1)
+        stats = updater.update_from_zip(Path(tmpdir) / "unused.zip", manifest_v2)
+        updater.wait_cleanup()
+        
+        assert stats.files_skipped == 1
+        assert stats.files_reflinked + stats.files_hardlinked + stats.files_copied == 1
+        assert stats.bytes_reused == big["size"]
+        # La release anterior se eliminó: el archivo compartido debe seguir intacto
+        assert not v1_dir.exists()
+        v2_big = tool_root / "releases" / "v1.1.0" / "big.bin"
+        assert v2_big.read_text(encoding="utf-8") == "x" * 100000
+        
+        # Con ("copy",) se fuerza la copia clásica
+        manifest_v3 = create_test_manifest("test", "1.2.0", [big, added])
+        updater = DeltaUpdater(tool_root, downloader=MockDownloader(fixtures_dir), link_strategies=("copy",))
+        stats_copy = updater.update_from_zip(Path(tmpdir) / "unused.zip", manifest_v3)
+        assert stats_copy.files_copied == 2
+        assert stats_copy.files_reflinked == stats_copy.files_hardlinked == 0
+        
+        print("[OK] Test Caso 6 PASADO")
+        print(f"  reflink={stats.files_reflinked} hardlink={stats.files_hardlinked} copia={stats.files_copied}")
+        return True
+
+
+class HashCountingUpdater(DeltaUpdater):
+    """DeltaUpdater que cuenta los archivos re-hasheados desde disco."""
+    
+    hashed = 0
+    
+    def file_digest(self, path: Path, alg: str = file_hashing.SHA256) -> str:
+        self.hashed += 1
+        return super().file_digest(path, alg)
+
+
+def test_case_7_hash_cache():
+    """
+    Test Caso 7: Caché de hashes → verificación sin re-hash, paranoid re-hashea, detecta manipulación, también con manifest v2
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 7: Caché persistente de hashes")
+    print("="*60)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tool_root = Path(tmpdir) / "test_tool"
+        tool_root.mkdir()
+        fixtures_dir = Path(tmpdir) / "fixtures"
+        fixtures_dir.mkdir()
+        
+        # Instalación inicial (sin caché): todo se hashea una vez
+        v1_dir = tool_root / "releases" / "v1.0.0"
+        v1_dir.mkdir(parents=True)
+        a = create_test_file(v1_dir / "a.txt", "aaaa")
+        b = create_test_file(v1_dir / "b.txt", "bbbb")
+        manifest_v1 = create_test_manifest("test", "1.0.0", [a, b])
+        (v1_dir / "manifest.json").write_text(json.dumps(manifest_v1, indent=2))
+        (tool_root / "current.txt").write_text("v1.0.0")
+        
+        c = create_test_file(fixtures_dir / "c.txt", "cccc")
+        manifest_v2 = create_test_manifest("test", "1.1.0", [a, b, c])
+        updater = HashCountingUpdater(tool_root, downloader=MockDownloader(fixtures_dir))
+        stats = updater.update_from_zip(Path(tmpdir) / "unused.zip", manifest_v2)
+        assert stats.files_hash_cached == 1, "c.txt se verificó al descargar"
+        assert updater.hashed == 2
+        assert (tool_root / "hash_cache.json").exists()
+        
+        # Segunda actualización: todo viene de la caché
+        d = create_test_file(fixtures_dir / "d.txt", "dddd")
+        manifest_v3 = create_test_manifest("test", "1.2.0", [a, b, c, d])
+        updater = HashCountingUpdater(tool_root, downloader=MockDownloader(fixtures_dir))
+        stats = updater.update_from_zip(Path(tmpdir) / "unused.zip", manifest_v3)
+        assert stats.files_verified == 4
+        assert stats.files_hash_cached == 4, f"Esperado 4 desde caché, obtenido {stats.files_hash_cached}"
+        assert updater.hashed == 0
+        
+        # Modo paranoid: re-hash completo
+        manifest_v4 = create_test_manifest("test", "1.3.0", [a, b, c, d])
+        updater = HashCountingUpdater(tool_root, downloader=MockDownloader(fixtures_dir), paranoid=True)
+        stats = updater.update_from_zip(Path(tmpdir) / "unused.zip", manifest_v4)
+        assert stats.files_hash_cached == 0
+        assert updater.hashed == 4
+        
+        # Manipulación de un archivo instalado: cambia la identidad → re-hash → aborta
+        (tool_root / "releases" / "v1.3.0" / "a.txt").write_text("manipulado", encoding="utf-8")
+        manifest_v5 = create_test_manifest("test", "1.4.0", [a, b, c, d])
+        updater = HashCountingUpdater(tool_root, downloader=MockDownloader(fixtures_dir))
+        try:
+            updater.update_from_zip(Path(tmpdir) / "unused.zip", manifest_v5)
+            assert False, "Debió detectar el archivo manipulado"
+        except RuntimeError as e:
+            assert "integridad" in str(e).lower()
+        assert (tool_root / "current.txt").read_text() == "v1.3.0"
+        
+        # Manifest v2 (sha256-tree): los archivos sin cambios heredan el digest en FASE 2
+        def tree_entry(info):
+            digest = file_hashing.hash_file(fixtures_dir / info["path"], file_hashing.SHA256_TREE)
+            entry = {k: v for k, v in info.items() if k != "sha256"}
+            return {**entry, **file_hashing.entry_fields(digest)}
+        
+        e = create_test_file(fixtures_dir / "e.txt", "eeee")
+        f = create_test_file(fixtures_dir / "f.txt", "ffff")
+        g = create_test_file(fixtures_dir / "g.txt", "gggg")
+        v2_root = Path(tmpdir) / "tool_v2"
+        stats = HashCountingUpdater(v2_root, downloader=MockDownloader(fixtures_dir)).update_from_zip(
+            None, create_test_manifest("test", "1.9.0", [e, f]))
+        assert stats.files_downloaded == 2
+        
+        # v1 → v2: compute_diff re-hashea cada archivo una vez; FASE 3 ya no lo relee
+        manifest = create_test_manifest("test", "2.0.0", [tree_entry(e), tree_entry(f)])
+        manifest["manifest_version"] = "2.0"
+        updater = HashCountingUpdater(v2_root, downloader=MockDownloader(fixtures_dir))
+        stats = updater.update_from_zip(None, manifest)
+        assert stats.files_downloaded == 0 and stats.files_hash_cached == 2
+        assert updater.hashed == 2, f"Esperado 1 re-hash por archivo, obtenido {updater.hashed}"
+        
+        manifest = create_test_manifest("test", "2.1.0", [tree_entry(e), tree_entry(f), tree_entry(g)])
+        manifest["manifest_version"] = "2.0"
+        updater = HashCountingUpdater(v2_root, downloader=MockDownloader(fixtures_dir))
+        stats = updater.update_from_zip(None, manifest)
+        assert stats.files_skipped == 2 and stats.files_verified == 3
+        assert stats.files_hash_cached == 3, f"v2: esperado 3 desde caché, obtenido {stats.files_hash_cached}"
+        assert updater.hashed == 0, "FASE 2 debe heredar los digests sha256-tree"
+        
+        print("[OK] Test Caso 7 PASADO")
+        return True
+
+
+def test_case_8_object_store():
+    """
+    Test Caso 8: Almacén de objetos compartido → blob de otra tool no se descarga, gc por referencias, blob corrupto se descarta
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 8: Almacén de objetos compartido entre tools")
+    print("="*60)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tools_base = Path(tmpdir) / "tools"
+        tools_base.mkdir()
+        fixtures_dir = Path(tmpdir) / "fixtures"
+        fixtures_dir.mkdir()
+        empty_fixtures = Path(tmpdir) / "empty"
+        empty_fixtures.mkdir()
+        store = ObjectStore(tools_base / ".objects")
+        
+        bridge = create_test_file(fixtures_dir / "bridge.js", "window.bridge = {};")
+        only_a = create_test_file(fixtures_dir / "a.txt", "solo tool A")
+        
+        # Tool A instala bridge.js descargándolo
+        updater_a = DeltaUpdater(tools_base / "tool_a", downloader=MockDownloader(fixtures_dir), object_store=store,
+                                 keep_releases=1)
+        stats_a = updater_a.update_from_zip(Path(tmpdir) / "unused.zip",
+                                            create_test_manifest("tool_a", "1.0.0", [bridge, only_a]))
+        assert stats_a.files_downloaded == 2
+        assert store.has(bridge["sha256"]) and store.has(only_a["sha256"])
+        release_a = tools_base / "tool_a" / "releases" / "v1.0.0" / "a.txt"
+        assert store.object_path(only_a["sha256"]).stat().st_ino != release_a.stat().st_ino, \
+            "La ingesta no debe compartir inodo con la release"
+        
+        # Tool B usa el mismo bridge.js: sale del almacén (sin fixtures → descargar fallaría)
+        updater_b = DeltaUpdater(tools_base / "tool_b", downloader=MockDownloader(empty_fixtures), object_store=store)
+        stats_b = updater_b.update_from_zip(Path(tmpdir) / "unused.zip",
+                                            create_test_manifest("tool_b", "1.0.0", [bridge]))
+        assert stats_b.files_downloaded == 0
+        assert stats_b.files_from_store == 1
+        assert stats_b.bytes_from_store == bridge["size"]
+        assert (tools_base / "tool_b" / "releases" / "v1.0.0" / "bridge.js").read_text(encoding="utf-8") == "window.bridge = {};"
+        assert store.refcounts()[bridge["sha256"]] == 2
+        
+        # Tool A elimina a.txt en v1.1.0: su blob queda sin referencias
+        updater_a.update_from_zip(Path(tmpdir) / "unused.zip",
+                                  create_test_manifest("tool_a", "1.1.0", [bridge]))
+        assert only_a["sha256"] not in store.refcounts()
+        
+        removed, freed = store.gc()
+        assert removed == 1 and freed == only_a["size"]
+        assert not store.has(only_a["sha256"])
+        assert store.has(bridge["sha256"]), "bridge.js sigue referenciado por ambas tools"
+        
+        # Blob modificado in-place (p. ej. vía una release enlazada): se descarta y se descarga
+        with store.object_path(bridge["sha256"]).open("r+b") as f:
+            f.write(b"X")
+        updater_c = DeltaUpdater(tools_base / "tool_c", downloader=MockDownloader(fixtures_dir), object_store=store)
+        stats_c = updater_c.update_from_zip(None, create_test_manifest("tool_c", "1.0.0", [bridge]))
+        assert stats_c.files_from_store == 0 and stats_c.files_downloaded == 1
+        assert store.object_path(bridge["sha256"]).read_text(encoding="utf-8") == "window.bridge = {};"
+        
+        # Temporales de ingesta: la antigüedad sale del nombre, no del mtime heredado del origen
+        import os
+        store.tmp_dir.mkdir(parents=True, exist_ok=True)
+        old_time = time.time() - 2 * object_store.TMP_GRACE_SECONDS
+        fresh = store.tmp_dir / f"{time.time_ns()}.abc.{bridge['sha256']}"
+        orphan = store.tmp_dir / f"{int(old_time * 1e9)}.def.{bridge['sha256']}"
+        for tmp in (fresh, orphan):
+            tmp.write_text("x")
+            os.utime(tmp, (old_time, old_time))
+        store.gc()
+        assert fresh.exists() and not orphan.exists()
+        
+        print("[OK] Test Caso 8 PASADO")
+        return True
+
+
+def create_chunked_file(path: Path, data: bytes) -> Dict[str, Any]:
+    """Crea un archivo binario y retorna su entrada de manifest con chunks (tamaños pequeños)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    chunks, sha256 = chunk_file(path, min_size=1024, avg_size=4096, max_size=16384)
+    return {
+        "path": path.name,
+        "sha256": sha256,
+        "size": len(data),
+        "url": f"https://test.local/files/{path.name}",
+        "chunks": chunks
+    }
+
+
+def test_case_9_chunk_delta():
+    """
+    Test Caso 9: Delta por chunks → solo se descargan los chunks que cambiaron
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 9: Delta binario por chunks")
+    print("="*60)
+    
+    import random
+    rng = random.Random(42)
+    original = bytes(rng.getrandbits(8) for _ in range(300 * 1024))
+    # Cambiar unos bytes en el medio e insertar otros (desplaza todo lo posterior)
+    modified = original[:150000] + b"PATCH" + original[150010:200000] + b"INSERTED" + original[200000:]
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tool_root = Path(tmpdir) / "test_tool"
+        tool_root.mkdir()
+        fixtures_dir = Path(tmpdir) / "fixtures"
+        fixtures_dir.mkdir()
+        
+        v1_dir = tool_root / "releases" / "v1.0.0"
+        v1_dir.mkdir(parents=True)
+        big_v1 = create_chunked_file(v1_dir / "bundle.js", original)
+        manifest_v1 = create_test_manifest("test", "1.0.0", [big_v1])
+        (v1_dir / "manifest.json").write_text(json.dumps(manifest_v1, indent=2))
+        (tool_root / "current.txt").write_text("v1.0.0")
+        
+        big_v2 = create_chunked_file(fixtures_dir / "bundle.js", modified)
+        shared = {c["sha256"] for c in big_v1["chunks"]} & {c["sha256"] for c in big_v2["chunks"]}
+        assert len(shared) >= len(big_v2["chunks"]) - 6, "CDC debe conservar la mayoría de los chunks"
+        
+        # Corte vectorizado (numpy, opcional) = corte byte a byte, con lecturas que parten chunks
+        if chunking.vectorized_available():
+            for params in ({"min_size": 1024, "avg_size": 4096, "max_size": 16384},
+                           {"min_size": 16, "avg_size": 64, "max_size": 256}):
+                assert (chunk_file(fixtures_dir / "bundle.js", read_size=100000, vectorized=True, **params)
+                        == chunk_file(fixtures_dir / "bundle.js", read_size=100000, vectorized=False, **params))
+        
+        manifest_v2 = create_test_manifest("test", "1.1.0", [big_v2])
+        updater = DeltaUpdater(tool_root, downloader=MockDownloader(fixtures_dir))
+        stats = updater.update_from_zip(Path(tmpdir) / "unused.zip", manifest_v2)
+        
+        assert stats.files_downloaded == 1
+        assert stats.files_chunk_patched == 1
+        assert stats.bytes_downloaded < len(modified) // 4, f"Descargados {stats.bytes_downloaded} bytes"
+        assert stats.bytes_downloaded + stats.bytes_saved_by_chunks == len(modified)
+        assert (tool_root / "releases" / "v1.1.0" / "bundle.js").read_bytes() == modified
+        
+        print("[OK] Test Caso 9 PASADO")
+        print(f"  Descargado: {stats.bytes_downloaded} / {len(modified)} bytes")
+        return True
+
+
+def test_case_10_zip_streaming_extract():
+    """
+    Test Caso 10: Fallback ZIP → extracción verificada en una pasada, multihilo, rechaza miembros corruptos
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 10: Extracción ZIP verificada en streaming")
+    print("="*60)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tool_root = Path(tmpdir) / "test_tool"
+        tool_root.mkdir()
+        
+        contents = {f"src/mod{i}.py": f"print({i})\n" * (i + 1) for i in range(12)}
+        entries = []
+        for name, content in contents.items():
+            entries.append({
+                "path": name,
+                "sha256": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+                "size": len(content.encode("utf-8"))
+            })  # Sin URL → modo ZIP
+        manifest = create_test_manifest("test", "1.0.0", entries)
+        zip_path = Path(tmpdir) / "test_1.0.0.zip"
+        create_test_zip(zip_path, contents, manifest)
+        
+        updater = HashCountingUpdater(tool_root, zip_workers=3)
+        stats = updater.update_from_zip(zip_path, manifest)
+        
+        assert stats.files_downloaded == 12
+        assert stats.files_verified == 12
+        assert stats.files_hash_cached == 12, "FASE 3 no debe releer lo extraído"
+        assert updater.hashed == 0
+        assert (tool_root / "releases" / "v1.0.0" / "src" / "mod3.py").read_text(encoding="utf-8") == contents["src/mod3.py"]
+        
+        # Un miembro corrupto en el ZIP aborta sin activar
+        corrupt = dict(contents)
+        corrupt["src/mod5.py"] = "manipulado"
+        manifest_v2 = create_test_manifest("test", "1.1.0", entries + [{
+            "path": "extra.txt", "sha256": hashlib.sha256(b"extra").hexdigest(), "size": 5
+        }])
+        corrupt["extra.txt"] = "extra"
+        zip_v2 = Path(tmpdir) / "test_1.1.0.zip"
+        create_test_zip(zip_v2, corrupt, manifest_v2)
+        
+        # Forzar re-extracción de todo (sin release actual)
+        (tool_root / "current.txt").unlink()
+        try:
+            HashCountingUpdater(tool_root, zip_workers=2).update_from_zip(zip_v2, manifest_v2)
+            assert False, "Debió rechazar el miembro corrupto"
+        except RuntimeError as e:
+            assert "integridad" in str(e).lower()
+        assert not (tool_root / "releases" / "v1.1.0").exists()
+        
+        print("[OK] Test Caso 10 PASADO")
+        return True
+
+
+class InterruptingDownloader(MockDownloader):
+    """
+    MockDownloader que simula un corte a mitad de un archivo: escribe la mitad
+    del fixture y falla. Registra el tamaño parcial previo de cada descarga.
+    """
+    
+    def __init__(self, fixtures_dir: Path, interrupt: set):
+        super().__init__(fixtures_dir)
+        self.interrupt = set(interrupt)
+        self.calls = []
+    
+    def download(self, url, target_path, expected_sha256=None, resume=True, progress_callback=None):
+        name = url.split('/')[-1]
+        partial = target_path.stat().st_size if target_path.exists() else 0
+        self.calls.append((name, partial))
+        if name in self.interrupt:
+            data = (self.fixtures_dir / name).read_bytes()
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            target_path.write_bytes(data[:len(data) // 2])
+            return False
+        return super().download(url, target_path, expected_sha256, resume, progress_callback)
+
+
+def test_case_11_resume_interrupted_update():
+    """
+    Test Caso 11: Actualización interrumpida → se reanuda desde el journal y conserva el .part
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 11: Reanudación de staging interrumpido")
+    print("="*60)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tool_root = Path(tmpdir) / "test_tool"
+        tool_root.mkdir()
+        fixtures_dir = Path(tmpdir) / "fixtures"
+        fixtures_dir.mkdir()
+        
+        files = [create_test_file(fixtures_dir / f"f{i}.bin", f"payload {i} " * 500) for i in range(5)]
+        manifest = create_test_manifest("test", "1.0.0", files)
+        
+        # Primer intento: se corta en f2.bin (secuencial para que el orden sea predecible)
+        first = InterruptingDownloader(fixtures_dir, interrupt={"f2.bin"})
+        try:
+            DeltaUpdater(tool_root, downloader=first, max_workers=1).update_from_zip(Path(tmpdir) / "unused.zip", manifest)
+            assert False, "Debió fallar por la interrupción"
+        except RuntimeError:
+            pass
+        
+        staging = tool_root / "releases" / ".staging" / "v1.0.0"
+        assert (staging / "f0.bin").exists() and (staging / "f1.bin").exists()
+        assert (staging / "f2.bin.part").exists(), "El parcial debe conservarse para Range resume"
+        assert not (tool_root / "current.txt").exists()
+        
+        # Segundo intento: reanuda
+        second = InterruptingDownloader(fixtures_dir, interrupt=set())
+        stats = DeltaUpdater(tool_root, downloader=second, max_workers=1).update_from_zip(Path(tmpdir) / "unused.zip", manifest)
+        
+        # f0 y f1 seguro; f3 puede haber empezado antes de cancelar las pendientes
+        assert stats.files_resumed >= 2, f"Esperado >= 2 reanudados, obtenido {stats.files_resumed}"
+        assert stats.files_resumed + stats.files_downloaded == 5
+        assert stats.files_verified == 5
+        downloaded = dict(second.calls)
+        assert "f0.bin" not in downloaded and "f1.bin" not in downloaded
+        assert downloaded["f2.bin"] > 0, "f2.bin debe reanudarse desde su .part"
+        assert (tool_root / "current.txt").read_text() == "v1.0.0"
+        assert not (tool_root / "releases" / ".staging").exists()
+        
+        # Un staging de otro manifest no se reutiliza
+        corrupt_staging = tool_root / "releases" / ".staging" / "v1.1.0"
+        corrupt_staging.mkdir(parents=True)
+        (corrupt_staging / "stale.txt").write_text("viejo")
+        manifest_v2 = create_test_manifest("test", "1.1.0", files)
+        DeltaUpdater(tool_root, downloader=MockDownloader(fixtures_dir)).update_from_zip(Path(tmpdir) / "unused.zip", manifest_v2)
+        assert not (tool_root / "releases" / "v1.1.0" / "stale.txt").exists()
+        
+        print("[OK] Test Caso 11 PASADO")
+        return True
+
+
+def test_case_12_compressed_transport():
+    """
+    Test Caso 12: Transporte comprimido → variante gzip determinista, descomprimida y verificada
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 12: Variantes comprimidas de transporte")
+    print("="*60)
+    
+    import os
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = Path(tmpdir) / "source"
+        source.mkdir()
+        (source / "app.js").write_text("export function render(state) { return state; }\n" * 400)
+        (source / "app.css").write_text(".panel { display: flex; }\n" * 300)
+        (source / "logo.png").write_bytes(os.urandom(4096))
+        
+        compressed_dir = Path(tmpdir) / "compressed"
+        files = collect_files(source, "https://test.local/files", "test", "1.0.0",
+                              compress="gzip", compressed_dir=compressed_dir)
+        again = collect_files(source, "https://test.local/files", "test", "1.0.0",
+                              compress="gzip", compressed_dir=Path(tmpdir) / "compressed2")
+        assert files == again, "Las variantes deben ser deterministas"
+        
+        by_path = {f["path"]: f for f in files}
+        assert "compressed" not in by_path["logo.png"], "PNG no se recomprime"
+        js_variant = by_path["app.js"]["compressed"]
+        assert js_variant["encoding"] == "gzip"
+        assert js_variant["url"] == by_path["app.js"]["url"] + ".gz"
+        assert js_variant["size"] < by_path["app.js"]["size"] // 10
+        
+        # Fixtures: crudos + variantes (MockDownloader resuelve por nombre de archivo)
+        fixtures_dir = Path(tmpdir) / "fixtures"
+        shutil.copytree(source, fixtures_dir)
+        for variant in compressed_dir.rglob("*.gz"):
+            shutil.copy2(variant, fixtures_dir / variant.name)
+        
+        # Variante de app.css válida como gzip (hash de transporte correcto) pero con otro contenido
+        bad_variant = gzip.compress(b"otro contenido")
+        (fixtures_dir / "app.css.gz").write_bytes(bad_variant)
+        by_path["app.css"]["compressed"].update(size=len(bad_variant), sha256=hashlib.sha256(bad_variant).hexdigest())
+        
+        tool_root = Path(tmpdir) / "tool"
+        manifest = create_test_manifest("test", "1.0.0", files)
+        stats = DeltaUpdater(tool_root, downloader=MockDownloader(fixtures_dir)).update_from_zip(
+            Path(tmpdir) / "unused.zip", manifest
+        )
+        
+        release = tool_root / "releases" / "v1.0.0"
+        for name in ("app.js", "app.css", "logo.png"):
+            assert (release / name).read_bytes() == (source / name).read_bytes()
+        assert not list(release.rglob("*.transport*")), "No deben quedar temporales de transporte"
+        
+        assert stats.files_downloaded == 3
+        assert stats.files_decompressed == 1, "app.css debe caer a la descarga cruda"
+        expected = js_variant["size"] + by_path["app.css"]["size"] + by_path["logo.png"]["size"]
+        assert stats.bytes_downloaded == expected
+        assert stats.bytes_saved_by_compression == by_path["app.js"]["size"] - js_variant["size"]
+        
+        print("[OK] Test Caso 12 PASADO")
+        print(f"  app.js: {by_path['app.js']['size']} -> {js_variant['size']} bytes")
+        return True
+
+
+def test_case_13_build_hash_cache():
+    """
+    Test Caso 13: Caché de hashes de build → run incremental con manifest_hash idéntico, filtro --tool
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 13: Caché de hashes de build")
+    print("="*60)
+    
+    import os
+    
+    def without_created_at(manifests):
+        return {tid: {k: v for k, v in m.items() if k != "created_at"} for tid, m in manifests.items()}
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = Path(tmpdir) / "repo"
+        old = time.time() - 60
+        for tool_id in ("tool-a", "tool-b"):
+            tool_dir = repo / "tools" / tool_id
+            (tool_dir / "src").mkdir(parents=True)
+            (tool_dir / "tool.json").write_text(json.dumps({"tool_id": tool_id, "version": "1.0.0"}))
+            (tool_dir / "src" / "main.py").write_text(f"print('{tool_id}')\n" * 200)
+            (tool_dir / "assets.dat").write_bytes(os.urandom(200 * 1024))
+            for path in tool_dir.rglob("*"):
+                os.utime(path, (old, old))
+        
+        cache_dir = Path(tmpdir) / "cache"
+        options = dict(base_url="https://test.local/tools", chunk_threshold=100 * 1024,
+                       compress="gzip", compressed_dir=Path(tmpdir) / "files")
+        
+        # Contar lecturas completas (hash o chunking)
+        reads = []
+        original_sha, original_chunk = generate_manifest.sha256_file, generate_manifest.chunk_file
+        def counting(original):
+            def wrapper(p, *args, **kwargs):
+                reads.append(p)
+                return original(p, *args, **kwargs)
+            return wrapper
+        generate_manifest.sha256_file = counting(original_sha)
+        generate_manifest.chunk_file = counting(original_chunk)
+        
+        def manifest_hash(tool_id, hash_cache=None):
+            tool_dir = repo / "tools" / tool_id
+            meta = json.loads((tool_dir / "tool.json").read_text())
+            return generate_manifest.generate_manifest(
+                tool_dir, meta, options["base_url"], options["chunk_threshold"],
+                options["compress"], options["compressed_dir"], hash_cache
+            )["manifest_hash"]
+        
+        try:
+            generate_manifest.generate_manifests_for_all_tools(repo, cache_dir=cache_dir, **options)
+            assert len(reads) == 6, "Primer run con caché vacía hashea todo"
+            reads.clear()
+            
+            generate_manifest.generate_manifests_for_all_tools(repo, cache_dir=cache_dir, **options)
+            assert reads == [], f"Run sin cambios no debe releer archivos: {reads}"
+            
+            # Mismo árbol: con caché y sin caché dan el mismo manifest_hash
+            cache_a = HashCache(repo / "tools" / "tool-a", cache_path=cache_dir / "tool-a.json", track_inode=False)
+            assert manifest_hash("tool-a", cache_a) == manifest_hash("tool-a")
+            
+            # Cambiar un archivo de tool-a y regenerar solo esa tool
+            before = manifest_hash("tool-a")
+            changed = repo / "tools" / "tool-a" / "src" / "main.py"
+            changed.write_text("print('tool-a v2')\n" * 200)
+            os.utime(changed, (old + 1, old + 1))
+            reads.clear()
+            incremental = generate_manifest.generate_manifests_for_all_tools(
+                repo, cache_dir=cache_dir, tool_ids=["tool-a"], **options
+            )
+            assert list(incremental) == ["tool-a"]
+            assert reads == [changed], f"Solo debe re-hashearse el archivo cambiado: {reads}"
+            
+            cache_a.load()
+            assert manifest_hash("tool-a", cache_a) == manifest_hash("tool-a") != before
+            
+            # Archivo recién modificado: no se registra (resolución de mtime)
+            changed.write_text("print('tool-a v3')\n" * 200)
+            generate_manifest.generate_manifests_for_all_tools(repo, cache_dir=cache_dir, tool_ids=["tool-a"], **options)
+            reads.clear()
+            generate_manifest.generate_manifests_for_all_tools(repo, cache_dir=cache_dir, tool_ids=["tool-a"], **options)
+            assert reads == [changed]
+        finally:
+            generate_manifest.sha256_file, generate_manifest.chunk_file = original_sha, original_chunk
+        
+        print("[OK] Test Caso 13 PASADO")
+        return True
+
+
+def test_case_14_parallel_hashing():
+    """
+    Test Caso 14: Hashing en paralelo → mismo resultado y orden que el run secuencial
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 14: Hashing en paralelo")
+    print("="*60)
+    
+    import os
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tool_dir = Path(tmpdir) / "tool"
+        for i in range(40):
+            path = tool_dir / f"pkg{i % 5}" / f"file_{i}.js"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"export const v = {i};\n" * (i + 1))
+        (tool_dir / "big.dat").write_bytes(os.urandom(300 * 1024))
+        (tool_dir / "run.sh").write_text("#!/bin/sh\n")
+        
+        args = (tool_dir, "https://test.local/tools", "test-tool", "1.0.0")
+        serial = collect_files(*args, chunk_threshold=100 * 1024, workers=1)
+        parallel = collect_files(*args, chunk_threshold=100 * 1024, workers=4)
+        
+        assert parallel == serial, "El run paralelo debe producir exactamente las mismas entradas"
+        paths = [f["path"] for f in parallel]
+        assert paths == sorted(paths), "Orden determinista por path"
+        assert len(paths) == 42
+        
+        # Con caché compartida entre hilos: mismo resultado y todo registrado
+        old = time.time() - 60
+        for path in tool_dir.rglob("*"):
+            os.utime(path, (old, old))
+        cache = HashCache(tool_dir, cache_path=Path(tmpdir) / "cache.json", track_inode=False)
+        assert collect_files(*args, chunk_threshold=100 * 1024, hash_cache=cache, workers=4) == serial
+        assert all(cache.lookup(tool_dir / p) for p in paths)
+        assert collect_files(*args, chunk_threshold=100 * 1024, hash_cache=cache, workers=4) == serial
+        
+        print(f"[OK] {len(paths)} archivos, resultado paralelo idéntico al secuencial")
+        print("[OK] Test Caso 14 PASADO")
+        return True
+
+
+def test_case_15_manifest_patch():
+    """
+    Test Caso 15: Parche de manifest → reconstruye el manifest destino verificado y descarga solo lo cambiado
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 15: Parche de manifest")
+    print("="*60)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = Path(tmpdir) / "source"
+        source.mkdir()
+        for i in range(30):
+            (source / f"module_{i}.js").write_text(f"export const v = {i};\n")
+        (source / "b.txt").write_text("contenido B v1")
+        (source / "c.txt").write_text("contenido C v1")
+        
+        history = Path(tmpdir) / "history"
+        base_url = "https://test.local/tools"
+        m1 = generate_manifest.generate_manifest(source, {"tool_id": "test", "version": "1.0.0"}, base_url)
+        assert generate_manifest.record_release(history, m1) is None, "Sin versión anterior no hay parche"
+        
+        tool_root = Path(tmpdir) / "tool"
+        fixtures_v1 = Path(tmpdir) / "fixtures_v1"
+        shutil.copytree(source, fixtures_v1)
+        DeltaUpdater(tool_root, downloader=MockDownloader(fixtures_v1)).update_from_zip(None, m1)
+        
+        # v1.1.0: 1 cambiado, 1 eliminado, 1 nuevo
+        (source / "b.txt").write_text("contenido B v2")
+        (source / "c.txt").unlink()
+        (source / "d.txt").write_text("contenido D nuevo")
+        m2 = generate_manifest.generate_manifest(source, {"tool_id": "test", "version": "1.1.0"}, base_url)
+        patch_path = generate_manifest.record_release(history, m2)
+        assert patch_path == history / "test" / "patches" / "1.0.0_to_1.1.0.json"
+        
+        patch = json.loads(patch_path.read_text(encoding="utf-8"))
+        assert [f["path"] for f in patch["added"]] == ["d.txt"]
+        assert [f["path"] for f in patch["changed"]] == ["b.txt"], "Los archivos sin cambios no se listan"
+        assert patch["removed"] == ["c.txt"]
+        full_size = len(json.dumps(m2, ensure_ascii=False, indent=2))
+        assert patch_path.stat().st_size < full_size / 2
+        
+        fixtures_v2 = Path(tmpdir) / "fixtures_v2"
+        shutil.copytree(source, fixtures_v2)
+        updater = DeltaUpdater(tool_root, downloader=MockDownloader(fixtures_v2))
+        assert updater.apply_manifest_patch(patch) == m2, "El parche debe reproducir el manifest destino"
+        
+        # Parche para otra base o manipulado: se rechaza
+        for tampered in (dict(patch, base_manifest_hash="0" * 64),
+                         dict(patch, changed=[dict(patch["changed"][0], sha256="f" * 64)])):
+            try:
+                updater.apply_manifest_patch(tampered)
+                assert False, "Un parche inválido no debe aplicarse"
+            except ValueError:
+                pass
+        
+        stats = updater.update_from_patch(patch)
+        assert not stats.errors
+        assert stats.files_downloaded == 2, f"Solo b.txt y d.txt: {stats.files_downloaded}"
+        assert updater.get_network_eligibility("1.1.0", m2["manifest_hash"]) == "ELIGIBLE"
+        assert not (tool_root / "releases" / "v1.1.0" / "c.txt").exists()
+        
+        assert version_key("1.10.0") > version_key("1.9.0"), "Orden numérico de versiones"
+        
+        print(f"[OK] Parche {patch_path.stat().st_size} bytes vs manifest {full_size} bytes")
+        print("[OK] Test Caso 15 PASADO")
+        return True
+
+
+def test_case_16_deterministic_zip():
+    """
+    Test Caso 16: ZIP determinista → mismo sha256 en cada build, store para formatos comprimidos, compresión paralela
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 16: ZIP determinista")
+    print("="*60)
+    
+    import os
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tool_dir = Path(tmpdir) / "tool"
+        (tool_dir / "src").mkdir(parents=True)
+        for i in range(40):
+            (tool_dir / "src" / f"module_{i}.py").write_text(f"VALUE = {i}\n" * 200)
+        (tool_dir / "icon.png").write_bytes(os.urandom(20000))
+        (tool_dir / "weights.gguf").write_bytes(os.urandom(300 * 1024))
+        (tool_dir / "venv").mkdir()
+        (tool_dir / "venv" / "ignored.txt").write_text("no empaquetar")
+        
+        members = pack_tools.list_members(tool_dir, tool_dir)
+        assert [rel for rel, _ in members] == sorted(rel for rel, _ in members)
+        
+        # Secuencial y paralelo: mismo ZIP byte a byte
+        digests = set()
+        for workers in (1, 4):
+            zip_path = Path(tmpdir) / f"tool_{workers}.zip"
+            pack_tools.write_zip(zip_path, members, workers=workers)
+            digests.add(pack_tools.sha256_file(zip_path))
+        assert len(digests) == 1, "El ZIP debe ser idéntico sin importar el número de hilos"
+        
+        # Un touch no cambia el ZIP (fecha fija)
+        later = time.time() + 3600
+        os.utime(tool_dir / "src" / "module_0.py", (later, later))
+        again = Path(tmpdir) / "again.zip"
+        pack_tools.write_zip(again, pack_tools.list_members(tool_dir, tool_dir), workers=2)
+        assert pack_tools.sha256_file(again) in digests
+        
+        with zipfile.ZipFile(again) as zf:
+            assert zf.testzip() is None
+            infos = {info.filename: info for info in zf.infolist()}
+            assert "venv/ignored.txt" not in infos
+            assert infos["icon.png"].compress_type == zipfile.ZIP_STORED
+            assert infos["weights.gguf"].compress_type == zipfile.ZIP_STORED
+            assert infos["src/module_1.py"].compress_type == zipfile.ZIP_DEFLATED
+            assert infos["src/module_1.py"].date_time == (1980, 1, 1, 0, 0, 0)
+            assert (infos["src/module_1.py"].external_attr >> 16) & 0o777 == 0o755
+            assert zf.read("weights.gguf") == (tool_dir / "weights.gguf").read_bytes()
+        
+        print(f"[OK] sha256 estable: {digests.pop()[:16]}...")
+        print("[OK] Test Caso 16 PASADO")
+        return True
+
+
+def test_case_17_pack_cache():
+    """
+    Test Caso 17: Caché de build de pack_tools → tool sin cambios reutiliza el asset y su sha256
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 17: Caché de build de pack_tools")
+    print("="*60)
+    
+    import os
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tool_dir = Path(tmpdir) / "tools" / "demo"
+        (tool_dir / "src").mkdir(parents=True)
+        (tool_dir / "frontend").mkdir()
+        meta = {"tool_id": "demo", "version": "1.0.0", "name": "Demo", "platforms": ["windows"]}
+        (tool_dir / "tool.json").write_text(json.dumps(meta))
+        (tool_dir / "src" / "main.py").write_text("print('demo')\n" * 500)
+        (tool_dir / "frontend" / "index.html").write_text("<html>demo</html>")
+        (tool_dir / "output").mkdir()
+        (tool_dir / "output" / "sample.dat").write_bytes(os.urandom(1024))
+        dist_dir = Path(tmpdir) / "dist"
+        dist_dir.mkdir()
+        
+        def write_manifest():
+            manifest = generate_manifest.generate_manifest(tool_dir, meta, "https://test.local/tools")
+            (tool_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+            return manifest
+        
+        def run():
+            cache = pack_tools.PackCache(dist_dir / pack_tools.PACK_CACHE_FILENAME)
+            entry = pack_tools.pack_tool(tool_dir, dist_dir, None, cache=cache)
+            cache.save()
+            return entry, cache
+        
+        manifest = write_manifest()
+        assert "manifest.json" not in {f["path"] for f in manifest["files"]}, "El manifest no se lista a sí mismo"
+        first, cache = run()
+        assert (cache.hits, cache.misses) == (0, 2)
+        asset = dist_dir / first["asset_name"]
+        assert first["sha256"] == pack_tools.sha256_file(asset)
+        
+        # Regenerar el manifest (nuevo created_at, mismo manifest_hash) → se reutiliza todo
+        mtime = asset.stat().st_mtime_ns
+        assert write_manifest()["manifest_hash"] == manifest["manifest_hash"]
+        second, cache = run()
+        assert (cache.hits, cache.misses) == (2, 0)
+        assert second["sha256"] == first["sha256"] and second["frontend_sha256"] == first["frontend_sha256"]
+        assert asset.stat().st_mtime_ns == mtime, "El asset reutilizado no se reescribe"
+        
+        # Cambio solo en el frontend → el ZIP de la tool cambia (incluye frontend/), el frontend también
+        (tool_dir / "frontend" / "index.html").write_text("<html>demo v2</html>")
+        write_manifest()
+        third, cache = run()
+        assert (cache.hits, cache.misses) == (0, 2)
+        assert third["frontend_sha256"] != first["frontend_sha256"]
+        
+        # Archivo fuera del manifest (output/) → cambia la clave de la tool; el frontend se reutiliza
+        (tool_dir / "output" / "sample.dat").write_bytes(os.urandom(2048))
+        fourth, cache = run()
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert fourth["sha256"] != third["sha256"]
+        assert fourth["sha256"] == pack_tools.sha256_file(asset)
+        
+        # Frontend editado sin regenerar el manifest → la caché no lo oculta: el build falla
+        (tool_dir / "frontend" / "index.html").write_text("<html>demo v3</html>")
+        try:
+            run()
+            assert False, "Un asset en caché no debe ocultar un manifest desactualizado"
+        except pack_tools.PackError:
+            pass
+        assert not asset.exists(), "El asset desactualizado se descarta"
+        write_manifest()
+        
+        # Asset borrado o con otras opciones de empaquetado → miss
+        cache = pack_tools.PackCache(dist_dir / pack_tools.PACK_CACHE_FILENAME)
+        fifth = pack_tools.pack_tool(tool_dir, dist_dir, None, level=9, cache=cache)
+        assert cache.misses == 2 and asset.exists()
+        assert fifth["sha256"] == pack_tools.sha256_file(asset)
+        
+        print("[OK] Assets sin cambios reutilizados con su sha256 registrado")
+        print("[OK] Test Caso 17 PASADO")
+        return True
+
+
+def test_case_18_pruned_walk_single_read():
+    """
+    Test Caso 18: Recorrido podado y lectura única → no entra en excluidos, sha256 del ZIP al escribir, manifest desactualizado falla el build
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 18: Recorrido podado y lectura única")
+    print("="*60)
+    
+    import os
+    import tree_walk
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # La tool vive bajo un directorio llamado temp/: no debe excluir nada
+        tool_dir = Path(tmpdir) / "temp" / "demo"
+        (tool_dir / "src").mkdir(parents=True)
+        meta = {"tool_id": "demo", "version": "1.0.0", "name": "Demo", "platforms": ["windows"]}
+        (tool_dir / "tool.json").write_text(json.dumps(meta))
+        (tool_dir / "src" / "main.py").write_text("print('demo')\n" * 500)
+        (tool_dir / "big.dat").write_bytes(os.urandom(300 * 1024))
+        for excluded in ("venv", "node_modules", "models"):
+            (tool_dir / excluded / "deep").mkdir(parents=True)
+            (tool_dir / excluded / "deep" / "x.txt").write_text("x")
+        
+        # Contar directorios visitados
+        visited = []
+        original_scandir = tree_walk.os.scandir
+        def counting_scandir(path):
+            visited.append(Path(path).name)
+            return original_scandir(path)
+        tree_walk.os.scandir = counting_scandir
+        try:
+            files = collect_files(tool_dir, "https://test.local/tools", "demo", "1.0.0", workers=1)
+        finally:
+            tree_walk.os.scandir = original_scandir
+        assert [f["path"] for f in files] == ["big.dat", "src/main.py", "tool.json"]
+        assert not {"venv", "node_modules", "models", "deep"} & set(visited), f"Entró en excluidos: {visited}"
+        
+        manifest = generate_manifest.generate_manifest(tool_dir, meta, "https://test.local/tools")
+        (tool_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+        
+        # write_zip: sha256 del ZIP y de cada miembro sin releer nada
+        members = pack_tools.list_members(tool_dir, tool_dir)
+        zip_path = Path(tmpdir) / "demo.zip"
+        pack_tools.READ_BLOCK, original_block = 64 * 1024, pack_tools.READ_BLOCK
+        pack_tools.PARALLEL_MEMBER_MAX, original_max = 100 * 1024, pack_tools.PARALLEL_MEMBER_MAX
+        try:
+            digest, member_hashes = pack_tools.write_zip(zip_path, members, workers=2)
+        finally:
+            pack_tools.READ_BLOCK, pack_tools.PARALLEL_MEMBER_MAX = original_block, original_max
+        assert digest == pack_tools.sha256_file(zip_path)
+        for f in manifest["files"]:
+            assert member_hashes[f["path"]] == f["sha256"], f["path"]
+        
+        # Manifest desactualizado → el asset se descarta y el build falla sin catalog.json
+        dist_dir = Path(tmpdir) / "dist"
+        dist_dir.mkdir()
+        (tool_dir / "src" / "main.py").write_text("print('changed')\n")
+        try:
+            pack_tools.pack_tool(tool_dir, dist_dir, None)
+            assert False, "Debió fallar con el manifest desactualizado"
+        except pack_tools.PackError:
+            pass
+        assert not (dist_dir / "tool_demo_1.0.0.zip").exists()
+        
+        argv = ["--tools-dir", str(tool_dir.parent), "--dist-dir", str(dist_dir), "--no-cache", "--jobs", "1"]
+        assert pack_tools.main(argv) != 0
+        assert not (dist_dir / "catalog.json").exists()
+        
+        manifest = generate_manifest.generate_manifest(tool_dir, meta, "https://test.local/tools")
+        (tool_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+        assert pack_tools.main(argv) == 0
+        catalog = json.loads((dist_dir / "catalog.json").read_text(encoding="utf-8"))
+        assert [t["tool_id"] for t in catalog["tools"]] == ["demo"]
+        
+        print(f"[OK] Directorios visitados: {sorted(visited)}")
+        print("[OK] Test Caso 18 PASADO")
+        return True
+
+
+class BlockingCleanupUpdater(DeltaUpdater):
+    """DeltaUpdater cuyo borrado en segundo plano espera a una señal del test."""
+    
+    release = threading.Event()
+    
+    def _purge(self, paths):
+        self.release.wait(10)
+        super()._purge(paths)
+
+
+def test_case_19_release_retention_rollback():
+    """
+    Test Caso 19: Retención de releases → rollback sin descargas, borrado en segundo plano
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 19: Retención de releases y rollback")
+    print("="*60)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tool_root = Path(tmpdir) / "test_tool"
+        tool_root.mkdir()
+        fixtures_dir = Path(tmpdir) / "fixtures"
+        fixtures_dir.mkdir()
+        
+        manifests = {}
+        for version in ("1.0.0", "1.1.0", "1.2.0"):
+            entry = create_test_file(fixtures_dir / f"app_{version}.txt", f"app {version}")
+            manifests[version] = create_test_manifest("test", version, [entry])
+        
+        updater = BlockingCleanupUpdater(tool_root, downloader=MockDownloader(fixtures_dir), keep_releases=2)
+        for version in ("1.0.0", "1.1.0"):
+            updater.update_from_zip(Path(tmpdir) / "unused.zip", manifests[version])
+        assert updater.list_releases() == ["v1.0.0", "v1.1.0"]
+        
+        # v1.2.0 retira v1.0.0: la actualización retorna antes de que termine el borrado
+        BlockingCleanupUpdater.release.clear()
+        updater.update_from_zip(Path(tmpdir) / "unused.zip", manifests["1.2.0"])
+        assert updater.list_releases() == ["v1.1.0", "v1.2.0"]
+        assert not (tool_root / "releases" / ".staging").exists()
+        assert any(updater.trash_dir.iterdir()), "El borrado debe seguir pendiente en segundo plano"
+        assert not updater.wait_cleanup(timeout=0.05)
+        BlockingCleanupUpdater.release.set()
+        assert updater.wait_cleanup(timeout=10)
+        assert not any(updater.trash_dir.iterdir())
+        
+        # Rollback: solo reescribe current.txt (sin fixtures, descargar fallaría)
+        updater.downloader = MockDownloader(Path(tmpdir) / "empty")
+        assert updater.rollback() == "v1.1.0"
+        assert (tool_root / "current.txt").read_text() == "v1.1.0"
+        assert not (tool_root / "current.txt.tmp").exists()
+        assert updater.get_current_manifest()["manifest_hash"] == manifests["1.1.0"]["manifest_hash"]
+        assert updater.get_network_eligibility("1.2.0", manifests["1.2.0"]["manifest_hash"]) == "OUTDATED"
+        
+        # Sin release anterior conservada → error; activate() vuelve a la más nueva
+        try:
+            updater.rollback()
+            assert False, "No hay release anterior a v1.1.0"
+        except RuntimeError:
+            pass
+        try:
+            updater.activate("1.0.0")
+            assert False, "v1.0.0 ya no está instalada"
+        except ValueError:
+            pass
+        assert updater.activate("1.2.0") == "v1.2.0"
+        assert updater.get_network_eligibility("1.2.0", manifests["1.2.0"]["manifest_hash"]) == "ELIGIBLE"
+        
+        print("[OK] Test Caso 19 PASADO")
+        return True
+
+
+class GatedDownloader(MockDownloader):
+    """MockDownloader que retiene ciertos archivos hasta que el test abre la compuerta."""
+    
+    def __init__(self, fixtures_dir: Path, gated: set):
+        super().__init__(fixtures_dir)
+        self.gated = set(gated)
+        self.gate = threading.Event()
+    
+    def download(self, url, target_path, expected_sha256=None, resume=True, progress_callback=None):
+        if url.split('/')[-1] in self.gated:
+            self.gate.wait(10)
+        return super().download(url, target_path, expected_sha256, resume, progress_callback)
+
+
+def test_case_20_progressive_install():
+    """
+    Test Caso 20: Instalación progresiva → activa con los archivos calientes, fríos en segundo plano
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 20: Instalación progresiva")
+    print("="*60)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Lado build: sin cold_globs todo es caliente; con ellos docs/benchmarks fríos, entrypoint siempre caliente
+        source = Path(tmpdir) / "source"
+        (source / "runner").mkdir(parents=True)
+        (source / "runner" / "run.ps1").write_text("python src/main.py")
+        (source / "README.md").write_text("# demo")
+        (source / "bench_result.txt").write_text("42 it/s")
+        meta = {"tool_id": "demo", "version": "1.0.0", "entrypoint_windows": "runner/run.ps1"}
+        built = {f["path"]: f for f in generate_manifest.generate_manifest(source, meta, "https://test.local/tools")["files"]}
+        assert not any("hot" in f for f in built.values()), "Sin cold_globs la tool no cambia de comportamiento"
+        meta["cold_globs"] = ["*.md", "bench_*", "runner/*"]
+        built = {f["path"]: f for f in generate_manifest.generate_manifest(source, meta, "https://test.local/tools")["files"]}
+        assert built["README.md"]["hot"] is False and built["bench_result.txt"]["hot"] is False
+        assert "hot" not in built["runner/run.ps1"], "El entrypoint nunca es frío"
+        
+        # Lado updater
+        tool_root = Path(tmpdir) / "test_tool"
+        tool_root.mkdir()
+        fixtures_dir = Path(tmpdir) / "fixtures"
+        fixtures_dir.mkdir()
+        main = create_test_file(fixtures_dir / "main.py", "print('hola')")
+        bench = create_test_file(fixtures_dir / "benchmark_log.txt", "log " * 1000)
+        bench["hot"] = False
+        manifest = create_test_manifest("test", "1.0.0", [main, bench])
+        
+        downloader = GatedDownloader(fixtures_dir, gated={"benchmark_log.txt"})
+        updater = DeltaUpdater(tool_root, downloader=downloader, progressive=True)
+        stats = updater.update_from_zip(None, manifest)
+        
+        # Activada con el conjunto caliente; el frío sigue pendiente
+        release = tool_root / "releases" / "v1.0.0"
+        assert (tool_root / "current.txt").read_text() == "v1.0.0"
+        assert stats.files_deferred == 1 and stats.files_verified == 1
+        assert (release / "main.py").exists() and not (release / "benchmark_log.txt").exists()
+        assert updater.pending_files() == ["benchmark_log.txt"]
+        assert updater.get_network_eligibility("1.0.0", manifest["manifest_hash"]) == "OUTDATED"
+        
+        downloader.gate.set()
+        assert updater.wait_pending(timeout=10)
+        assert updater.pending_stats.files_downloaded == 1 and updater.pending_stats.files_verified == 1
+        assert (release / "benchmark_log.txt").read_text() == "log " * 1000
+        assert updater.pending_files() == [] and not (tool_root / "pending.json").exists()
+        assert updater.get_network_eligibility("1.0.0", manifest["manifest_hash"]) == "ELIGIBLE"
+        
+        # Sin progressive: todo en el camino crítico (comportamiento clásico)
+        manifest_v2 = create_test_manifest("test", "1.1.0", [main, bench])
+        stats = DeltaUpdater(tool_root, downloader=MockDownloader(fixtures_dir)).update_from_zip(None, manifest_v2)
+        assert stats.files_deferred == 0 and stats.files_verified == 2
+        assert DeltaUpdater(tool_root).get_network_eligibility("1.1.0", manifest_v2["manifest_hash"]) == "ELIGIBLE"
+        
+        print("[OK] Test Caso 20 PASADO")
+        return True
+
+
+class RequestLogDownloader(MockDownloader):
+    """MockDownloader que registra cada petición (nombre de archivo de la URL)."""
+    
+    def __init__(self, fixtures_dir: Path):
+        super().__init__(fixtures_dir)
+        self.requests = []
+    
+    def download(self, url, target_path, expected_sha256=None, resume=True, progress_callback=None):
+        self.requests.append(url.split('/')[-1])
+        return super().download(url, target_path, expected_sha256, resume, progress_callback)
+
+
+def test_case_21_small_file_packs():
+    """
+    Test Caso 21: Packs de archivos pequeños → pocas peticiones, miembros verificados, fallback individual
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 21: Packs de archivos pequeños")
+    print("="*60)
+    
+    import os
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = Path(tmpdir) / "source"
+        for i in range(120):
+            path = source / "frontend" / f"dir{i // 40}" / f"mod{i}.js"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"export const v{i} = {i};\n" * 20)
+        (source / "engine.dat").write_bytes(os.urandom(200 * 1024))
+        packs_dir = Path(tmpdir) / "files"
+        meta = {"tool_id": "demo", "version": "1.0.0"}
+        
+        def build(version):
+            # Packs de 16 KB para que 120 archivos pequeños formen varios
+            meta["version"] = version
+            original_target, generate_manifest.DEFAULT_PACK_TARGET = generate_manifest.DEFAULT_PACK_TARGET, 16 * 1024
+            try:
+                return generate_manifest.generate_manifest(
+                    source, meta, "https://test.local/tools", pack_max_file=16 * 1024, packs_dir=packs_dir
+                )
+            finally:
+                generate_manifest.DEFAULT_PACK_TARGET = original_target
+        
+        def publish(manifest):
+            # Fixtures por nombre de URL: archivos individuales y packs
+            fixtures = Path(tmpdir) / f"fixtures_{manifest['tool_version']}"
+            fixtures.mkdir()
+            for f in manifest["files"]:
+                shutil.copy2(source / f["path"], fixtures / f["url"].split('/')[-1])
+            for pack in manifest.get("packs", []):
+                shutil.copy2(packs_dir / "demo" / "packs" / pack["url"].split('/')[-1], fixtures)
+            return fixtures
+        
+        m1 = build("1.0.0")
+        packs = m1["packs"]
+        assert sum(len(p["files"]) for p in packs) == 120 and len(packs) < 10
+        assert len(packs) > 2 and all(p["size"] <= 16 * 1024 for p in packs)
+        assert build("1.0.0")["manifest_hash"] == m1["manifest_hash"], "Packs deterministas"
+        
+        tool_root = Path(tmpdir) / "tool"
+        downloader = RequestLogDownloader(publish(m1))
+        stats = DeltaUpdater(tool_root, downloader=downloader).update_from_zip(None, m1)
+        assert stats.packs_downloaded == len(packs) and stats.files_unpacked == 120
+        assert stats.files_downloaded == 121 and stats.files_verified == 121
+        assert len(downloader.requests) == len(packs) + 1, downloader.requests
+        assert not (tool_root / "releases" / "v1.0.0" / ".packs").exists()
+        
+        # v1.1.0: dos archivos del mismo pack → un pack; uno aislado → su URL individual
+        (source / "frontend" / "dir0" / "mod1.js").write_text("export const v1 = 'nuevo';\n")
+        (source / "frontend" / "dir0" / "mod2.js").write_text("export const v2 = 'nuevo';\n")
+        (source / "frontend" / "dir2" / "mod99.js").write_text("export const v99 = 'nuevo';\n")
+        m2 = build("1.1.0")
+        downloader = RequestLogDownloader(publish(m2))
+        stats = DeltaUpdater(tool_root, downloader=downloader).update_from_zip(None, m2)
+        assert stats.files_downloaded == 3 and stats.files_unpacked == 2 and stats.packs_downloaded == 1
+        assert sorted(downloader.requests)[-1] == "mod99.js" and len(downloader.requests) == 2
+        assert (tool_root / "releases" / "v1.1.0" / "frontend" / "dir0" / "mod1.js").read_text() == "export const v1 = 'nuevo';\n"
+        
+        # Pack corrupto → sus archivos se descargan uno a uno
+        (source / "frontend" / "dir1" / "mod40.js").write_text("export const v40 = 'otro';\n")
+        (source / "frontend" / "dir1" / "mod41.js").write_text("export const v41 = 'otro';\n")
+        m3 = build("1.2.0")
+        fixtures = publish(m3)
+        changed_pack = next(p for p in m3["packs"] if any(f["path"] == "frontend/dir1/mod40.js" for f in p["files"]))
+        (fixtures / changed_pack["url"].split('/')[-1]).write_bytes(b"corrupto")
+        downloader = RequestLogDownloader(fixtures)
+        stats = DeltaUpdater(tool_root, downloader=downloader).update_from_zip(None, m3)
+        assert stats.packs_downloaded == 0 and stats.files_downloaded == 2 and not stats.errors
+        assert (tool_root / "current.txt").read_text() == "v1.2.0"
+        
+        print(f"[OK] 121 archivos en {len(packs) + 1} peticiones")
+        print("[OK] Test Caso 21 PASADO")
+        return True
+
+
+def test_case_22_delta_archives():
+    """
+    Test Caso 22: Archivos delta entre versiones → solo archivos cambiados, el más pequeño aplicable, base verificada
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 22: Archivos delta entre versiones")
+    print("="*60)
+    
+    import os
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tool_dir = Path(tmpdir) / "tools" / "demo"
+        (tool_dir / "src").mkdir(parents=True)
+        (tool_dir / "engine.dat").write_bytes(os.urandom(256 * 1024))
+        (tool_dir / "src" / "main.py").write_text("print('v1')\n")
+        (tool_dir / "src" / "util.py").write_text("X = 1\n")
+        dist_dir = Path(tmpdir) / "dist"
+        dist_dir.mkdir()
+        history_dir = dist_dir / "history"
+        
+        def release(version):
+            meta = {"tool_id": "demo", "version": version, "name": "Demo", "platforms": ["windows"]}
+            meta_path = tool_dir / "tool.json"
+            if not meta_path.exists() or json.loads(meta_path.read_text()) != meta:
+                meta_path.write_text(json.dumps(meta))
+            manifest = generate_manifest.generate_manifest(tool_dir, meta, "https://test.local/tools")
+            (tool_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+            generate_manifest.record_release(history_dir, manifest)
+            cache = pack_tools.PackCache(dist_dir / pack_tools.PACK_CACHE_FILENAME)
+            entry = pack_tools.pack_tool(tool_dir, dist_dir, None, cache=cache, history_dir=history_dir, delta_count=3)
+            cache.save()
+            return manifest, entry, cache
+        
+        m1, e1, _ = release("1.0.0")
+        assert "deltas" not in e1, "Sin versiones anteriores no hay deltas"
+        
+        tool_root = Path(tmpdir) / "tool"
+        updater = DeltaUpdater(tool_root, downloader=MockDownloader(Path(tmpdir) / "none"))
+        stats = updater.update_from_zip(dist_dir / e1["asset_name"], m1, use_urls=False)
+        assert stats.files_downloaded == len(m1["files"]) and not stats.errors
+        
+        (tool_dir / "src" / "main.py").write_text("print('v2')\n")
+        (tool_dir / "src" / "new.py").write_text("Y = 2\n")
+        m2, e2, _ = release("1.1.0")
+        (delta,) = e2["deltas"]
+        assert delta["from_version"] == "1.0.0" and delta["base_manifest_hash"] == m1["manifest_hash"]
+        with zipfile.ZipFile(dist_dir / delta["asset_name"]) as zf:
+            names = sorted(zf.namelist())
+        assert names == ["delta.json", "manifest.json", "src/main.py", "src/new.py", "tool.json"], names
+        assert delta["size"] < e2["size"] // 10
+        
+        (tool_dir / "src" / "util.py").write_text("X = 3\n")
+        m3, e3, cache = release("1.2.0")
+        assert [d["from_version"] for d in e3["deltas"]] == ["1.1.0", "1.0.0"]
+        
+        # Mismo contenido → los deltas salen de la caché con el mismo sha256
+        _, again, cache = release("1.2.0")
+        assert cache.misses == 0 and [d["sha256"] for d in again["deltas"]] == [d["sha256"] for d in e3["deltas"]]
+        
+        # Instalada 1.0.0: solo sirve el delta con base 1.0.0, aunque exista uno más pequeño
+        chosen = updater.select_delta(e3["deltas"], e3["size"])
+        assert chosen["from_version"] == "1.0.0"
+        assert updater.select_delta(e3["deltas"], chosen["size"]) is None, "Un delta mayor que el ZIP no sirve"
+        stats = updater.update_from_delta(dist_dir / chosen["asset_name"])
+        assert stats.files_downloaded == 4 and stats.files_verified == len(m3["files"]) and not stats.errors
+        assert (tool_root / "current.txt").read_text() == "v1.2.0"
+        assert (tool_root / "releases" / "v1.2.0" / "src" / "util.py").read_text() == "X = 3\n"
+        assert updater.get_network_eligibility("1.2.0", m3["manifest_hash"]) == "ELIGIBLE"
+        
+        # Base distinta de la instalada → rechazado sin tocar la release activa
+        assert updater.select_delta(e3["deltas"]) is None
+        try:
+            updater.update_from_delta(dist_dir / e3["deltas"][0]["asset_name"])
+            assert False, "Debió rechazar un delta de otra base"
+        except ValueError:
+            pass
+        try:
+            updater.update_from_delta(dist_dir / e3["asset_name"])
+            assert False, "Debió rechazar un ZIP completo"
+        except ValueError:
+            pass
+        assert (tool_root / "current.txt").read_text() == "v1.2.0"
+        
+        print(f"[OK] Delta 1.0.0 -> 1.2.0: {chosen['size']} bytes (ZIP completo {e3['size']})")
+        print("[OK] Test Caso 22 PASADO")
+        return True
+
+
+def test_case_23_manifest_v2_hash_alg():
+    """
+    Test Caso 23: Manifest v2 con hash_alg → árbol SHA-256 en paralelo, v1 → v2 sin re-descargar, corrupción detectada
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 23: Manifest v2 con hash_alg")
+    print("="*60)
+    
+    import os
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Árbol: paralelo, secuencial e incremental dan el mismo digest (3 bloques, el último parcial)
+        big = Path(tmpdir) / "big.dat"
+        data = os.urandom(2 * file_hashing.TREE_CHUNK_SIZE + 12345)
+        big.write_bytes(data)
+        tree = file_hashing.hash_file(big, file_hashing.SHA256_TREE, threads=4)
+        assert tree == file_hashing.hash_file(big, file_hashing.SHA256_TREE, threads=1)
+        assert tree == file_hashing.hash_bytes(data, file_hashing.SHA256_TREE)
+        assert tree.startswith("sha256-tree-") and file_hashing.parse_digest(tree)[1] != hashlib.sha256(data).hexdigest()
+        assert file_hashing.hash_file(big) == hashlib.sha256(data).hexdigest(), "sha256 sigue siendo el hex de v1"
+        
+        source = Path(tmpdir) / "source"
+        (source / "src").mkdir(parents=True)
+        shutil.copy2(big, source / "engine.dat")
+        (source / "src" / "main.py").write_text("print('v1')\n")
+        (source / "run.ps1").write_text("python src/main.py\n")
+        
+        def build(version, alg):
+            meta = {"tool_id": "demo", "version": version}
+            return generate_manifest.generate_manifest(source, meta, "https://test.local/tools", hash_alg=alg)
+        
+        def publish(manifest):
+            fixtures = Path(tmpdir) / f"fixtures_{manifest['tool_version']}"
+            fixtures.mkdir()
+            for f in manifest["files"]:
+                shutil.copy2(source / f["path"], fixtures / f["url"].split('/')[-1])
+            return fixtures
+        
+        m1 = build("1.0.0", file_hashing.SHA256)
+        assert m1["manifest_version"] == "1.0" and all("sha256" in f and "hash_alg" not in f for f in m1["files"])
+        m2 = build("1.1.0", file_hashing.SHA256_TREE)
+        assert m2["manifest_version"] == "2.0"
+        assert all(f["hash_alg"] == "sha256-tree" and "sha256" not in f for f in m2["files"])
+        assert next(f for f in m2["files"] if f["path"] == "engine.dat")["hash"] == file_hashing.parse_digest(tree)[1]
+        
+        tool_root = Path(tmpdir) / "tool"
+        stats = DeltaUpdater(tool_root, downloader=MockDownloader(publish(m1))).update_from_zip(None, m1)
+        assert stats.files_downloaded == 3 and not stats.errors
+        
+        # v1 → v2 con el mismo contenido: los archivos instalados se re-hashean, no se descargan
+        updater = DeltaUpdater(tool_root, downloader=MockDownloader(publish(m2)), hash_threads=4)
+        stats = updater.update_from_zip(None, m2)
+        assert stats.files_downloaded == 0 and stats.files_skipped == 3 and stats.files_verified == 3
+        assert updater.get_network_eligibility("1.1.0", m2["manifest_hash"]) == "ELIGIBLE"
+        
+        # Un archivo cambia → solo ese se descarga, verificado con su hash_alg
+        (source / "src" / "main.py").write_text("print('v2')\n")
+        m3 = build("1.2.0", file_hashing.SHA256_TREE)
+        stats = DeltaUpdater(tool_root, downloader=MockDownloader(publish(m3))).update_from_zip(None, m3)
+        assert stats.files_downloaded == 1 and stats.files_verified == 3 and not stats.errors
+        
+        # Contenido publicado que no coincide con el hash v2 → no se activa
+        (source / "src" / "main.py").write_text("print('v3')\n")
+        m4 = build("1.3.0", file_hashing.SHA256_TREE)
+        fixtures = publish(m4)
+        (fixtures / "main.py").write_text("print('manipulado')\n")
+        try:
+            DeltaUpdater(tool_root, downloader=MockDownloader(fixtures)).update_from_zip(None, m4)
+            assert False, "Debió fallar la verificación del archivo manipulado"
+        except RuntimeError:
+            pass
+        assert DeltaUpdater(tool_root).get_current_version() == "v1.2.0"
+        
+        # Algoritmo sin soporte en el worker → se rechaza antes de tocar staging
+        m5 = json.loads(json.dumps(m3))
+        m5["tool_version"] = "1.4.0"
+        m5["files"][0]["hash_alg"] = "unknown-alg"
+        try:
+            DeltaUpdater(tool_root, downloader=MockDownloader(fixtures)).update_from_zip(None, m5)
+            assert False, "Debió rechazar un hash_alg desconocido"
+        except RuntimeError:
+            pass
+        assert not (tool_root / "releases" / ".staging" / "v1.4.0").exists()
+        
+        print("[OK] sha256-tree paralelo = secuencial; migración v1 -> v2 sin descargas")
+        print("[OK] Test Caso 23 PASADO")
+        return True
+
+
 def run_all_tests():
     """Ejecuta todos los tests de delta update."""
     print("\n" + "="*60)
@@ -314,6 +1753,25 @@ def run_all_tests():
         ("Caso 2: 1 archivo cambiado", test_case_2_one_file_changed),
         ("Caso 3: 1 archivo eliminado", test_case_3_one_file_deleted),
         ("Caso 4: Hash mismatch", test_case_4_hash_mismatch),
+        ("Caso 5: Descarga concurrente", test_case_5_parallel_downloads),
+        ("Caso 6: Reutilización por links", test_case_6_link_unchanged_files),
+        ("Caso 7: Caché de hashes", test_case_7_hash_cache),
+        ("Caso 8: Almacén de objetos", test_case_8_object_store),
+        ("Caso 9: Delta por chunks", test_case_9_chunk_delta),
+        ("Caso 10: Extracción ZIP verificada", test_case_10_zip_streaming_extract),
+        ("Caso 11: Reanudación de staging", test_case_11_resume_interrupted_update),
+        ("Caso 12: Transporte comprimido", test_case_12_compressed_transport),
+        ("Caso 13: Caché de hashes de build", test_case_13_build_hash_cache),
+        ("Caso 14: Hashing en paralelo", test_case_14_parallel_hashing),
+        ("Caso 15: Parche de manifest", test_case_15_manifest_patch),
+        ("Caso 16: ZIP determinista", test_case_16_deterministic_zip),
+        ("Caso 17: Caché de build de pack_tools", test_case_17_pack_cache),
+        ("Caso 18: Recorrido podado y lectura única", test_case_18_pruned_walk_single_read),
+        ("Caso 19: Retención de releases y rollback", test_case_19_release_retention_rollback),
+        ("Caso 20: Instalación progresiva", test_case_20_progressive_install),
+        ("Caso 21: Packs de archivos pequeños", test_case_21_small_file_packs),
+        ("Caso 22: Archivos delta entre versiones", test_case_22_delta_archives),
+        ("Caso 23: Manifest v2 con hash_alg", test_case_23_manifest_v2_hash_alg),
     ]
     
     passed = 0
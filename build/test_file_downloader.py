@@ -0,0 +1,588 @@
+"""
+Tests de los downloaders contra un servidor HTTP local (sin red externa).
+
+Casos de prueba:
+1. AsyncHTTPDownloader → muchas descargas concurrentes reutilizando conexiones
+2. AsyncHTTPDownloader → resume por Range y rechazo por hash mismatch
+3. AsyncHTTPDownloader inyectado en DeltaUpdater
+4. HTTPDownloader segmentado → rangos paralelos, reanudación por segmento
+5. HTTPDownloader segmentado → fallback a un stream sin 206
+6. Limitador global → tasa compartida entre instancias y presupuesto de background
+7. Caché LAN → pares en procesos separados sirven blobs por sha256, fallback a la url,
+   tráfico LAN fuera del limitador global, bytes reanudados y allow-list de clientes
+8. ZIP remoto → solo directorio central y miembros necesarios por Range, fallback sin Range
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from bandwidth_limiter import BACKGROUND, FOREGROUND, BandwidthLimiter, get_limiter
+from delta_updater import DeltaUpdater
+import file_downloader
+from file_downloader import AsyncHTTPDownloader, HTTPDownloader, segment_state_path
+from local_http_server import LocalHTTPServer
+from peer_cache import PeerBlobServer, PeerDownloader
+from remote_zip import RemoteZip
+from worker_updater_example import PCWorker
+
+
+def write_fixture(directory: Path, name: str, data: bytes) -> str:
+    """Escribe un archivo servible y retorna su sha256."""
+    path = directory / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_case_1_async_connection_reuse():
+    """
+    Test Caso 1: AsyncHTTPDownloader → muchas descargas concurrentes reutilizando conexiones
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 1: Descargas concurrentes con keep-alive")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        served = Path(tmpdir) / "served"
+        out = Path(tmpdir) / "out"
+        hashes = {f"f{i}.js": write_fixture(served, f"f{i}.js", f"export const v = {i};\n".encode() * 50)
+                  for i in range(40)}
+
+        with LocalHTTPServer(served) as server, AsyncHTTPDownloader(max_connections_per_host=4) as downloader:
+            def fetch(name: str) -> bool:
+                return downloader.download(server.url_for(name), out / name, expected_sha256=hashes[name])
+
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(fetch, hashes))
+
+            assert all(results), "Todas las descargas deben completarse"
+            assert len(server.requests) == 40
+            assert server.connections <= 4, f"Esperado <= 4 conexiones, abiertas {server.connections}"
+            assert downloader.connections_opened == server.connections
+
+        for name, sha in hashes.items():
+            assert hashlib.sha256((out / name).read_bytes()).hexdigest() == sha
+
+        print("[OK] Test Caso 1 PASADO")
+        print(f"  40 archivos sobre {server.connections} conexiones")
+        return True
+
+
+def test_case_2_async_resume_and_mismatch():
+    """
+    Test Caso 2: AsyncHTTPDownloader → resume por Range y rechazo por hash mismatch
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 2: Resume por Range y hash mismatch")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        served = Path(tmpdir) / "served"
+        data = bytes(range(256)) * 4096  # 1 MB
+        sha = write_fixture(served, "model.bin", data)
+
+        target = Path(tmpdir) / "out" / "model.bin"
+        target.parent.mkdir(parents=True)
+        target.write_bytes(data[:300000])  # Descarga parcial previa
+
+        with LocalHTTPServer(served) as server, AsyncHTTPDownloader() as downloader:
+            assert downloader.download(server.url_for("model.bin"), target, expected_sha256=sha)
+            assert target.read_bytes() == data
+            assert server.requests[-1][1] == "bytes=300000-", "Debe reanudar con Range"
+
+            assert downloader.fetch_range(server.url_for("model.bin"), 1000, 24) == data[1000:1024]
+
+            bad_target = Path(tmpdir) / "out" / "bad.bin"
+            assert not downloader.download(server.url_for("model.bin"), bad_target, expected_sha256="0" * 64)
+            assert not bad_target.exists(), "Archivo corrupto debe eliminarse"
+
+            assert not downloader.download(server.url_for("missing.bin"), Path(tmpdir) / "out" / "missing.bin")
+
+        # Server sin Range: reinicia desde cero
+        target.write_bytes(data[:1000])
+        with LocalHTTPServer(served, support_ranges=False) as server, AsyncHTTPDownloader() as downloader:
+            assert downloader.download(server.url_for("model.bin"), target, expected_sha256=sha)
+            assert target.read_bytes() == data
+
+        print("[OK] Test Caso 2 PASADO")
+        return True
+
+
+def test_case_3_async_downloader_in_updater():
+    """
+    Test Caso 3: AsyncHTTPDownloader inyectado en DeltaUpdater
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 3: DeltaUpdater con AsyncHTTPDownloader")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        served = Path(tmpdir) / "served"
+        tool_root = Path(tmpdir) / "tool"
+
+        with LocalHTTPServer(served) as server, AsyncHTTPDownloader() as downloader:
+            files = []
+            for i in range(25):
+                path = f"frontend/part{i}.css"
+                content = f".c{i} {{ color: red; }}\n".encode() * 20
+                files.append({
+                    "path": path,
+                    "sha256": write_fixture(served, path, content),
+                    "size": len(content),
+                    "url": server.url_for(path)
+                })
+            manifest = {
+                "manifest_version": "1.0",
+                "tool_id": "test",
+                "tool_version": "1.0.0",
+                "files": files,
+                "manifest_hash": "0" * 64
+            }
+
+            stats = DeltaUpdater(tool_root, downloader=downloader).update_from_zip(Path(tmpdir) / "unused.zip", manifest)
+            assert stats.files_downloaded == 25
+            assert stats.files_verified == 25
+            assert server.connections <= 8
+
+        assert json.loads((tool_root / "releases" / "v1.0.0" / "manifest.json").read_text())["tool_version"] == "1.0.0"
+
+        print("[OK] Test Caso 3 PASADO")
+        return True
+
+
+def requested_bytes(requests) -> int:
+    """Bytes pedidos por Range (bytes=a-b) en una lista de peticiones."""
+    total = 0
+    for _, range_header in requests:
+        start, end = range_header[len("bytes="):].split("-")
+        total += int(end) - int(start) + 1
+    return total
+
+
+def test_case_4_segmented_download_and_resume():
+    """
+    Test Caso 4: HTTPDownloader segmentado → rangos paralelos, reanudación por segmento
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 4: Descarga segmentada y reanudación")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        served = Path(tmpdir) / "served"
+        data = os.urandom(3 * 1024 * 1024)
+        sha = write_fixture(served, "weights.bin", data)
+        target = Path(tmpdir) / "out" / "weights.bin"
+        downloader = HTTPDownloader(chunk_size=64 * 1024, segments=4, segment_threshold=1024 * 1024)
+
+        with LocalHTTPServer(served) as server:
+            # Primer intento: se interrumpe tras ~1 MB
+            def interrupt(downloaded: int, total: int):
+                if downloaded >= 1024 * 1024:
+                    raise OSError("corte simulado")
+
+            assert not downloader.download(server.url_for("weights.bin"), target, expected_sha256=sha,
+                                           progress_callback=interrupt)
+            state = json.loads(segment_state_path(target).read_text())
+            assert len(state["segments"]) == 4
+            done = sum(seg["done"] for seg in state["segments"])
+            assert 0 < done < len(data)
+            assert target.stat().st_size == len(data), "El archivo debe estar preasignado"
+            ranged = [r for r in server.requests if r[1]]
+            assert len(ranged) == 4, f"Esperados 4 rangos, hubo {len(ranged)}"
+
+            # Segundo intento: solo se piden los bytes que faltan; el estado no se
+            # reescribe en cada chunk (~30 chunks de 64 KB)
+            saves = []
+            real_replace = file_downloader.os.replace
+            
+            def counting_replace(src, dst):
+                if str(dst).endswith(file_downloader.SEGMENT_STATE_SUFFIX):
+                    saves.append(dst)
+                return real_replace(src, dst)
+            
+            before = len(server.requests)
+            file_downloader.os.replace = counting_replace
+            try:
+                assert downloader.download(server.url_for("weights.bin"), target, expected_sha256=sha)
+            finally:
+                file_downloader.os.replace = real_replace
+            assert target.read_bytes() == data
+            assert not segment_state_path(target).exists()
+            assert requested_bytes(server.requests[before:]) == len(data) - done
+            assert len(saves) <= 3, f"Estado guardado {len(saves)} veces"
+
+            # Hash incorrecto: archivo y estado eliminados
+            bad = Path(tmpdir) / "out" / "bad.bin"
+            assert not downloader.download(server.url_for("weights.bin"), bad, expected_sha256="0" * 64)
+            assert not bad.exists() and not segment_state_path(bad).exists()
+
+        print("[OK] Test Caso 4 PASADO")
+        print(f"  Reanudado: {len(data) - done} de {len(data)} bytes")
+        return True
+
+
+def test_case_5_segmented_fallback_without_ranges():
+    """
+    Test Caso 5: HTTPDownloader segmentado → fallback a un stream sin 206
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 5: Fallback a un stream sin soporte de Range")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        served = Path(tmpdir) / "served"
+        data = os.urandom(2 * 1024 * 1024)
+        sha = write_fixture(served, "weights.bin", data)
+        target = Path(tmpdir) / "out" / "weights.bin"
+        downloader = HTTPDownloader(chunk_size=64 * 1024, segments=4, segment_threshold=1024 * 1024)
+
+        with LocalHTTPServer(served, support_ranges=False) as server:
+            assert downloader.download(server.url_for("weights.bin"), target, expected_sha256=sha)
+            assert target.read_bytes() == data
+            assert server.requests == [("/weights.bin", None)], "Sin Accept-Ranges: un solo stream"
+
+            # Estado segmentado previo contra un server que responde 200: descartar y un stream
+            target.write_bytes(b"\0" * len(data))
+            segment_state_path(target).write_text(json.dumps({
+                "size": len(data),
+                "sha256": sha,
+                "segments": [{"start": 0, "end": len(data) - 1, "done": 4096}]
+            }))
+            assert downloader.download(server.url_for("weights.bin"), target, expected_sha256=sha)
+            assert target.read_bytes() == data
+            assert not segment_state_path(target).exists()
+
+        print("[OK] Test Caso 5 PASADO")
+        return True
+
+
+def test_case_6_bandwidth_limiter():
+    """
+    Test Caso 6: Limitador global → tasa compartida entre instancias y presupuesto de background
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 6: Limitador de ancho de banda")
+    print("="*60)
+
+    mb = 1024 * 1024
+    with tempfile.TemporaryDirectory() as tmpdir:
+        served = Path(tmpdir) / "served"
+        out = Path(tmpdir) / "out"
+        data = os.urandom(mb)
+        sha = write_fixture(served, "a.bin", data)
+        write_fixture(served, "b.bin", data)
+
+        with LocalHTTPServer(served) as server:
+            # Tasa total compartida: un downloader segmentado + uno async a la vez
+            limiter = BandwidthLimiter(rate=2 * mb)
+            segmented = HTTPDownloader(chunk_size=64 * 1024, segments=4, segment_threshold=512 * 1024, limiter=limiter)
+            async_downloader = AsyncHTTPDownloader(limiter=limiter)
+            start = time.monotonic()
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = [
+                    pool.submit(segmented.download, server.url_for("a.bin"), out / "a.bin", sha),
+                    pool.submit(async_downloader.download, server.url_for("b.bin"), out / "b.bin", sha),
+                ]
+                assert all(f.result() for f in futures)
+            shared_elapsed = time.monotonic() - start
+            async_downloader.close()
+            # 2 MB a 2 MB/s con ráfaga inicial de 0.5 MB: >= 0.75 s
+            assert shared_elapsed >= 0.6, f"Tasa total no respetada ({shared_elapsed:.2f}s)"
+            assert any(r[1] for r in server.requests), "La descarga segmentada debe usar rangos"
+
+            # Presupuesto de background: solo frena a las descargas en background
+            limiter = BandwidthLimiter(background_rate=mb)
+            downloader = HTTPDownloader(chunk_size=64 * 1024, limiter=limiter)
+
+            start = time.monotonic()
+            assert downloader.download(server.url_for("a.bin"), out / "fg.bin", sha, resume=False)
+            foreground_elapsed = time.monotonic() - start
+
+            downloader.priority = BACKGROUND
+            start = time.monotonic()
+            assert downloader.download(server.url_for("a.bin"), out / "bg.bin", sha, resume=False)
+            background_elapsed = time.monotonic() - start
+
+            assert background_elapsed >= 0.6, f"Presupuesto de background no respetado ({background_elapsed:.2f}s)"
+            assert foreground_elapsed < background_elapsed / 2
+            assert limiter.bytes_by_priority == {FOREGROUND: mb, BACKGROUND: mb}
+
+        # PCWorker: las actualizaciones con trabajos en curso van en background
+        worker = PCWorker(Path(tmpdir) / "tools")
+        updater = worker.get_updater("tool-a")
+        assert updater.downloader.limiter is get_limiter()
+        assert updater.downloader.priority == FOREGROUND
+        worker.set_jobs_running(True)
+        assert updater.downloader.priority == BACKGROUND
+        assert worker.get_updater("tool-b").downloader.priority == BACKGROUND
+
+        print("[OK] Test Caso 6 PASADO")
+        print(f"  Compartido: {shared_elapsed:.2f}s, foreground: {foreground_elapsed:.2f}s, "
+              f"background: {background_elapsed:.2f}s")
+        return True
+
+
+def start_peer_process(tools_base: Path) -> tuple:
+    """Levanta peer_cache.py en otro proceso. Retorna (proceso, url base)."""
+    process = subprocess.Popen(
+        [sys.executable, str(Path(__file__).parent / "peer_cache.py"), str(tools_base),
+         "--host", "127.0.0.1", "--port", "0"],
+        stdout=subprocess.PIPE, text=True
+    )
+    line = process.stdout.readline()
+    return process, line.strip().rsplit(" en ", 1)[1]
+
+
+def free_port_url() -> str:
+    """URL de un puerto local sin servidor (par caído)."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def test_case_7_lan_peer_cache():
+    """
+    Test Caso 7: Caché LAN → pares en procesos separados sirven blobs por sha256, fallback a la url,
+    tráfico LAN fuera del limitador global, bytes reanudados y allow-list de clientes
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 7: Caché LAN entre workers")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        served = tmpdir / "hq"
+        processes = []
+
+        with LocalHTTPServer(served) as hq:
+            def build_manifest(version: str, count: int) -> dict:
+                files = []
+                for i in range(count):
+                    path = f"models/layer{i}.bin"
+                    content = f"layer {i} weights ".encode() * 500
+                    files.append({
+                        "path": path,
+                        "sha256": write_fixture(served, path, content),
+                        "size": len(content),
+                        "url": hq.url_for(path)
+                    })
+                return {"manifest_version": "1.0", "tool_id": "tool-a", "tool_version": version,
+                        "files": files, "manifest_hash": "0" * 64}
+
+            # Dos workers ya actualizados (el primero con un archivo alterado)
+            manifest = build_manifest("1.0.0", 15)
+            DeltaUpdater(tmpdir / "peer1" / "tool-a").update_from_zip(tmpdir / "unused.zip", manifest)
+            shutil.copytree(tmpdir / "peer1", tmpdir / "peer2")
+            tampered = tmpdir / "peer1" / "tool-a" / "releases" / "v1.0.0" / "models" / "layer0.bin"
+            tampered.write_bytes(tampered.read_bytes().upper())
+
+            try:
+                peers = []
+                for name in ("peer1", "peer2"):
+                    process, url = start_peer_process(tmpdir / name)
+                    processes.append(process)
+                    peers.append(url)
+                peers.append(free_port_url())
+
+                # Nueva release: 15 archivos en los pares + 1 solo en HQ
+                manifest = build_manifest("1.0.0", 16)
+                hq_requests = len(hq.requests)
+                wan_before = sum(get_limiter().bytes_by_priority.values())
+                downloader = PeerDownloader(peers, peer_timeout=2.0)
+                stats = DeltaUpdater(tmpdir / "worker" / "tool-a", downloader=downloader).update_from_zip(
+                    tmpdir / "unused.zip", manifest
+                )
+
+                assert stats.files_verified == 16
+                assert downloader.files_from_peers == 15, f"Desde pares: {downloader.files_from_peers}"
+                assert downloader.files_from_origin == 1
+                assert hq.requests[hq_requests:] == [("/models/layer15.bin", None)], "Solo el archivo nuevo por WAN"
+                installed = tmpdir / "worker" / "tool-a" / "releases" / "v1.0.0" / "models" / "layer0.bin"
+                assert installed.read_bytes() == (served / "models" / "layer0.bin").read_bytes()
+
+                # El tráfico LAN va por el limitador propio; el global solo ve la WAN
+                sizes = [entry["size"] for entry in manifest["files"]]
+                assert downloader.peer_limiter is not get_limiter()
+                assert downloader.bytes_from_peers == sum(sizes[:15])
+                assert sum(get_limiter().bytes_by_priority.values()) - wan_before == sizes[15]
+
+                # Reanudar un parcial desde un par: solo cuentan los bytes recibidos
+                entry = manifest["files"][3]
+                partial = tmpdir / "partial" / "layer3.bin"
+                partial.parent.mkdir()
+                partial.write_bytes((served / entry["path"]).read_bytes()[:1000])
+                peer_bytes = downloader.bytes_from_peers
+                assert downloader.download(entry["url"], partial, entry["sha256"])
+                assert downloader.bytes_from_peers - peer_bytes == entry["size"] - 1000
+            finally:
+                for process in processes:
+                    process.terminate()
+                    process.wait()
+                    process.stdout.close()
+
+            # Allow-list: por defecto solo loopback; un cliente fuera de la lista recibe 403
+            peer1 = tmpdir / "peer1"
+            with PeerBlobServer(peer1, port=0, allowed_peers=["10.0.0.0/8"]) as server:
+                assert server.httpd.server_address[0] == "127.0.0.1"
+                try:
+                    urlopen(f"http://127.0.0.1:{server.port}/index", timeout=2.0)
+                    assert False, "Cliente fuera de la allow-list aceptado"
+                except HTTPError as e:
+                    assert e.code == 403
+            with PeerBlobServer(peer1, port=0, allowed_peers=["127.0.0.1"]) as server:
+                with urlopen(f"http://127.0.0.1:{server.port}/index", timeout=2.0) as response:
+                    assert json.loads(response.read())["blobs"]
+
+        print("[OK] Test Caso 7 PASADO")
+        print(f"  {downloader.files_from_peers} archivos desde pares, {downloader.files_from_origin} desde HQ")
+        return True
+
+
+def test_case_8_remote_zip():
+    """
+    Test Caso 8: ZIP remoto → solo directorio central y miembros necesarios por Range, fallback sin Range
+    """
+    print("\n" + "="*60)
+    print("TEST CASO 8: ZIP remoto por HTTP Range")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        served = tmpdir / "hq"
+        served.mkdir()
+
+        # Release con miembros grandes y un manifest sin URLs individuales
+        contents = {f"lib/part{i}.bin": os.urandom(512 * 1024) for i in range(8)}
+        contents["src/main.py"] = b"print('v1')\n" * 1000
+        files = [{"path": path, "sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+                 for path, data in sorted(contents.items())]
+        manifest = {"manifest_version": "1.0", "tool_id": "tool-z", "tool_version": "1.0.0",
+                    "files": files, "manifest_hash": "1" * 64}
+        with zipfile.ZipFile(served / "tool_z_1.0.0.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("manifest.json", json.dumps(manifest))
+            for path, data in sorted(contents.items()):
+                zf.writestr(path, data)
+        zip_size = (served / "tool_z_1.0.0.zip").stat().st_size
+
+        with LocalHTTPServer(served) as hq:
+            asset_url = hq.url_for("tool_z_1.0.0.zip")
+
+            # Instalación inicial (versión anterior) desde el ZIP local
+            tool_root = tmpdir / "tool-z"
+            DeltaUpdater(tool_root).update_from_zip(served / "tool_z_1.0.0.zip", manifest)
+
+            # v1.1.0: cambian 2 archivos de 9
+            contents["src/main.py"] = b"print('v2')\n" * 1000
+            contents["lib/part3.bin"] = os.urandom(512 * 1024)
+            files = [{"path": path, "sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+                     for path, data in sorted(contents.items())]
+            manifest = dict(manifest, tool_version="1.1.0", files=files, manifest_hash="2" * 64)
+            with zipfile.ZipFile(served / "tool_z_1.1.0.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+                zf.writestr("manifest.json", json.dumps(manifest))
+                for path, data in sorted(contents.items()):
+                    zf.writestr(path, data)
+            asset_url = hq.url_for("tool_z_1.1.0.zip")
+
+            for downloader in (HTTPDownloader(), AsyncHTTPDownloader()):
+                assert downloader.range_size(asset_url) == (served / "tool_z_1.1.0.zip").stat().st_size
+            assert RemoteZip(asset_url, HTTPDownloader()).read("manifest.json") == json.dumps(manifest).encode()
+
+            before = len(hq.requests)
+            updater = DeltaUpdater(tool_root, zip_workers=2)
+            stats = updater.update_from_zip(None, manifest, asset_url=asset_url)
+            release = tool_root / "releases" / "v1.1.0"
+            for path, data in contents.items():
+                assert (release / path).read_bytes() == data
+            assert stats.files_downloaded == 2
+            assert stats.bytes_downloaded < zip_size / 3, f"Solo cola + 2 miembros: {stats.bytes_downloaded}/{zip_size}"
+            ranges = hq.requests[before:]
+            assert all(rng for _, rng in ranges), "Todas las peticiones deben ser por Range"
+            assert len(ranges) <= 4, f"Sondeo + cola + como mucho 1 por miembro: {ranges}"
+
+        # Servidor sin Range: descarga el asset completo verificado contra el catálogo, extrae y lo borra
+        asset_sha = hashlib.sha256((served / "tool_z_1.1.0.zip").read_bytes()).hexdigest()
+        with LocalHTTPServer(served, support_ranges=False) as hq:
+            other_root = tmpdir / "tool-z-norange"
+            try:
+                DeltaUpdater(other_root).update_from_zip(None, manifest, asset_url=hq.url_for("tool_z_1.1.0.zip"),
+                                                         asset_sha256="0" * 64)
+                assert False, "Debió rechazar un asset con otro sha256"
+            except RuntimeError:
+                pass
+            assert not (other_root / "releases" / ".staging" / ".asset.zip").exists()
+            assert not (other_root / "current.txt").exists()
+            
+            updater = DeltaUpdater(other_root)
+            stats = updater.update_from_zip(None, manifest, asset_url=hq.url_for("tool_z_1.1.0.zip"),
+                                            asset_sha256=asset_sha)
+            assert stats.files_downloaded == len(contents)
+            assert stats.bytes_downloaded == (served / "tool_z_1.1.0.zip").stat().st_size
+            assert (other_root / "releases" / "v1.1.0" / "lib" / "part3.bin").read_bytes() == contents["lib/part3.bin"]
+            assert not (updater.staging_dir / ".asset.zip").exists(), "El asset completo se borra tras extraer"
+
+        print("[OK] Test Caso 8 PASADO")
+        print(f"  {len(ranges)} peticiones Range para 2 de {len(contents)} archivos")
+        return True
+
+
+def run_all_tests():
+    """Ejecuta todos los tests de downloaders."""
+    print("\n" + "="*60)
+    print("SUITE DE TESTS: DOWNLOADERS")
+    print("="*60)
+
+    tests = [
+        ("Caso 1: Keep-alive concurrente", test_case_1_async_connection_reuse),
+        ("Caso 2: Resume y hash mismatch", test_case_2_async_resume_and_mismatch),
+        ("Caso 3: Inyección en DeltaUpdater", test_case_3_async_downloader_in_updater),
+        ("Caso 4: Descarga segmentada", test_case_4_segmented_download_and_resume),
+        ("Caso 5: Fallback sin Range", test_case_5_segmented_fallback_without_ranges),
+        ("Caso 6: Limitador de ancho de banda", test_case_6_bandwidth_limiter),
+        ("Caso 7: Caché LAN entre workers", test_case_7_lan_peer_cache),
+        ("Caso 8: ZIP remoto por Range", test_case_8_remote_zip),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+            else:
+                failed += 1
+                print(f"[FAIL] {test_name} FALLIDO")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test_name} ERROR: {e}")
+            import traceback
+            traceback.print_exc()
+
+    print("\n" + "="*60)
+    print("RESUMEN DE TESTS")
+    print("="*60)
+    print(f"Pasados: {passed}/{len(tests)}")
+    print(f"Fallidos: {failed}/{len(tests)}")
+
+    if failed == 0:
+        print("\n*** TODOS LOS TESTS PASARON ***")
+        return 0
+    else:
+        print(f"\n*** {failed} TESTS FALLARON ***")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,130 @@
+"""
+Variantes comprimidas de transporte por archivo (gzip / zstd).
+
+generate_manifest.py puede publicar, junto a la URL cruda de cada archivo, una
+variante precomprimida:
+
+    "compressed": {"encoding": "gzip", "url": ".../app.js.gz", "size": 1234, "sha256": "..."}
+
+El sha256 de la variante es el de los bytes comprimidos (lo verifica el
+downloader); el updater la descomprime por streaming a staging verificando el
+hash del archivo descomprimido (sha256, o su hash_alg en manifest v2), que
+sigue siendo la fuente de verdad.
+
+Solo se publica la variante si ahorra al menos un 10%; los formatos ya
+comprimidos (imágenes, audio, pesos de modelos, archivos) ni se intentan.
+
+zstd requiere el paquete opcional `zstandard`; sin él solo hay gzip y el
+updater ignora las variantes zstd (descarga la URL cruda).
+"""
+
+import gzip
+import hashlib
+import zlib
+from pathlib import Path
+from typing import Optional, Tuple
+
+try:
+    from file_hashing import SHA256, ContentHasher
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent))
+    from file_hashing import SHA256, ContentHasher
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# Niveles por defecto: se comprime una vez en build y se descarga N veces
+DEFAULT_LEVELS = {"gzip": 9, "zstd": 19}
+
+# La variante se publica solo si comprimida ocupa como mucho este ratio del original
+MAX_RATIO = 0.9
+
+# Sufijos que ya vienen comprimidos (o son pesos binarios de alta entropía)
+INCOMPRESSIBLE_SUFFIXES = {
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".ico",
+    ".mp3", ".ogg", ".flac", ".m4a", ".aac", ".opus", ".mp4", ".webm", ".mkv",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".rar",
+    ".woff", ".woff2",
+    ".gguf", ".safetensors", ".pth", ".ckpt", ".onnx",
+}
+
+_BLOCK = 1024 * 1024
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Encodings utilizables en este entorno."""
+    return ("gzip", "zstd") if zstandard is not None else ("gzip",)
+
+
+def is_compressible(path: Path) -> bool:
+    """False para formatos que no vale la pena recomprimir."""
+    return path.suffix.lower() not in INCOMPRESSIBLE_SUFFIXES
+
+
+def _require(encoding: str) -> None:
+    if encoding not in SUFFIXES:
+        raise ValueError(f"Encoding desconocido: {encoding}")
+    if encoding not in available_encodings():
+        raise RuntimeError(f"Encoding {encoding} requiere el paquete 'zstandard' (pip install zstandard)")
+
+
+def compress_file(src: Path, dst: Path, encoding: str, level: Optional[int] = None) -> Tuple[int, str]:
+    """
+    Comprime src en dst de forma determinista (gzip sin nombre ni mtime).
+
+    Returns:
+        (tamaño comprimido, sha256 de los bytes comprimidos)
+    """
+    _require(encoding)
+    level = DEFAULT_LEVELS[encoding] if level is None else level
+    dst.parent.mkdir(parents=True, exist_ok=True)
+
+    with src.open("rb") as fin, dst.open("wb") as fout:
+        if encoding == "gzip":
+            with gzip.GzipFile(filename="", mode="wb", compresslevel=level, fileobj=fout, mtime=0) as gz:
+                for block in iter(lambda: fin.read(_BLOCK), b""):
+                    gz.write(block)
+        else:
+            zstandard.ZstdCompressor(level=level).copy_stream(fin, fout)
+
+    h = hashlib.sha256()
+    with dst.open("rb") as f:
+        for block in iter(lambda: f.read(_BLOCK), b""):
+            h.update(block)
+    return dst.stat().st_size, h.hexdigest()
+
+
+def decompress_file(src: Path, dst: Path, encoding: str, alg: str = SHA256) -> str:
+    """
+    Descomprime src en dst por streaming.
+
+    Returns:
+        Digest (ver file_hashing) del contenido descomprimido con el algoritmo alg
+
+    Raises:
+        OSError: si el stream comprimido es inválido
+    """
+    _require(encoding)
+    h = ContentHasher(alg)
+    with src.open("rb") as fin, dst.open("wb") as fout:
+        if encoding == "gzip":
+            stream = gzip.GzipFile(fileobj=fin, mode="rb")
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(fin)
+        try:
+            with stream:
+                for block in iter(lambda: stream.read(_BLOCK), b""):
+                    fout.write(block)
+                    h.update(block)
+        except (EOFError, zlib.error) as e:
+            raise OSError(f"Stream {encoding} inválido: {e}") from e
+        except Exception as e:
+            if zstandard is not None and isinstance(e, zstandard.ZstdError):
+                raise OSError(f"Stream {encoding} inválido: {e}") from e
+            raise
+    return h.hexdigest()
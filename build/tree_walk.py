@@ -0,0 +1,49 @@
+"""
+Recorrido podado del árbol de una tool.
+
+generate_manifest.py y pack_tools.py recorrían la tool con rglob("*") y
+descartaban después los paths bajo venv/, node_modules/, models/, ...: el
+recorrido entraba igualmente en esos árboles, que suelen ser los más grandes.
+walk_files() no desciende nunca a un directorio excluido y compara los nombres
+solo dentro de la tool (un directorio padre llamado temp/ no excluye nada).
+"""
+
+import os
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+
+def walk_files(
+    root: Path,
+    exclude_names: Iterable[str],
+    exclude_file: Optional[Callable[[str, Path], bool]] = None
+) -> List[Tuple[str, Path]]:
+    """
+    Archivos bajo root como (path relativo con /, path), ordenados por path relativo.
+
+    Args:
+        root: Directorio raíz del recorrido
+        exclude_names: Nombres excluidos (directorios: no se desciende a ellos; archivos: se omiten)
+        exclude_file: Filtro adicional por archivo (rel, path) -> True para omitirlo
+
+    Los enlaces simbólicos a directorios no se siguen (evita ciclos); los
+    enlaces a archivos se incluyen como archivos.
+    """
+    exclude_names = set(exclude_names)
+    files: List[Tuple[str, Path]] = []
+    pending = [("", str(root))]
+    while pending:
+        prefix, directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name in exclude_names:
+                    continue
+                rel = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((rel + "/", entry.path))
+                elif entry.is_file():
+                    path = Path(entry.path)
+                    if exclude_file is None or not exclude_file(rel, path):
+                        files.append((rel, path))
+    files.sort()
+    return files
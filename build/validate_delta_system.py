@@ -46,9 +46,9 @@ def check_manifest_valid(manifest_path: Path) -> Tuple[bool, str]:
         if len(manifest["files"]) == 0:
             return False, "files está vacío"
         
-        # Validar primer archivo
+        # Validar primer archivo (v1: sha256; v2: hash_alg + hash)
         first_file = manifest["files"][0]
-        file_required = ["path", "sha256", "size"]
+        file_required = ["path", "size"] + (["hash_alg", "hash"] if "hash_alg" in first_file else ["sha256"])
         for field in file_required:
             if field not in first_file:
                 return False, f"Archivo sin campo requerido: {field}"
@@ -12,11 +12,14 @@ import json
 import sys
 import zipfile
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 # Importar el updater
 sys.path.insert(0, str(Path(__file__).parent))
+from bandwidth_limiter import BACKGROUND, FOREGROUND, configure_bandwidth
 from delta_updater import DeltaUpdater, UpdateStats
+from object_store import ObjectStore
+from peer_cache import DEFAULT_PEER_HOST, DEFAULT_PEER_PORT, PeerBlobServer, PeerDownloader
 
 
 class PCWorker:
@@ -24,22 +27,67 @@ class PCWorker:
     Simulación simplificada de un PCWorker con actualización diferencial.
     """
     
-    def __init__(self, tools_base: Path):
+    def __init__(
+        self,
+        tools_base: Path,
+        use_object_store: bool = False,
+        max_download_rate: Optional[float] = None,
+        background_download_rate: Optional[float] = None,
+        peers: Optional[List[str]] = None,
+        progressive: bool = False
+    ):
         """
         Args:
             tools_base: Directorio base donde están instaladas las tools
+            use_object_store: Compartir blobs entre releases y tools en tools_base/.objects
+            max_download_rate: Límite total de descarga del proceso en bytes/s (None = sin límite)
+            background_download_rate: Presupuesto en bytes/s para actualizaciones
+                mientras hay trabajos en curso (None = sin límite propio)
+            peers: URLs de otros workers de la LAN con PeerBlobServer; se intentan
+                antes que la url del manifest
+            progressive: Activar cada release en cuanto sus archivos calientes
+                están verificados (los fríos se descargan en segundo plano)
         """
         self.tools_base = tools_base
         self.updaters = {}  # {tool_id: DeltaUpdater}
+        self.object_store = ObjectStore(tools_base / ".objects") if use_object_store else None
+        self.jobs_running = False
+        self.peer_downloader = PeerDownloader(peers) if peers else None
+        self.peer_server: Optional[PeerBlobServer] = None
+        self.progressive = progressive
+        if max_download_rate or background_download_rate:
+            configure_bandwidth(max_download_rate, background_download_rate)
     
     def get_updater(self, tool_id: str) -> DeltaUpdater:
         """Obtiene o crea un updater para una tool."""
         if tool_id not in self.updaters:
             tool_root = self.tools_base / tool_id
             tool_root.mkdir(parents=True, exist_ok=True)
-            self.updaters[tool_id] = DeltaUpdater(tool_root)
+            updater = DeltaUpdater(
+                tool_root, downloader=self.peer_downloader, object_store=self.object_store,
+                progressive=self.progressive
+            )
+            updater.downloader.priority = self.download_priority
+            self.updaters[tool_id] = updater
         return self.updaters[tool_id]
     
+    @property
+    def download_priority(self) -> str:
+        """Con trabajos en curso las actualizaciones descargan en background."""
+        return BACKGROUND if self.jobs_running else FOREGROUND
+    
+    def set_jobs_running(self, running: bool) -> None:
+        """
+        Notifica si hay trabajos de red en curso.
+        
+        Cambia en caliente la prioridad de descarga de todos los updaters: una
+        actualización ya iniciada pasa a respetar el presupuesto de background
+        (o sale de él) desde su siguiente lectura de red.
+        """
+        self.jobs_running = running
+        for updater in self.updaters.values():
+            updater.downloader.priority = self.download_priority
+    
     def check_tool_status(self, tool_id: str) -> dict:
         """
         Verifica el estado de una tool instalada.
@@ -103,6 +151,47 @@ class PCWorker:
         
         return stats
     
+    def update_tool_from_patch(self, tool_id: str, patch_path: Path, zip_path: Optional[Path] = None) -> UpdateStats:
+        """
+        Actualiza una tool aplicando un parche de manifiesto a la versión instalada.
+        
+        Args:
+            tool_id: ID de la tool
+            patch_path: Parche {from}_to_{to}.json publicado por generate_manifest.py
+            zip_path: ZIP de la nueva versión (solo si el manifest no tiene URLs individuales)
+        """
+        patch = json.loads(patch_path.read_text(encoding="utf-8"))
+        if patch["tool_id"] != tool_id:
+            raise ValueError(f"Tool ID mismatch: esperado={tool_id}, parche={patch['tool_id']}")
+        
+        return self.get_updater(tool_id).update_from_patch(patch, zip_path)
+
+    def update_tool_from_delta(self, tool_id: str, delta_path: Path) -> UpdateStats:
+        """
+        Actualiza una tool desde un archivo delta de pack_tools.py.
+
+        Args:
+            tool_id: ID de la tool
+            delta_path: delta_{tool}_{base}_to_{version}.zip cuya base es la versión instalada
+        """
+        updater = self.get_updater(tool_id)
+        info = updater.read_zip_json(delta_path, "delta.json")
+        if info is None:
+            raise ValueError(f"ZIP no contiene delta.json: {delta_path}")
+        if info["tool_id"] != tool_id:
+            raise ValueError(f"Tool ID mismatch: esperado={tool_id}, delta={info['tool_id']}")
+
+        return updater.update_from_delta(delta_path)
+
+    def rollback_tool(self, tool_id: str) -> str:
+        """
+        Vuelve a la release anterior conservada de una tool (solo reescribe current.txt).
+        
+        Returns:
+            Nombre de la release activada
+        """
+        return self.get_updater(tool_id).rollback()
+    
     def check_network_eligibility(
         self,
         tool_id: str,
@@ -118,6 +207,39 @@ class PCWorker:
         updater = self.get_updater(tool_id)
         return updater.get_network_eligibility(required_version, required_hash)
     
+    def start_peer_server(
+        self,
+        host: str = DEFAULT_PEER_HOST,
+        port: int = DEFAULT_PEER_PORT,
+        allowed_peers: Optional[List[str]] = None
+    ) -> PeerBlobServer:
+        """
+        Sirve a los demás workers de la LAN los archivos de las releases instaladas.
+        
+        Args:
+            host: Interfaz de escucha (default solo loopback; para la LAN, la IP del worker)
+            port: Puerto
+            allowed_peers: IPs o redes CIDR de los workers autorizados (None = cualquiera)
+        """
+        if self.peer_server is None:
+            self.peer_server = PeerBlobServer(
+                self.tools_base, host=host, port=port, allowed_peers=allowed_peers
+            ).start()
+            print(f"[worker] Servidor de blobs LAN en puerto {self.peer_server.port}")
+        return self.peer_server
+    
+    def collect_garbage(self) -> int:
+        """
+        Elimina del almacén compartido los blobs que ninguna release referencia.
+        
+        Returns:
+            Bytes liberados (0 si no se usa almacén)
+        """
+        if not self.object_store:
+            return 0
+        _, freed = self.object_store.gc()
+        return freed
+    
     def flash_gpu(self, tool_id: str) -> bool:
         """
         Ejecuta Flash GPU (warmup) para una tool.
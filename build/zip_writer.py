@@ -0,0 +1,214 @@
+"""
+Escritor de ZIP determinista para los assets de release.
+
+zipfile.ZipFile.write() toma la fecha y los permisos del sistema de archivos y
+comprime cada miembro en el hilo que escribe. Para que dos builds del mismo
+contenido den el mismo sha256, y para poder comprimir miembros en paralelo,
+pack_tools.py escribe los ZIP con DeterministicZipWriter:
+
+- fecha fija (1980-01-01 00:00:00), create_system Unix, permisos 0644/0755
+- los miembros se escriben en el orden en que se agregan (el llamador ordena)
+- add_compressed(): miembro ya comprimido (y con CRC calculado) en otro hilo
+- add_stream(): miembro grande leído por bloques (CRC en data descriptor)
+- ZIP64 automático para miembros, offsets o número de entradas grandes
+
+Solo necesita fileobj.write(): con HashingWriter el sha256 del ZIP se calcula
+mientras se produce, sin releer el asset terminado. Los ZIP resultantes se leen
+con zipfile (métodos store y deflate).
+"""
+
+import hashlib
+import struct
+import zlib
+from typing import Iterable, List, NamedTuple, Tuple
+
+STORED = 0
+DEFLATED = 8
+METHODS = {"store": STORED, "deflate": DEFLATED}
+
+DEFAULT_LEVEL = 6
+
+# 1980-01-01 00:00:00 en formato DOS
+_DOS_TIME = 0
+_DOS_DATE = (0 << 9) | (1 << 5) | 1
+
+# Como zipfile: por encima de 2 GiB se usa ZIP64 (lectores con enteros con signo)
+ZIP64_LIMIT = (1 << 31) - 1
+_MAX_ENTRIES = 0xFFFF
+
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL_DIR = struct.Struct("<4s4B4HL2L5H2L")
+_END_ARCHIVE = struct.Struct("<4s4H2LH")
+_END_ARCHIVE64 = struct.Struct("<4sQ2H2L4Q")
+_END_ARCHIVE64_LOCATOR = struct.Struct("<4sLQL")
+
+
+class _Entry(NamedTuple):
+    name: bytes
+    method: int
+    flags: int
+    crc: int
+    compress_size: int
+    file_size: int
+    header_offset: int
+    external_attr: int
+
+
+def compress_member(data: bytes, method: int, level: int = DEFAULT_LEVEL) -> Tuple[bytes, int]:
+    """
+    Comprime un miembro completo (thread-safe; zlib libera el GIL).
+
+    Returns:
+        (bytes a escribir, CRC32 del contenido original)
+    """
+    crc = zlib.crc32(data)
+    if method == STORED:
+        return data, crc
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(), crc
+
+
+class HashingWriter:
+    """Envoltorio de escritura que calcula el sha256 y el tamaño de lo escrito."""
+
+    def __init__(self, fileobj):
+        self._fp = fileobj
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._hash.update(data)
+        self.size += len(data)
+        return self._fp.write(data)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+class DeterministicZipWriter:
+    """ZIP de solo escritura sobre un fileobj secuencial (sin seek)."""
+
+    def __init__(self, fileobj, level: int = DEFAULT_LEVEL):
+        self._fp = fileobj
+        self.level = level
+        self._offset = 0
+        self._entries: List[_Entry] = []
+        self._closed = False
+
+    def _write(self, data: bytes) -> None:
+        self._fp.write(data)
+        self._offset += len(data)
+
+    @staticmethod
+    def _external_attr(executable: bool) -> int:
+        return (0o100755 if executable else 0o100644) << 16
+
+    def _local_header(self, name: bytes, method: int, flags: int, crc: int,
+                      compress_size: int, file_size: int, zip64: bool) -> bytes:
+        extra = b""
+        if zip64:
+            extra = struct.pack("<HHQQ", 1, 16, file_size, compress_size)
+            compress_size = file_size = 0xFFFFFFFF
+        version = 45 if zip64 else 20
+        return _LOCAL_HEADER.pack(
+            b"PK\x03\x04", version, 0, flags, method, _DOS_TIME, _DOS_DATE,
+            crc, compress_size, file_size, len(name), len(extra)
+        ) + name + extra
+
+    def add_compressed(self, name: str, method: int, payload: bytes, crc: int,
+                       file_size: int, executable: bool = False) -> None:
+        """Agrega un miembro ya comprimido (ver compress_member)."""
+        encoded = name.encode("utf-8")
+        flags = _FLAG_UTF8
+        offset = self._offset
+        zip64 = file_size > ZIP64_LIMIT or len(payload) > ZIP64_LIMIT
+        self._write(self._local_header(encoded, method, flags, crc, len(payload), file_size, zip64))
+        self._write(payload)
+        self._entries.append(_Entry(encoded, method, flags, crc, len(payload), file_size,
+                                    offset, self._external_attr(executable)))
+
+    def add_stream(self, name: str, method: int, blocks: Iterable[bytes], size_hint: int,
+                   executable: bool = False) -> Tuple[int, int]:
+        """
+        Agrega un miembro leído por bloques, comprimiéndolo en este hilo.
+
+        El CRC y los tamaños van en un data descriptor al final del miembro.
+
+        Args:
+            size_hint: Tamaño esperado (decide ZIP64 antes de escribir la cabecera)
+
+        Returns:
+            (CRC32, tamaño sin comprimir)
+        """
+        encoded = name.encode("utf-8")
+        flags = _FLAG_UTF8 | _FLAG_DATA_DESCRIPTOR
+        offset = self._offset
+        zip64 = size_hint > ZIP64_LIMIT
+        self._write(self._local_header(encoded, method, flags, 0, 0, 0, zip64))
+
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15) if method == DEFLATED else None
+        crc = file_size = compress_size = 0
+        for block in blocks:
+            crc = zlib.crc32(block, crc)
+            file_size += len(block)
+            if compressor is not None:
+                block = compressor.compress(block)
+            compress_size += len(block)
+            self._write(block)
+        if compressor is not None:
+            tail = compressor.flush()
+            compress_size += len(tail)
+            self._write(tail)
+
+        if not zip64 and (file_size > ZIP64_LIMIT or compress_size > ZIP64_LIMIT):
+            raise ValueError(f"{name}: creció por encima de ZIP64_LIMIT sin size_hint suficiente")
+        fmt = "<4sLQQ" if zip64 else "<4sLLL"
+        self._write(struct.pack(fmt, b"PK\x07\x08", crc, compress_size, file_size))
+        self._entries.append(_Entry(encoded, method, flags, crc, compress_size, file_size,
+                                    offset, self._external_attr(executable)))
+        return crc, file_size
+
+    def close(self) -> None:
+        """Escribe el directorio central (y los registros ZIP64 si hacen falta)."""
+        if self._closed:
+            return
+        self._closed = True
+
+        start_dir = self._offset
+        for entry in self._entries:
+            extra_fields = []
+            file_size, compress_size, header_offset = entry.file_size, entry.compress_size, entry.header_offset
+            if file_size > ZIP64_LIMIT or compress_size > ZIP64_LIMIT:
+                extra_fields += [file_size, compress_size]
+                file_size = compress_size = 0xFFFFFFFF
+            if header_offset > ZIP64_LIMIT:
+                extra_fields.append(header_offset)
+                header_offset = 0xFFFFFFFF
+            extra = struct.pack(f"<HH{len(extra_fields)}Q", 1, 8 * len(extra_fields), *extra_fields) if extra_fields else b""
+            version = 45 if extra_fields else 20
+            self._write(_CENTRAL_DIR.pack(
+                b"PK\x01\x02", version, 3, version, 0, entry.flags, entry.method, _DOS_TIME, _DOS_DATE,
+                entry.crc, compress_size, file_size, len(entry.name), len(extra), 0, 0, 0,
+                entry.external_attr, header_offset
+            ) + entry.name + extra)
+
+        count = len(self._entries)
+        size_dir = self._offset - start_dir
+        if count >= _MAX_ENTRIES or size_dir > ZIP64_LIMIT or start_dir > ZIP64_LIMIT:
+            end64_offset = self._offset
+            self._write(_END_ARCHIVE64.pack(b"PK\x06\x06", 44, 45, 45, 0, 0, count, count, size_dir, start_dir))
+            self._write(_END_ARCHIVE64_LOCATOR.pack(b"PK\x06\x07", 0, end64_offset, 1))
+            count = min(count, _MAX_ENTRIES)
+            size_dir = min(size_dir, 0xFFFFFFFF)
+            start_dir = min(start_dir, 0xFFFFFFFF)
+        self._write(_END_ARCHIVE.pack(b"PK\x05\x06", 0, 0, count, count, size_dir, start_dir, 0))
+
+    def __enter__(self) -> "DeterministicZipWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()